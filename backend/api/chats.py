@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 
 from backend.database import get_db_context
 from backend.models import Conversation, Message, Embedding
+from backend.services.vector_store import delete_conversation_from_store
 from backend.schemas import (
     ConversationResponse,
     ConversationDetailResponse,
@@ -159,7 +160,7 @@ async def get_conversation_details(conversation_id: str, response: Response):
 @router.delete("/{conversation_id}")
 async def delete_conversation(conversation_id: str):
     """
-    Delete a conversation and all its messages.
+    Delete a conversation, all its messages and its vector store entries.
     
     Args:
         conversation_id: UUID of the conversation to delete
@@ -181,6 +182,12 @@ async def delete_conversation(conversation_id: str):
         db.delete(conversation)
         db.commit()
         
+        # Keep deleted conversations (and their chunks) out of search results
+        try:
+            await delete_conversation_from_store(conversation_id)
+        except Exception as e:
+            print(f"Warning: Vector store delete failed: {e}")
+        
         return {
             "success": True,
             "message": f"Conversation {conversation_id} deleted successfully"
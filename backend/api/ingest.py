@@ -1,239 +1,393 @@
 """
 Chat ingestion API endpoint.
 
-Handles uploading and processing of chat HTML files.
+Handles uploading and processing of chat HTML files and of ChatGPT/Claude
+data exports (ZIP archive or conversations.json).
 """
 
 import asyncio
+import io
+import itertools
+import os
 import time
-from typing import List
+from pathlib import PurePath
+from typing import Any, AsyncIterable, Awaitable, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Set, Union
 from fastapi import APIRouter, File, UploadFile, HTTPException, Form
 from sqlalchemy.orm import Session
 from backend.database import get_db_context
-from backend.models import Conversation, Message, Embedding, MessageRole
+from backend.models import Conversation, Embedding
 from backend.schemas import IngestResponse, IngestBatchResponse
-from backend.parsers import parse_html, detect_format
+from backend.parsers import ParserFactory, iter_json_export, iter_zip_export, sniff_format
+from backend.parsers.base_parser import SNIFF_CHARS
 from backend.parsers.chatgpt_parser import ChatGPTParser
 from backend.services.normalizer import normalize_conversation
 from backend.services.summarizer import summarize_conversation
-from backend.services.embedder import generate_embedding, prepare_text_for_embedding
+from backend.services.chunker import EMBEDDING_CHUNKING, chunk_messages
+from backend.services.embedder import generate_embeddings_batch, prepare_text_for_embedding
+from backend.services.persistence import bulk_insert_conversations
+from backend.services.pipeline import PipelineStage, iterate_in_thread, run_pipeline
 from backend.services.dimensionality_reducer import fit_umap_model, reduce_embeddings, normalize_coordinates
 from backend.services.clusterer import cluster_conversations
-from backend.services.vector_store import upsert_conversation_to_store
+from backend.services.vector_store import (
+    upsert_conversation_chunks,
+    upsert_conversation_to_store,
+    update_store_metadata,
+)
 import uuid
 
 
 router = APIRouter(prefix="/api/ingest", tags=["ingest"])
 
+# Ingest pipeline: parse -> normalize -> summarize -> embed (batched) -> persist (batched)
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "16"))
+INGEST_SUMMARIZE_CONCURRENCY = int(os.getenv("INGEST_SUMMARIZE_CONCURRENCY", "4"))
+INGEST_EMBED_CONCURRENCY = int(os.getenv("INGEST_EMBED_CONCURRENCY", "2"))
+INGEST_EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH_SIZE", "16"))
+INGEST_PERSIST_BATCH_SIZE = int(os.getenv("INGEST_PERSIST_BATCH_SIZE", "16"))
 
-@router.post("/", response_model=IngestResponse)
-async def ingest_single_chat(
-    file: UploadFile = File(..., description="HTML chat export file"),
-    auto_reprocess: bool = Form(default=False, description="Automatically re-run UMAP and clustering after ingestion")
-):
-    """
-    Ingest a single chat HTML file.
+# Ingest every branch of a ChatGPT conversation (regenerated answers, edited
+# prompts) as its own conversation instead of only the active one
+INGEST_ALL_BRANCHES = os.getenv("INGEST_ALL_BRANCHES", "false").lower() in ("1", "true", "yes")
 
-    Accepts ChatGPT or Claude HTML exports, parses them, generates embeddings,
-    and stores in the database.
+# Data export uploads (ChatGPT/Claude archive or its conversations.json)
+EXPORT_EXTENSIONS = (".zip", ".json")
 
-    Args:
-        file: HTML chat export file (ChatGPT or Claude format)
-        auto_reprocess: If True, automatically re-run UMAP/clustering after ingestion (default: False)
 
-    Returns:
-        IngestResponse with conversation ID and metadata
+async def _normalize_stage(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Normalize one parsed conversation (dropped if it has no messages)."""
+    messages = item["parsed"].get("messages", [])
+    if not messages:
+        print(f"  [skip] conversation #{item['index']}: no messages")
+        return None
+    item["normalized"] = normalize_conversation(item["parsed"], messages)
+    return item
 
-    Error Codes:
-        400: Invalid file format (non-HTML)
-        422: Unable to parse HTML or empty conversation
-        500: Server error (embedding generation failed, database error, etc.)
+
+async def _summarize_stage(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate summary and topics using the LLM, then the text to embed."""
+    normalized = item["normalized"]
+    try:
+        summary, topics = await summarize_conversation(normalized['messages'])
+    except Exception as e:
+        print(f"Warning: Summarization failed: {e}")
+        summary = f"Conversation with {normalized['message_count']} messages"
+        topics = []
+    item["summary"], item["topics"] = summary, topics
+    item["embedding_text"] = prepare_text_for_embedding(
+        title=normalized['title'],
+        summary=summary,
+        topics=topics,
+        messages=normalized['messages']
+    )
+    return item
+
+
+async def _embed_stage(items: List[Dict[str, Any]]) -> List[Any]:
     """
-    start_time = time.time()
+    Embed a batch of conversations in one call (per-item retry if the batch fails).
 
+    With EMBEDDING_CHUNKING the message windows of the whole batch are
+    embedded in one more call; a failure there only loses the windows.
+    """
     try:
-        # Validate file type
-        if not file.filename.endswith('.html'):
-            raise HTTPException(
-                status_code=400,
-                detail="Only HTML files are accepted"
-            )
+        vectors = await generate_embeddings_batch([item["embedding_text"] for item in items])
+    except Exception as e:
+        if len(items) == 1:
+            print(f"  [error] Embedding failed for conv #{items[0]['index']} "
+                  f"({items[0]['normalized']['title']}): {e}")
+            return [e]
+        # Isolate the failing conversation(s) instead of dropping the whole batch
+        embedded = []
+        for item in items:
+            embedded.extend(await _embed_stage([item]))
+        return embedded
+    for item, vector in zip(items, vectors):
+        item["embedding"] = vector
+
+    if EMBEDDING_CHUNKING:
+        # Window vectors make the whole transcript searchable
+        for item in items:
+            item["chunks"] = chunk_messages(item["normalized"]['messages'])
+        all_chunks = [chunk for item in items for chunk in item["chunks"]]
+        try:
+            chunk_vectors = await generate_embeddings_batch(all_chunks) if all_chunks else []
+        except Exception as e:
+            print(f"Warning: Chunk embedding failed for {len(items)} conversation(s): {e}")
+            chunk_vectors = None
+        start = 0
+        for item in items:
+            end = start + len(item["chunks"])
+            item["chunk_vectors"] = chunk_vectors[start:end] if chunk_vectors is not None else None
+            start = end
+    return items
+
+
+def _conversation_row(item: Dict[str, Any]) -> Dict[str, Any]:
+    normalized = item["normalized"]
+    return {
+        "id": item["conversation_id"],
+        "title": normalized['title'],
+        "summary": item["summary"],
+        "topics": item["topics"],
+        "message_count": normalized['message_count'],
+        "created_at": normalized['created_at'],
+        "messages": normalized['messages'],
+        "embedding": item["embedding"],
+    }
+
+
+async def _persist_stage(items: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Bulk-insert a batch of conversations in one transaction, then index them in the vector store.
+
+    If the batch insert fails, each conversation is retried in its own
+    transaction so one bad row only loses its own conversation; those
+    failures are returned as exceptions and counted by the pipeline.
 
-        # Read file content
-        content = await file.read()
-        html_content = content.decode('utf-8')
+    Conversations whose ID is already stored (a resumed job re-running a
+    batch it had stored just before it was interrupted) are not inserted
+    again, only re-indexed.
+    """
+    for item in items:
+        item.setdefault("conversation_id", str(uuid.uuid4()))
 
-        # Detect format
-        format_type = detect_format(html_content)
-        if not format_type:
-            raise HTTPException(
-                status_code=422,
-                detail="Unable to detect chat format (ChatGPT/Claude)"
+    try:
+        with get_db_context() as db:
+            ids = [item["conversation_id"] for item in items]
+            stored = {cid for (cid,) in db.query(Conversation.id).filter(Conversation.id.in_(ids))}
+            rows = [_conversation_row(item) for item in items if item["conversation_id"] not in stored]
+            if rows:
+                bulk_insert_conversations(db, rows)
+                db.commit()
+    except Exception as e:
+        if len(items) == 1:
+            print(f"  [error] Storing conv #{items[0]['index']} "
+                  f"({items[0]['normalized']['title']}) failed: {e}")
+            return [e]
+        persisted = []
+        for item in items:
+            persisted.extend(await _persist_stage([item]))
+        return persisted
+
+    for item in items:
+        normalized, conversation_id = item["normalized"], item["conversation_id"]
+        # Upsert into vector store
+        try:
+            print(f"Upserting conversation {conversation_id} into vector store")
+            conversation_data = {
+                'title': normalized['title'],
+                'summary': item["summary"],
+                'topics': item["topics"],
+                'cluster_id': 0,
+                'messages': normalized['messages']
+            }
+            await upsert_conversation_to_store(
+                conversation_id=conversation_id,
+                conversation_data=conversation_data,
+                embedding=item["embedding"],
             )
+            if item.get("chunks") and item.get("chunk_vectors"):
+                await upsert_conversation_chunks(
+                    conversation_id, conversation_data, item["chunks"], item["chunk_vectors"]
+                )
+            print(f"[OK] Conversation indexed in vector store: {conversation_id}")
+        except Exception as e:
+            print(f"Warning: Vector store upsert failed: {e}")
 
-        # Parse HTML (support multiple conversations in a single ChatGPT export)
-        if format_type == "chatgpt":
-            parser = ChatGPTParser(html_content)
-            parsed_conversations = parser.parse_all()
+        item["response"] = IngestResponse(
+            success=True,
+            conversation_id=conversation_id,
+            title=normalized['title'],
+            message_count=normalized['message_count'],
+            error=None,
+            processing_time_ms=0
+        )
+    return items
+
+
+def ingest_stages() -> List[PipelineStage]:
+    """The ingest pipeline stages after parsing, with their concurrency limits."""
+    return [
+        PipelineStage("normalize", _normalize_stage),
+        PipelineStage("summarize", _summarize_stage, concurrency=INGEST_SUMMARIZE_CONCURRENCY),
+        PipelineStage(
+            "embed", _embed_stage, concurrency=INGEST_EMBED_CONCURRENCY, batch_size=INGEST_EMBED_BATCH_SIZE
+        ),
+        PipelineStage("persist", _persist_stage, batch_size=INGEST_PERSIST_BATCH_SIZE),
+    ]
+
+
+async def run_ingest_pipeline(
+    parsed_conversations: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+    on_result: Optional[Callable[[int, IngestResponse], Awaitable[None]]] = None,
+    skip: Optional[Set[int]] = None,
+    id_namespace: Optional[str] = None,
+    on_failure: Optional[Callable[[int], Awaitable[None]]] = None,
+) -> List[IngestResponse]:
+    """
+    Normalize, summarize, embed and store parsed conversations.
+
+    Conversations stream through bounded queues, so summarisation of one
+    conversation overlaps with embedding and persisting of others and no
+    conversation waits for the slowest of a fixed group.
+
+    Args:
+        parsed_conversations: Parser output (a plain or async iterable,
+            consumed as the pipeline has room).
+        on_result: Awaited with the position in ``parsed_conversations`` and
+            the IngestResponse of each stored conversation.
+        skip: Positions to leave out (e.g. already stored by an earlier run).
+        id_namespace: A UUID to derive each conversation's ID from (with its
+            position), so running the same input again stores nothing twice.
+        on_failure: Awaited with the position of each conversation that was
+            empty or failed.
+
+    Returns:
+        IngestResponses of the stored conversations, in input order.
+        Conversations that were empty or failed are left out.
+    """
+    skip = skip or set()
+    namespace = uuid.UUID(id_namespace) if id_namespace else None
+
+    def item_for(index, parsed):
+        item = {"index": index, "parsed": parsed}
+        if namespace is not None:
+            item["conversation_id"] = str(uuid.uuid5(namespace, str(index)))
+        return item
+
+    async def indexed():
+        index = 0
+        if hasattr(parsed_conversations, "__aiter__"):
+            async for parsed in parsed_conversations:
+                if index not in skip:
+                    yield item_for(index, parsed)
+                index += 1
         else:
-            parsed = parse_html(html_content)
-            parsed_conversations = [parsed] if parsed else []
-
-        # Filter out empty parses
-        parsed_conversations = [
-            c for c in parsed_conversations
-            if c and c.get("messages")
-        ]
-
-        if not parsed_conversations:
-            raise HTTPException(
-                status_code=422,
-                detail="Failed to parse HTML file"
-            )
+            for parsed in parsed_conversations:
+                if index not in skip:
+                    yield item_for(index, parsed)
+                index += 1
 
-        print(f"[ingest] Found {len(parsed_conversations)} conversation(s) in {file.filename}")
+    async def stored(item):
+        if on_result is not None:
+            await on_result(item["index"], item["response"])
 
-        results: List[IngestResponse] = []
-        last_id = None
-        last_title = None
-        total_messages = 0
-        ingested = 0
+    async def dropped(item):
+        if on_failure is not None:
+            await on_failure(item["index"])
 
-        # Process conversations concurrently in batches
-        BATCH_SIZE = 3  # Number of concurrent conversations to process
+    stages = ingest_stages()
+    items = await run_pipeline(indexed(), stages, INGEST_QUEUE_SIZE, on_output=stored, on_drop=dropped)
+    for stage in stages:
+        print(f"[ingest] stage {stage.name}: {stage.stats()}")
+    return [item["response"] for item in sorted(items, key=lambda item: item["index"])]
 
-        async def _process_single_conversation(conv_idx: int, parsed_data: dict):
-            """Process a single conversation: normalize, summarize, embed, store."""
-            messages = parsed_data.get('messages', [])
-            if not messages:
-                print(f"  [skip] conversation #{conv_idx}: no messages")
-                return None
 
-            # Normalize conversation
-            normalized = normalize_conversation(
-                parsed_data,
-                messages
-            )
+def parse_upload(html_content: str) -> List[Dict[str, Any]]:
+    """
+    Detect the export format and parse every non-empty conversation.
 
-            # Generate summary and topics using LLM
-            try:
-                summary, topics = await summarize_conversation(normalized['messages'])
-            except Exception as e:
-                print(f"Warning: Summarization failed: {e}")
-                summary = f"Conversation with {normalized['message_count']} messages"
-                topics = []
-
-            # Create conversation ID
-            conversation_id = str(uuid.uuid4())
-
-            # Prepare text for embedding
-            embedding_text = prepare_text_for_embedding(
-                title=normalized['title'],
-                summary=summary,
-                topics=topics,
-                messages=normalized['messages']
-            )
+    Supports multiple conversations in a single ChatGPT export.
 
-            # Generate embedding
-            try:
-                embedding_vector = await generate_embedding(
-                    embedding_text,
-                    conversation_id=conversation_id
-                )
-            except Exception as e:
-                print(f"  [error] Embedding failed for conv #{conv_idx} ({normalized['title']}): {e}")
-                return None
-
-            vector_3d = [0.0, 0.0, 0.0]
-
-            # Save to database
-            with get_db_context() as db:
-                conversation = Conversation(
-                    id=conversation_id,
-                    title=normalized['title'],
-                    summary=summary,
-                    topics=topics,
-                    cluster_id=0,
-                    cluster_name="Unclustered",
-                    message_count=normalized['message_count'],
-                    created_at=normalized['created_at']
-                )
-                db.add(conversation)
-
-                for msg in normalized['messages']:
-                    message = Message(
-                        id=str(uuid.uuid4()),
-                        conversation_id=conversation_id,
-                        role=MessageRole(msg['role']),
-                        content=msg['content'],
-                        sequence_number=msg['sequence_number']
-                    )
-                    db.add(message)
-
-                embedding = Embedding(
-                    conversation_id=conversation_id,
-                    embedding_384d=embedding_vector,
-                    vector_3d=vector_3d,
-                    start_x=0.0,
-                    start_y=0.0,
-                    start_z=0.0,
-                    end_x=vector_3d[0],
-                    end_y=vector_3d[1],
-                    end_z=vector_3d[2],
-                    magnitude=1.0
-                )
-                db.add(embedding)
-                db.commit()
+    Raises:
+        ValueError: If the format is unknown or no conversation could be parsed
+    """
+    # Detection sniffs the raw text; any parse tree it had to build is reused
+    format_type, soup = ParserFactory.detect(html_content)
+    if not format_type:
+        raise ValueError("Unable to detect chat format (ChatGPT/Claude)")
+
+    if format_type == "chatgpt":
+        parser = ChatGPTParser(html_content, soup=soup, all_branches=INGEST_ALL_BRANCHES)
+        parsed_conversations = parser.parse_all()
+    else:
+        parser = ParserFactory.create_parser(html_content, soup=soup)
+        parsed = parser.parse() if parser else None
+        parsed_conversations = [parsed] if parsed else []
+
+    # Filter out empty parses
+    parsed_conversations = [
+        c for c in parsed_conversations
+        if c and c.get("messages")
+    ]
+
+    if not parsed_conversations:
+        raise ValueError("Failed to parse HTML file")
+    return parsed_conversations
+
+
+def _peek(conversations: Iterator[Dict[str, Any]]) -> Optional[Iterator[Dict[str, Any]]]:
+    """Decode the first conversation; None if there is none or the data is malformed."""
+    try:
+        first = next(conversations, None)
+    except ValueError:
+        return None
+    return None if first is None else itertools.chain([first], conversations)
 
-            # Upsert into vector store
-            try:
-                print(f"Upserting conversation {conversation_id} into vector store")
-                conversation_data = {
-                    'title': normalized['title'],
-                    'summary': summary,
-                    'topics': topics,
-                    'messages': normalized['messages']
-                }
-                await upsert_conversation_to_store(
-                    conversation_id=conversation_id,
-                    conversation_data=conversation_data,
-                    embedding=embedding_vector,
-                )
-                print(f"[OK] Conversation indexed in vector store: {conversation_id}")
-            except Exception as e:
-                print(f"Warning: Vector store upsert failed: {e}")
 
-            return IngestResponse(
-                success=True,
-                conversation_id=conversation_id,
-                title=normalized['title'],
-                message_count=normalized['message_count'],
-                error=None,
-                processing_time_ms=0
-            )
+def stream_upload(upload: BinaryIO, filename: str = "upload.html") -> Iterator[Dict[str, Any]]:
+    """
+    Parse an uploaded export lazily.
+
+    Data exports (a ZIP archive or ``conversations.json``) and ChatGPT HTML
+    exports are decoded one conversation at a time straight from the file
+    (no parse tree, memory independent of the file size); other HTML
+    exports are read whole and parsed with ``parse_upload``. The first
+    conversation is decoded before returning, so an unusable file fails here
+    rather than half way through ingest.
+
+    Args:
+        upload: The uploaded file, opened in binary mode and seekable
+        filename: Name of the upload; its extension selects the format
+
+    Returns:
+        Iterator over the non-empty parsed conversations
+
+    Raises:
+        ValueError: If the file is not UTF-8, the format is unknown or no
+            conversation could be parsed
+    """
+    suffix = PurePath(filename).suffix.lower()
+    if suffix in EXPORT_EXTENSIONS:
+        if suffix == ".zip":
+            conversations = iter_zip_export(upload, INGEST_ALL_BRANCHES)
+        else:
+            conversations = iter_json_export(io.TextIOWrapper(upload, encoding='utf-8-sig'), INGEST_ALL_BRANCHES)
+        try:
+            first = next(conversations, None)
+        except UnicodeDecodeError as e:
+            raise ValueError(f"Export is not UTF-8: {e}") from e
+        if first is None:
+            raise ValueError("No conversations found in the export")
+        return itertools.chain([first], conversations)
+
+    text = io.TextIOWrapper(upload, encoding='utf-8')
+    if sniff_format(text.read(SNIFF_CHARS)) == "chatgpt":
+        text.seek(0)
+        conversations = _peek(ChatGPTParser("", all_branches=INGEST_ALL_BRANCHES).iter_conversations(text))
+        if conversations is not None:
+            return conversations
+    text.seek(0)
+    return iter(parse_upload(text.read()))
+
+
+async def _ingest_upload(file: UploadFile, auto_reprocess: bool) -> IngestResponse:
+    """Run an accepted upload through the ingest pipeline (shared by the upload endpoints)."""
+    start_time = time.time()
+
+    try:
+        # Conversations are decoded from the upload as the pipeline takes them
+        try:
+            parsed_conversations = await asyncio.to_thread(stream_upload, file.file, file.filename)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
 
-        # Process in concurrent batches
-        for batch_start in range(0, len(parsed_conversations), BATCH_SIZE):
-            batch = parsed_conversations[batch_start:batch_start + BATCH_SIZE]
-            batch_indices = range(batch_start, batch_start + len(batch))
-
-            print(f"[ingest] Processing batch {batch_start // BATCH_SIZE + 1} ({len(batch)} conversations concurrently)...")
-
-            tasks = [
-                _process_single_conversation(idx, data)
-                for idx, data in zip(batch_indices, batch)
-            ]
-            batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for result in batch_results:
-                if isinstance(result, Exception):
-                    print(f"Warning: Failed to ingest one conversation: {result}")
-                elif result is not None:
-                    results.append(result)
-                    ingested += 1
-                    total_messages += result.message_count
-                    last_id = result.conversation_id
-                    last_title = result.title
+        results = await run_ingest_pipeline(iterate_in_thread(parsed_conversations))
+        ingested = len(results)
+        print(f"[ingest] Stored {ingested} conversation(s) from {file.filename}")
+        total_messages = sum(r.message_count for r in results)
+        last_id = results[-1].conversation_id if results else None
+        last_title = results[-1].title if results else None
 
         if ingested == 0:
             raise HTTPException(status_code=422, detail="All conversations in the file were empty or failed processing")
@@ -273,6 +427,72 @@ async def ingest_single_chat(
         )
 
 
+@router.post("/", response_model=IngestResponse)
+async def ingest_single_chat(
+    file: UploadFile = File(..., description="HTML chat export file"),
+    auto_reprocess: bool = Form(default=False, description="Automatically re-run UMAP and clustering after ingestion")
+):
+    """
+    Ingest a single chat HTML file.
+
+    Accepts ChatGPT or Claude HTML exports, parses them, generates embeddings,
+    and stores in the database.
+
+    Args:
+        file: HTML chat export file (ChatGPT or Claude format)
+        auto_reprocess: If True, automatically re-run UMAP/clustering after ingestion (default: False)
+
+    Returns:
+        IngestResponse with conversation ID and metadata
+
+    Error Codes:
+        400: Invalid file format (non-HTML)
+        422: Unable to parse HTML or empty conversation
+        500: Server error (embedding generation failed, database error, etc.)
+    """
+    # Validate file type
+    if not file.filename.endswith('.html'):
+        raise HTTPException(
+            status_code=400,
+            detail="Only HTML files are accepted"
+        )
+
+    return await _ingest_upload(file, auto_reprocess)
+
+
+@router.post("/export", response_model=IngestResponse)
+async def ingest_data_export(
+    file: UploadFile = File(..., description="ChatGPT or Claude data export (.zip archive or conversations.json)"),
+    auto_reprocess: bool = Form(default=False, description="Automatically re-run UMAP and clustering after ingestion")
+):
+    """
+    Ingest a ChatGPT or Claude data export.
+
+    Accepts the ZIP archive downloaded from either service, or the
+    ``conversations.json`` file inside it. Conversations are streamed out of
+    the archive and decoded one at a time; nothing is extracted to disk and
+    no HTML is parsed.
+
+    Args:
+        file: Data export archive (.zip) or conversations.json
+        auto_reprocess: If True, automatically re-run UMAP/clustering after ingestion (default: False)
+
+    Returns:
+        IngestResponse with the last conversation ID and totals
+
+    Error Codes:
+        400: Not a .zip or .json file
+        422: Invalid archive or JSON, or no conversations with messages
+    """
+    if not file.filename.lower().endswith(EXPORT_EXTENSIONS):
+        raise HTTPException(
+            status_code=400,
+            detail="Only .zip or .json data exports are accepted"
+        )
+
+    return await _ingest_upload(file, auto_reprocess)
+
+
 @router.post("/batch", response_model=IngestBatchResponse)
 async def ingest_batch_chats(
     files: List[UploadFile] = File(..., description="Multiple HTML chat export files"),
@@ -451,6 +671,15 @@ async def reprocess_all_conversations():
 
             db.commit()
 
+            # Keep the vector store's cluster filter in step with the new clusters
+            try:
+                await update_store_metadata({
+                    conv_id: {'cluster_id': cluster_results[i]['cluster_id']}
+                    for i, conv_id in enumerate(conversation_ids)
+                })
+            except Exception as e:
+                print(f"Warning: Vector store metadata update failed: {e}")
+
             processing_time = (time.time() - start_time) * 1000
 
             # Get cluster statistics
@@ -0,0 +1,371 @@
+"""
+Background ingest jobs.
+
+``POST /api/ingest/jobs`` stores each uploaded file on disk, records an
+IngestJob row and returns immediately; an in-process worker pool then runs
+the normal ingest pipeline (``backend.api.ingest``) on it. Progress is
+persisted at most every INGEST_JOB_PROGRESS_SECONDS (off the event loop) and
+when the run ends or is interrupted, and can be polled with
+``GET /api/ingest/jobs/{id}`` or followed as Server-Sent Events on
+``GET /api/ingest/jobs/{id}/events``.
+
+Jobs that were queued or running when the server stopped are picked up again
+on startup; conversations already stored by the interrupted run are skipped.
+A job's conversation IDs are derived from the job ID and their position in the
+file, so conversations stored after the last progress write are recognised
+when the resumed run reaches them and are not stored twice.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Set
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+
+from backend.database import get_db_context
+from backend.models import IngestJob, IngestJobStatus, generate_uuid
+from backend.schemas import IngestJobResponse, IngestJobSubmitResponse, IngestResponse
+from backend.api.ingest import EXPORT_EXTENSIONS, reprocess_all_conversations, run_ingest_pipeline, stream_upload
+from backend.services.pipeline import iterate_in_thread
+
+# Uploaded files waiting for (or being) ingested
+INGEST_JOB_DIR = Path(os.getenv("INGEST_JOB_DIR", str(Path(__file__).parent.parent.parent / ".ingest_jobs")))
+# Jobs processed at the same time (each job already runs its conversations in parallel)
+INGEST_JOB_WORKERS = int(os.getenv("INGEST_JOB_WORKERS", "1"))
+# Seconds between progress checks of the SSE stream
+INGEST_JOB_POLL_SECONDS = float(os.getenv("INGEST_JOB_POLL_SECONDS", "1.0"))
+# Minimum seconds between progress writes of a running job
+INGEST_JOB_PROGRESS_SECONDS = float(os.getenv("INGEST_JOB_PROGRESS_SECONDS", "1.0"))
+
+# Upload types a job accepts
+JOB_EXTENSIONS = (".html",) + EXPORT_EXTENSIONS
+
+_FINISHED = (IngestJobStatus.COMPLETED, IngestJobStatus.FAILED)
+
+router = APIRouter(prefix="/api/ingest/jobs", tags=["ingest"])
+
+
+def job_to_response(job: IngestJob) -> IngestJobResponse:
+    """Build the status response of a job, including throughput and ETA of the current run."""
+    processed = len(job.completed_indices or [])
+    failed = len(job.failed_indices or [])
+    throughput = eta = None
+    if job.started_at is not None:
+        elapsed = ((job.finished_at or datetime.utcnow()) - job.started_at).total_seconds()
+        done_this_run = processed - (job.resumed_from or 0)
+        if elapsed > 0 and done_this_run > 0:
+            throughput = done_this_run / elapsed
+            if job.status == IngestJobStatus.RUNNING and job.total_conversations is not None:
+                eta = max(0, job.total_conversations - processed - failed) / throughput
+    return IngestJobResponse(
+        job_id=job.id,
+        filename=job.filename,
+        status=job.status.value,
+        total_conversations=job.total_conversations,
+        processed=processed,
+        failed=failed,
+        message_count=job.message_count or 0,
+        conversation_ids=job.conversation_ids or [],
+        throughput_per_sec=throughput,
+        eta_seconds=eta,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+def _update_job(job_id: str, **fields) -> None:
+    with get_db_context() as db:
+        job = db.query(IngestJob).filter(IngestJob.id == job_id).first()
+        if job is None:
+            return
+        for name, value in fields.items():
+            setattr(job, name, value)
+        db.commit()
+
+
+class IngestJobWorkers:
+    """
+    In-process worker pool draining a queue of job IDs.
+
+    Bound to the event loop it was started on; started by the app lifespan,
+    or lazily by the first submitted job.
+    """
+
+    def __init__(self, workers: int = INGEST_JOB_WORKERS):
+        self.workers = max(1, workers)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._active: Set[str] = set()  # queued or running job IDs
+
+    def _enqueue(self, job_id: str) -> bool:
+        if job_id in self._active:
+            return False
+        self._active.add(job_id)
+        self._queue.put_nowait(job_id)
+        return True
+
+    def _ensure_started(self) -> int:
+        """
+        Start the workers on the running loop if needed.
+
+        A fresh start re-queues every unfinished job. Returns the number re-queued.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return 0
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._active = set()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        with get_db_context() as db:
+            pending = (
+                db.query(IngestJob.id)
+                .filter(IngestJob.status.in_([IngestJobStatus.QUEUED, IngestJobStatus.RUNNING]))
+                .order_by(IngestJob.created_at)
+                .all()
+            )
+        return sum(self._enqueue(job_id) for (job_id,) in pending)
+
+    async def start(self) -> int:
+        """Start the workers and re-queue unfinished jobs. Returns the number re-queued."""
+        return self._ensure_started()
+
+    async def stop(self) -> None:
+        """Cancel the workers; interrupted jobs stay 'running' and resume on the next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+
+    async def submit(self, job_id: str) -> None:
+        """Queue a job (starting the workers if needed)."""
+        self._ensure_started()
+        self._enqueue(job_id)
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await run_job(job_id)
+            except Exception as e:
+                print(f"[ingest-job] {job_id} failed: {e}")
+                _update_job(job_id, status=IngestJobStatus.FAILED, error=str(e), finished_at=datetime.utcnow())
+            finally:
+                self._active.discard(job_id)
+
+
+job_workers = IngestJobWorkers()
+
+
+async def run_job(job_id: str) -> None:
+    """Ingest (or resume ingesting) one job's upload."""
+    with get_db_context() as db:
+        job = db.query(IngestJob).filter(IngestJob.id == job_id).first()
+        if job is None or job.status in _FINISHED:
+            return
+        done = list(job.completed_indices or [])
+        conversation_ids = list(job.conversation_ids or [])
+        failed: List[int] = []  # conversations not stored are retried by every run
+        message_count = job.message_count or 0
+        upload_path, filename, auto_reprocess = Path(job.upload_path), job.filename, job.auto_reprocess
+        job.status = IngestJobStatus.RUNNING
+        job.started_at = datetime.utcnow()
+        job.resumed_from = len(done)
+        job.failed_indices = []
+        db.commit()
+
+    def progress() -> dict:
+        return {
+            "completed_indices": list(done),
+            "conversation_ids": list(conversation_ids),
+            "failed_indices": list(failed),
+            "message_count": message_count,
+        }
+
+    # The upload is kept only when the server stops mid-job, so the job can resume
+    keep_upload = False
+    written = len(done)  # conversations covered by the last progress write (stored + failed)
+    upload = await asyncio.to_thread(open, upload_path, "rb")
+    try:
+        try:
+            parsed_conversations = await asyncio.to_thread(stream_upload, upload, filename)
+        except ValueError as e:
+            _update_job(job_id, status=IngestJobStatus.FAILED, error=str(e), finished_at=datetime.utcnow())
+            return
+        print(f"[ingest-job] {job_id}: streaming conversations, {len(done)} already stored")
+
+        async def counted():
+            # The total is only known once the export has been decoded to the
+            # end; record it right away so the ETA covers the rest of the run
+            total = 0
+            async for parsed in iterate_in_thread(parsed_conversations):
+                total += 1
+                yield parsed
+            await asyncio.to_thread(_update_job, job_id, total_conversations=total)
+
+        last_write = time.monotonic()
+
+        async def save_progress() -> None:
+            nonlocal written, last_write
+            if time.monotonic() - last_write >= INGEST_JOB_PROGRESS_SECONDS:
+                written, last_write = len(done) + len(failed), time.monotonic()
+                await asyncio.to_thread(_update_job, job_id, **progress())
+
+        async def stored(index: int, result: IngestResponse) -> None:
+            nonlocal message_count
+            done.append(index)
+            conversation_ids.append(result.conversation_id)
+            message_count += result.message_count
+            await save_progress()
+
+        async def dropped(index: int) -> None:
+            failed.append(index)
+            await save_progress()
+
+        await run_ingest_pipeline(
+            counted(), on_result=stored, skip=set(done), id_namespace=job_id, on_failure=dropped
+        )
+        written = len(done) + len(failed)
+        await asyncio.to_thread(_update_job, job_id, **progress())
+
+        if auto_reprocess and conversation_ids:
+            try:
+                await reprocess_all_conversations()
+            except Exception as e:
+                print(f"Warning: Auto-reprocessing failed: {e}")
+
+        if conversation_ids:
+            _update_job(job_id, status=IngestJobStatus.COMPLETED, finished_at=datetime.utcnow())
+        else:
+            _update_job(
+                job_id,
+                status=IngestJobStatus.FAILED,
+                error="All conversations in the file were empty or failed processing",
+                finished_at=datetime.utcnow(),
+            )
+    except BaseException as e:
+        keep_upload = isinstance(e, asyncio.CancelledError)
+        if len(done) + len(failed) > written:
+            # Keep what the interrupted run stored since the last progress write
+            _update_job(job_id, **progress())
+        raise
+    finally:
+        upload.close()
+        if not keep_upload:
+            upload_path.unlink(missing_ok=True)
+
+
+def _create_job(file: UploadFile, auto_reprocess: bool) -> IngestJobResponse:
+    """Copy an upload into INGEST_JOB_DIR and record its queued job."""
+    INGEST_JOB_DIR.mkdir(parents=True, exist_ok=True)
+    job_id = generate_uuid()
+    upload_path = INGEST_JOB_DIR / f"{job_id}{Path(file.filename).suffix.lower()}"
+    with open(upload_path, "wb") as out:
+        shutil.copyfileobj(file.file, out)
+    with get_db_context() as db:
+        job = IngestJob(
+            id=job_id,
+            filename=file.filename,
+            upload_path=str(upload_path),
+            auto_reprocess=auto_reprocess,
+        )
+        db.add(job)
+        db.commit()
+        return job_to_response(job)
+
+
+def _get_job_response(job_id: str) -> IngestJobResponse:
+    with get_db_context() as db:
+        job = db.query(IngestJob).filter(IngestJob.id == job_id).first()
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Ingest job {job_id} not found")
+        return job_to_response(job)
+
+
+@router.post("", response_model=IngestJobSubmitResponse, status_code=202)
+async def submit_ingest_jobs(
+    files: List[UploadFile] = File(..., description="HTML chat exports or data exports (.zip / conversations.json)"),
+    auto_reprocess: bool = Form(default=False, description="Re-run UMAP and clustering after each job")
+):
+    """
+    Queue chat exports for background ingestion.
+
+    Accepts HTML exports as well as data exports (a ZIP archive or its
+    ``conversations.json``).
+
+    Creates one job per file and returns immediately; poll
+    ``GET /api/ingest/jobs/{job_id}`` (or stream ``/events``) for progress.
+
+    Error Codes:
+        400: Invalid file format (not HTML, ZIP or JSON)
+    """
+    for file in files:
+        if not file.filename.lower().endswith(JOB_EXTENSIONS):
+            raise HTTPException(status_code=400, detail="Only HTML files or .zip/.json data exports are accepted")
+
+    jobs = [await asyncio.to_thread(_create_job, file, auto_reprocess) for file in files]
+    for job in jobs:
+        await job_workers.submit(job.job_id)
+    return IngestJobSubmitResponse(jobs=jobs)
+
+
+@router.get("", response_model=List[IngestJobResponse])
+async def list_ingest_jobs(limit: int = 50):
+    """List the most recent ingest jobs, newest first."""
+    with get_db_context() as db:
+        jobs = db.query(IngestJob).order_by(IngestJob.created_at.desc()).limit(limit).all()
+        return [job_to_response(job) for job in jobs]
+
+
+@router.get("/{job_id}", response_model=IngestJobResponse)
+async def get_ingest_job(job_id: str):
+    """
+    Get the progress of an ingest job.
+
+    Error Codes:
+        404: Unknown job
+    """
+    return await asyncio.to_thread(_get_job_response, job_id)
+
+
+@router.get("/{job_id}/events")
+async def stream_ingest_job(job_id: str):
+    """
+    Stream an ingest job's progress as Server-Sent Events.
+
+    Sends the job status (as for ``GET /api/ingest/jobs/{job_id}``) whenever
+    it changes and closes the stream once the job has finished.
+
+    Error Codes:
+        404: Unknown job
+    """
+    first = await asyncio.to_thread(_get_job_response, job_id)
+
+    async def events():
+        status, last = first, None
+        while True:
+            payload = status.model_dump_json(exclude={"throughput_per_sec", "eta_seconds"})
+            if payload != last:
+                last = payload
+                yield f"event: progress\ndata: {status.model_dump_json()}\n\n"
+            if status.status in (s.value for s in _FINISHED):
+                yield f"event: done\ndata: {json.dumps({'status': status.status})}\n\n"
+                return
+            await asyncio.sleep(INGEST_JOB_POLL_SECONDS)
+            status = await asyncio.to_thread(_get_job_response, job_id)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
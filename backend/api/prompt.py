@@ -14,6 +14,7 @@ import httpx
 from fastapi import APIRouter, HTTPException
 
 from backend.database import get_db_context
+from backend.http_clients import get_http_client
 from backend.models import Conversation
 from backend.schemas import GeneratePromptRequest, GeneratePromptResponse
 from backend.services.provider import get_chat_provider
@@ -120,24 +121,24 @@ async def generate_system_prompt(body: GeneratePromptRequest):
 
 async def _call_groq_prompt(user_msg: str) -> str:
     """Call Groq API for prompt generation (plain text, not JSON)."""
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        resp = await client.post(
-            GROQ_API_URL,
-            headers={
-                "Authorization": f"Bearer {GROQ_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": GROQ_MODEL,
-                "messages": [
-                    {"role": "system", "content": PROMPT_SYSTEM_MSG},
-                    {"role": "user", "content": user_msg},
-                ],
-                "temperature": 0.5,
-                "max_tokens": 800,
-            },
-        )
-        resp.raise_for_status()
+    client = get_http_client("groq")
+    resp = await client.post(
+        GROQ_API_URL,
+        headers={
+            "Authorization": f"Bearer {GROQ_API_KEY}",
+            "Content-Type": "application/json"
+        },
+        json={
+            "model": GROQ_MODEL,
+            "messages": [
+                {"role": "system", "content": PROMPT_SYSTEM_MSG},
+                {"role": "user", "content": user_msg},
+            ],
+            "temperature": 0.5,
+            "max_tokens": 800,
+        },
+    )
+    resp.raise_for_status()
 
     content = resp.json()["choices"][0]["message"]["content"].strip()
     if not content:
@@ -147,23 +148,23 @@ async def _call_groq_prompt(user_msg: str) -> str:
 
 async def _call_ollama_prompt(user_msg: str) -> str:
     """Call Ollama/Qwen for prompt generation."""
-    async with httpx.AsyncClient(timeout=120.0) as client:
-        resp = await client.post(
-            f"{OLLAMA_BASE_URL}/api/chat",
-            json={
-                "model": OLLAMA_MODEL,
-                "messages": [
-                    {"role": "system", "content": PROMPT_SYSTEM_MSG},
-                    {"role": "user", "content": user_msg},
-                ],
-                "stream": False,
-                "options": {
-                    "temperature": 0.5,
-                    "num_predict": 800,
-                },
+    client = get_http_client("ollama")
+    resp = await client.post(
+        f"{OLLAMA_BASE_URL}/api/chat",
+        json={
+            "model": OLLAMA_MODEL,
+            "messages": [
+                {"role": "system", "content": PROMPT_SYSTEM_MSG},
+                {"role": "user", "content": user_msg},
+            ],
+            "stream": False,
+            "options": {
+                "temperature": 0.5,
+                "num_predict": 800,
             },
-        )
-        resp.raise_for_status()
+        },
+    )
+    resp.raise_for_status()
 
     content = resp.json().get("message", {}).get("content", "").strip()
     if not content:
@@ -12,23 +12,107 @@ from fastapi import APIRouter, HTTPException
 from sqlalchemy import or_
 from backend.database import get_db_context
 from backend.models import Conversation, Embedding
-from backend.schemas import SearchRequest, SearchResponse, SearchResultItem
-from backend.services.vector_store import search_store, get_vector_store_service
-from backend.services.embedder import generate_embedding
+from backend.schemas import (
+    BatchSearchRequest,
+    BatchSearchResponse,
+    SearchRequest,
+    SearchResponse,
+    SearchResultItem,
+)
+from backend.services.chunker import EMBEDDING_CHUNKING
+from backend.services.vector_store import (
+    get_chunk_store_service,
+    get_vector_store_service,
+    hybrid_search_store,
+    hybrid_search_store_many,
+)
+from backend.services.embedder import (
+    generate_query_embedding,
+    generate_query_embeddings,
+    get_query_cache_stats,
+)
 from backend.services.backboard_evaluator import get_backboard_evaluator, rerank_by_scores
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/search", tags=["search"])
 
+# Minimum cosine similarity for vector store hits
+SCORE_THRESHOLD = 0.3
+
+
+def _build_result_items(
+    hits: List[Dict],
+    conversations: Dict[str, Conversation],
+    limit: int,
+) -> List[SearchResultItem]:
+    """
+    Join vector store hits with their SQLite rows and rank.
+
+    Cluster/topic filters are applied by the vector store before scoring.
+
+    Args:
+        hits: Vector store results (conversation_id, score, content, ...)
+        conversations: Conversation rows (with embeddings) keyed by id
+        limit: Maximum number of items to return
+
+    Returns:
+        SearchResultItems sorted by descending score
+    """
+    results = []
+    for r in hits:
+        conv = conversations.get(r["conversation_id"])
+        if conv is None:
+            continue
+
+        content = r.get("content", "")
+        emb = conv.embedding
+        results.append(
+            SearchResultItem(
+                conversation_id=conv.id,
+                title=conv.title,
+                summary=conv.summary or "",
+                topics=conv.topics or [],
+                message_count=conv.message_count,
+                created_at=conv.created_at,
+                start_x=emb.start_x if emb else 0.0,
+                start_y=emb.start_y if emb else 0.0,
+                start_z=emb.start_z if emb else 0.0,
+                end_x=emb.end_x if emb else 0.0,
+                end_y=emb.end_y if emb else 0.0,
+                end_z=emb.end_z if emb else 0.0,
+                magnitude=emb.magnitude if emb else 1.0,
+                cluster_id=conv.cluster_id,
+                cluster_name=conv.cluster_name,
+                score=r["score"],
+                message_preview=content[:200] + "..." if content else None,
+            )
+        )
+
+    results.sort(key=lambda x: x.score, reverse=True)
+    return results[:limit]
+
+
+def _fetch_conversations(db, conversation_ids) -> Dict[str, Conversation]:
+    """Load conversations (that have an embedding) by id."""
+    conversations = (
+        db.query(Conversation)
+        .join(Embedding)
+        .filter(Conversation.id.in_(list(conversation_ids)))
+        .all()
+    )
+    return {conv.id: conv for conv in conversations}
+
 
 @router.post("/", response_model=SearchResponse)
 async def search_conversations(request: SearchRequest):
     """
-    Search conversations using semantic similarity via local vector store.
+    Hybrid keyword + semantic search over the local vector store.
 
-    Embeds the query with nomic-embed-text, searches the vector store for nearest
-    neighbours, then fetches full conversation metadata from SQLite.
+    Embeds the query with nomic-embed-text, ranks conversations by
+    ``semantic_weight * cosine + keyword_weight * BM25`` (see
+    VectorStoreService.hybrid_search), then fetches full conversation metadata
+    from SQLite. With ``semantic_weight == 0`` the query is not embedded at all.
 
     Args:
         request: SearchRequest with query, limit, and filters
@@ -37,23 +121,38 @@ async def search_conversations(request: SearchRequest):
         SearchResponse with matching conversations and metadata
 
     Process:
-        1. Generate query embedding via Ollama (nomic-embed-text)
-        2. Search local vector store for nearest conversations
+        1. Generate query embedding via Ollama (nomic-embed-text), unless
+           semantic_weight is 0 or the query is in the embedding LRU
+        2. Rank conversations matching the cluster/topic filters by the
+           weighted keyword + semantic score
         3. Fetch full conversation metadata from SQLite
-        4. Apply additional filters (cluster, topics)
-        5. Return ranked results with 3D coordinates
+        4. Return ranked results with 3D coordinates
     """
     start_time = time.time()
 
     try:
-        # Step 1: Generate query embedding
-        query_embedding = await generate_embedding(request.query, use_cache=False)
+        if request.keyword_weight + request.semantic_weight <= 0:
+            raise HTTPException(
+                status_code=400,
+                detail="keyword_weight and semantic_weight cannot both be 0"
+            )
 
-        # Step 2: Search vector store
-        chroma_results = await search_store(
+        # Step 1: Generate query embedding (exact-term queries skip the round trip)
+        query_embedding = None
+        if request.semantic_weight > 0:
+            query_embedding = await generate_query_embedding(request.query)
+
+        # Step 2: Hybrid search over the vector store
+        chroma_results = await hybrid_search_store(
+            query_text=request.query,
             query_embedding=query_embedding,
-            max_results=request.limit * 3,
-            score_threshold=0.3,
+            max_results=request.limit,
+            score_threshold=SCORE_THRESHOLD,
+            keyword_weight=request.keyword_weight,
+            semantic_weight=request.semantic_weight,
+            nprobe=request.nprobe,
+            cluster_filter=request.cluster_filter,
+            topic_filter=request.topic_filter,
         )
 
         if not chroma_results:
@@ -65,62 +164,10 @@ async def search_conversations(request: SearchRequest):
                 search_time_ms=search_time,
             )
 
-        # Step 3: Build score + preview maps keyed by conversation_id
-        conv_scores = {}
-        conv_previews = {}
-        for r in chroma_results:
-            cid = r["conversation_id"]
-            conv_scores[cid] = r["score"]
-            content = r.get("content", "")
-            conv_previews[cid] = content[:200] + "..." if content else None
-
-        # Step 4: Fetch full metadata from SQLite
+        # Step 3: Fetch full metadata from SQLite
         with get_db_context() as db:
-            conversations = (
-                db.query(Conversation)
-                .join(Embedding)
-                .filter(Conversation.id.in_(list(conv_scores.keys())))
-                .all()
-            )
-
-            results = []
-            for conv in conversations:
-                score = conv_scores.get(conv.id, 0.0)
-
-                # Apply filters
-                if request.cluster_filter is not None:
-                    if conv.cluster_id != request.cluster_filter:
-                        continue
-                if request.topic_filter:
-                    conv_topics = set(conv.topics or [])
-                    if not any(t in conv_topics for t in request.topic_filter):
-                        continue
-
-                emb = conv.embedding
-                results.append(
-                    SearchResultItem(
-                        conversation_id=conv.id,
-                        title=conv.title,
-                        summary=conv.summary or "",
-                        topics=conv.topics or [],
-                        message_count=conv.message_count,
-                        created_at=conv.created_at,
-                        start_x=emb.start_x if emb else 0.0,
-                        start_y=emb.start_y if emb else 0.0,
-                        start_z=emb.start_z if emb else 0.0,
-                        end_x=emb.end_x if emb else 0.0,
-                        end_y=emb.end_y if emb else 0.0,
-                        end_z=emb.end_z if emb else 0.0,
-                        magnitude=emb.magnitude if emb else 1.0,
-                        cluster_id=conv.cluster_id,
-                        cluster_name=conv.cluster_name,
-                        score=score,
-                        message_preview=conv_previews.get(conv.id),
-                    )
-                )
-
-            results.sort(key=lambda x: x.score, reverse=True)
-            results = results[: request.limit]
+            conversations = _fetch_conversations(db, {r["conversation_id"] for r in chroma_results})
+            results = _build_result_items(chroma_results, conversations, request.limit)
 
             # Optional Backboard.io evaluation
             evaluation = None
@@ -146,6 +193,8 @@ async def search_conversations(request: SearchRequest):
                 evaluation=evaluation,
             )
 
+    except HTTPException:
+        raise
     except Exception as e:
         search_time = (time.time() - start_time) * 1000
         raise HTTPException(
@@ -154,17 +203,99 @@ async def search_conversations(request: SearchRequest):
         )
 
 
+@router.post("/batch", response_model=BatchSearchResponse)
+async def search_conversations_batch(request: BatchSearchRequest):
+    """
+    Run several searches in one round trip.
+
+    Every query is ranked exactly like ``POST /api/search/`` with the same
+    ``keyword_weight`` / ``semantic_weight``, so a query returns the same
+    conversations from either endpoint. All uncached queries are embedded with
+    one provider call, their cosine similarities come from a single
+    matrix-matrix product, BM25 scores are fused per query, and the hits are
+    hydrated from SQLite with one query. With ``semantic_weight == 0``
+    nothing is embedded.
+    Filters apply to every query; Backboard evaluation is not available here.
+
+    Args:
+        request: BatchSearchRequest with queries, limit, weights, and filters
+
+    Returns:
+        BatchSearchResponse with one SearchResponse per query, in order
+    """
+    start_time = time.time()
+
+    try:
+        if request.keyword_weight + request.semantic_weight <= 0:
+            raise HTTPException(
+                status_code=400,
+                detail="keyword_weight and semantic_weight cannot both be 0"
+            )
+
+        query_embeddings = None
+        if request.semantic_weight > 0:
+            query_embeddings = await generate_query_embeddings(request.queries)
+
+        hits_per_query = await hybrid_search_store_many(
+            query_texts=request.queries,
+            query_embeddings=query_embeddings,
+            max_results=request.limit,
+            score_threshold=SCORE_THRESHOLD,
+            keyword_weight=request.keyword_weight,
+            semantic_weight=request.semantic_weight,
+            nprobe=request.nprobe,
+            cluster_filter=request.cluster_filter,
+            topic_filter=request.topic_filter,
+        )
+
+        conversation_ids = {r["conversation_id"] for hits in hits_per_query for r in hits}
+        with get_db_context() as db:
+            conversations = _fetch_conversations(db, conversation_ids) if conversation_ids else {}
+            responses = []
+            for query, hits in zip(request.queries, hits_per_query):
+                results = _build_result_items(hits, conversations, request.limit)
+                responses.append(
+                    SearchResponse(
+                        query=query,
+                        results=results,
+                        total_results=len(results),
+                        search_time_ms=(time.time() - start_time) * 1000,
+                    )
+                )
+
+        return BatchSearchResponse(
+            results=responses,
+            total_queries=len(responses),
+            search_time_ms=(time.time() - start_time) * 1000,
+        )
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Batch search failed: {str(e)}"
+        )
+
+
 @router.get("/stats")
 async def get_search_stats():
     """
-    Get local vector store statistics.
+    Get local vector store and query embedding cache statistics.
 
     Returns:
-        Dictionary with collection stats including document count
+        Dictionary with collection stats including document count, plus
+        ``query_embedding_cache`` hit/miss counters and, with chunked
+        embeddings enabled, ``chunk_store`` stats
     """
     try:
         service = get_vector_store_service()
-        stats = service.get_stats()
+        stats = dict(service.get_stats())
+        stats["query_embedding_cache"] = get_query_cache_stats()
+        if EMBEDDING_CHUNKING:
+            stats["chunk_store"] = get_chunk_store_service().get_stats()
         return stats
     except Exception as e:
         raise HTTPException(
@@ -21,6 +21,7 @@ from fastapi.responses import StreamingResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
+from backend.http_clients import close_http_clients, get_http_client
 from .config import config, backboard_config
 
 # Configure logging
@@ -98,104 +99,104 @@ TOOLS = [
 
 async def execute_search_memory(query: str, limit: int = 5) -> str:
     """Execute search_memory tool."""
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.post(
-                f"{config.backend_api_url}/api/search/",
-                json={"query": query, "limit": limit}
-            )
-            response.raise_for_status()
-            data = response.json()
-            results = data.get('results', [])
+    client = get_http_client("cortex_api")
+    try:
+        response = await client.post(
+            f"{config.backend_api_url}/api/search/",
+            json={"query": query, "limit": limit}
+        )
+        response.raise_for_status()
+        data = response.json()
+        results = data.get('results', [])
 
-            if not results:
-                return f"No conversations found matching '{query}'. Try using different keywords or broader terms."
+        if not results:
+            return f"No conversations found matching '{query}'. Try using different keywords or broader terms."
 
-            formatted_results = []
-            for idx, r in enumerate(results, 1):
-                result_text = f"**Result {idx}** (Relevance: {r.get('score', 0.0):.2f})\n"
-                result_text += f"- Conversation ID: {r.get('conversation_id', 'N/A')}\n"
-                result_text += f"- Title: {r.get('title', 'Untitled')}\n"
-                result_text += f"- Summary: {r.get('summary', 'No summary available')}\n"
+        formatted_results = []
+        for idx, r in enumerate(results, 1):
+            result_text = f"**Result {idx}** (Relevance: {r.get('score', 0.0):.2f})\n"
+            result_text += f"- Conversation ID: {r.get('conversation_id', 'N/A')}\n"
+            result_text += f"- Title: {r.get('title', 'Untitled')}\n"
+            result_text += f"- Summary: {r.get('summary', 'No summary available')}\n"
 
-                topics = r.get('topics', [])
-                if topics:
-                    result_text += f"- Topics: {', '.join(topics)}\n"
+            topics = r.get('topics', [])
+            if topics:
+                result_text += f"- Topics: {', '.join(topics)}\n"
 
-                preview = r.get('message_preview')
-                if preview:
-                    truncated = preview[:300] + "..." if len(preview) > 300 else preview
-                    result_text += f"- Preview: {truncated}\n"
+            preview = r.get('message_preview')
+            if preview:
+                truncated = preview[:300] + "..." if len(preview) > 300 else preview
+                result_text += f"- Preview: {truncated}\n"
 
-                formatted_results.append(result_text)
+            formatted_results.append(result_text)
 
-            search_time = data.get('search_time_ms', 0)
-            header = f"Found {len(results)} relevant conversation(s) for '{query}' (searched in {search_time:.0f}ms)\n\n"
-            return header + "\n".join(formatted_results)
+        search_time = data.get('search_time_ms', 0)
+        header = f"Found {len(results)} relevant conversation(s) for '{query}' (searched in {search_time:.0f}ms)\n\n"
+        return header + "\n".join(formatted_results)
 
-        except httpx.HTTPError as e:
-            logger.error(f"HTTP error in search_memory: {e}")
-            return f"Error searching memory: {str(e)}"
-        except Exception as e:
-            logger.error(f"Error in search_memory: {e}", exc_info=True)
-            return f"Error executing search: {str(e)}"
+    except httpx.HTTPError as e:
+        logger.error(f"HTTP error in search_memory: {e}")
+        return f"Error searching memory: {str(e)}"
+    except Exception as e:
+        logger.error(f"Error in search_memory: {e}", exc_info=True)
+        return f"Error executing search: {str(e)}"
 
 
 async def execute_fetch_chat(conversation_id: str) -> str:
     """Execute fetch_chat tool."""
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.get(
-                f"{config.backend_api_url}/api/chats/{conversation_id}"
-            )
-            response.raise_for_status()
-            data = response.json()
+    client = get_http_client("cortex_api")
+    try:
+        response = await client.get(
+            f"{config.backend_api_url}/api/chats/{conversation_id}"
+        )
+        response.raise_for_status()
+        data = response.json()
 
-            result_text = f"**Conversation Details**\n\n"
-            result_text += f"- ID: {data.get('id', 'N/A')}\n"
-            result_text += f"- Title: {data.get('title', 'Untitled')}\n"
+        result_text = f"**Conversation Details**\n\n"
+        result_text += f"- ID: {data.get('id', 'N/A')}\n"
+        result_text += f"- Title: {data.get('title', 'Untitled')}\n"
 
-            summary = data.get('summary')
-            if summary:
-                result_text += f"- Summary: {summary}\n"
+        summary = data.get('summary')
+        if summary:
+            result_text += f"- Summary: {summary}\n"
 
-            topics = data.get('topics', [])
-            if topics:
-                result_text += f"- Topics: {', '.join(topics)}\n"
+        topics = data.get('topics', [])
+        if topics:
+            result_text += f"- Topics: {', '.join(topics)}\n"
 
-            message_count = data.get('message_count', 0)
-            result_text += f"- Message Count: {message_count}\n"
+        message_count = data.get('message_count', 0)
+        result_text += f"- Message Count: {message_count}\n"
 
-            created_at = data.get('created_at')
-            if created_at:
-                result_text += f"- Created: {created_at}\n"
+        created_at = data.get('created_at')
+        if created_at:
+            result_text += f"- Created: {created_at}\n"
 
-            messages = data.get('messages', [])
-            if messages:
-                result_text += f"\n**Conversation Transcript** ({len(messages)} messages):\n\n"
+        messages = data.get('messages', [])
+        if messages:
+            result_text += f"\n**Conversation Transcript** ({len(messages)} messages):\n\n"
 
-                for msg in messages:
-                    role = msg.get('role', 'unknown').upper()
-                    content = msg.get('content', '')
-                    timestamp = msg.get('created_at', '')
+            for msg in messages:
+                role = msg.get('role', 'unknown').upper()
+                content = msg.get('content', '')
+                timestamp = msg.get('created_at', '')
 
-                    result_text += f"**{role}**"
-                    if timestamp:
-                        result_text += f" ({timestamp})"
-                    result_text += f":\n{content}\n\n"
-            else:
-                result_text += "\nNo messages found in this conversation.\n"
+                result_text += f"**{role}**"
+                if timestamp:
+                    result_text += f" ({timestamp})"
+                result_text += f":\n{content}\n\n"
+        else:
+            result_text += "\nNo messages found in this conversation.\n"
 
-            return result_text
+        return result_text
 
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                return f"Conversation not found: {conversation_id}"
-            logger.error(f"HTTP error in fetch_chat: {e}")
-            return f"Error fetching chat: {str(e)}"
-        except Exception as e:
-            logger.error(f"Error in fetch_chat: {e}", exc_info=True)
-            return f"Error fetching chat: {str(e)}"
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return f"Conversation not found: {conversation_id}"
+        logger.error(f"HTTP error in fetch_chat: {e}")
+        return f"Error fetching chat: {str(e)}"
+    except Exception as e:
+        logger.error(f"Error in fetch_chat: {e}", exc_info=True)
+        return f"Error fetching chat: {str(e)}"
 
 
 async def execute_tool(name: str, arguments: Dict[str, Any]) -> str:
@@ -304,6 +305,7 @@ async def lifespan(app: FastAPI):
     logger.info(f"Backend API URL: {config.backend_api_url}")
     yield
     logger.info("Shutting down MCP HTTP Server")
+    await close_http_clients()
 
 
 app = FastAPI(
@@ -339,9 +341,9 @@ async def health():
     """Health check for the MCP server."""
     # Check backend connectivity
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{config.backend_api_url}/health")
-            backend_healthy = response.status_code == 200
+        client = get_http_client("cortex_api")
+        response = await client.get(f"{config.backend_api_url}/health", timeout=5.0)
+        backend_healthy = response.status_code == 200
     except Exception:
         backend_healthy = False
 
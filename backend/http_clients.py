@@ -0,0 +1,77 @@
+"""
+Shared, long-lived HTTP clients for outbound provider calls.
+
+Opening a new httpx.AsyncClient per request costs a TCP (and TLS) handshake
+for every embedding, summary or tool call. Instead each provider gets one
+pooled client with keep-alive, its own connection limits and default timeout,
+and HTTP/2 when the optional ``h2`` package is installed.
+
+Clients are bound to the event loop that created them, so the registry is
+per loop: a client created under one loop (e.g. a test's asyncio.run) is
+replaced, not reused, under another. close_http_clients() runs in the
+FastAPI lifespan shutdown.
+"""
+
+import asyncio
+import importlib.util
+from typing import Dict, Tuple
+
+import httpx
+
+# HTTP/2 needs the optional "h2" package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Per-provider pool settings: (default timeout seconds, max connections, max keep-alive)
+PROVIDER_SETTINGS: Dict[str, Tuple[float, int, int]] = {
+    "ollama": (120.0, 8, 8),
+    "huggingface": (120.0, 16, 8),
+    "groq": (60.0, 4, 4),
+    "backboard": (30.0, 8, 4),
+    "cortex_api": (30.0, 16, 8),
+}
+KEEPALIVE_EXPIRY = 30.0
+
+_clients: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+
+def _create_client(provider: str) -> httpx.AsyncClient:
+    timeout, max_connections, max_keepalive = PROVIDER_SETTINGS[provider]
+    return httpx.AsyncClient(
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        http2=HTTP2_AVAILABLE,
+    )
+
+
+def get_http_client(provider: str) -> httpx.AsyncClient:
+    """
+    Pooled client for ``provider`` (a key of PROVIDER_SETTINGS).
+
+    Must be called from a running event loop. Callers use the client
+    directly and never close it.
+    """
+    if provider not in PROVIDER_SETTINGS:
+        raise ValueError(f"Unknown HTTP client provider: {provider}")
+
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(provider)
+    if entry is None or entry[0] is not loop or entry[1].is_closed:
+        client = _create_client(provider)
+        _clients[provider] = (loop, client)
+        return client
+    return entry[1]
+
+
+async def close_http_clients() -> None:
+    """Close every client created under the running loop and empty the registry."""
+    loop = asyncio.get_running_loop()
+    entries = list(_clients.values())
+    _clients.clear()
+    for client_loop, client in entries:
+        # Clients of other (finished) loops cannot be closed from here; drop them
+        if client_loop is loop and not client.is_closed:
+            await client.aclose()
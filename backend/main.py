@@ -3,7 +3,7 @@ CORTEX Backend API
 
 FastAPI application for chat memory visualization and retrieval.
 Provides endpoints for:
-- Chat ingestion (HTML upload)
+- Chat ingestion (HTML upload, direct or as background jobs)
 - Hybrid search (semantic + keyword)
 - Conversation retrieval
 - 3D visualization data
@@ -23,11 +23,14 @@ load_dotenv()
 
 # Import database and models
 from backend.database import init_db, engine
+from backend.http_clients import close_http_clients, get_http_client
 from backend.schemas import HealthResponse
 from backend.services.provider import get_embedding_provider, get_chat_provider
+from backend.services import local_embedder
 
 # Import routers
 from backend.api.ingest import router as ingest_router
+from backend.api.ingest_jobs import job_workers, router as ingest_jobs_router
 from backend.api.chats import router as chats_router
 from backend.api.search import router as search_router
 from backend.api.prompt import router as prompt_router
@@ -61,6 +64,11 @@ async def lifespan(app: FastAPI):
             print("[OK] HuggingFace API token is set")
         else:
             print("[WARNING] EMBEDDING_PROVIDER=huggingface but HF_API_TOKEN is not set!")
+    elif emb_provider == "local":
+        if local_embedder.is_available():
+            print(f"[OK] Local embedding model: {local_embedder.LOCAL_EMBEDDING_MODEL}")
+        else:
+            print("[WARNING] EMBEDDING_PROVIDER=local but sentence-transformers is not installed!")
 
     if chat_provider == "groq":
         if os.getenv("GROQ_API_KEY"):
@@ -78,12 +86,33 @@ async def lifespan(app: FastAPI):
         except Exception:
             print("[WARNING] Ollama not reachable at localhost:11434 (local provider will fail)")
 
+    # Backfill cluster/topic filter metadata in the vector store
+    try:
+        from backend.services.vector_store import sync_store_filters
+        synced = sync_store_filters()
+        if synced:
+            print(f"[OK] Synced search filters for {synced} conversations")
+    except Exception as e:
+        print(f"[WARNING] Vector store filter sync failed: {e}")
+
+    # Start background ingest workers (resumes jobs interrupted by a restart)
+    try:
+        resumed = await job_workers.start()
+        if resumed:
+            print(f"[OK] Resuming {resumed} ingest job(s)")
+    except Exception as e:
+        print(f"[WARNING] Ingest job workers failed to start: {e}")
+
     print("CORTEX backend ready!")
 
     yield
 
     # Shutdown
     print("Shutting down CORTEX backend")
+    await job_workers.stop()
+    from backend.services.vector_store import close_vector_store_service
+    close_vector_store_service()
+    await close_http_clients()
     engine.dispose()
     print("Goodbye!")
 
@@ -150,11 +179,14 @@ async def health_check():
     ollama_connected = False
     if emb_provider == "huggingface":
         embedding_ready = bool(os.getenv("HF_API_TOKEN"))
+    elif emb_provider == "local":
+        embedding_ready = local_embedder.is_available()
     else:
         # Ollama — check connectivity
         try:
-            import httpx
-            resp = httpx.get(os.getenv("OLLAMA_BASE_URL", "http://localhost:11434") + "/api/tags", timeout=2)
+            resp = await get_http_client("ollama").get(
+                os.getenv("OLLAMA_BASE_URL", "http://localhost:11434") + "/api/tags", timeout=2
+            )
             ollama_connected = resp.status_code == 200
             embedding_ready = ollama_connected
         except Exception:
@@ -170,8 +202,9 @@ async def health_check():
             chat_ready = True
         else:
             try:
-                import httpx
-                resp = httpx.get(os.getenv("OLLAMA_BASE_URL", "http://localhost:11434") + "/api/tags", timeout=2)
+                resp = await get_http_client("ollama").get(
+                    os.getenv("OLLAMA_BASE_URL", "http://localhost:11434") + "/api/tags", timeout=2
+                )
                 ollama_connected = resp.status_code == 200
                 chat_ready = ollama_connected
             except Exception:
@@ -215,6 +248,7 @@ async def root():
 
 # Include routers
 app.include_router(ingest_router)
+app.include_router(ingest_jobs_router)
 app.include_router(chats_router)
 app.include_router(search_router)
 app.include_router(prompt_router)
@@ -1,7 +1,7 @@
 """
 SQLAlchemy database models for Cortex.
 """
-from sqlalchemy import Column, String, Integer, Float, Text, DateTime, ForeignKey, JSON, Enum as SQLEnum
+from sqlalchemy import Boolean, Column, String, Integer, Float, Text, DateTime, ForeignKey, JSON, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.database import Base
@@ -111,6 +111,48 @@ class Embedding(Base):
         return f"<Embedding(conversation_id={self.conversation_id}, magnitude={self.magnitude})>"
 
 
+class IngestJobStatus(str, enum.Enum):
+    """Enum for background ingest job states."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class IngestJob(Base):
+    """
+    IngestJob model tracking one uploaded file ingested in the background.
+    
+    The upload is kept on disk at upload_path until the job finishes, and
+    completed_indices records which of the file's conversations are already
+    stored, so an interrupted job resumes where it stopped.
+    """
+    __tablename__ = "ingest_jobs"
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    filename = Column(String(255), nullable=False)
+    upload_path = Column(String(500), nullable=False)
+    status = Column(SQLEnum(IngestJobStatus), nullable=False, default=IngestJobStatus.QUEUED, index=True)
+    auto_reprocess = Column(Boolean, nullable=False, default=False)
+    error = Column(Text, nullable=True)
+
+    # Progress
+    total_conversations = Column(Integer, nullable=True)  # Known once the file is parsed
+    completed_indices = Column(JSON, default=list)  # Positions of stored conversations in the file
+    failed_indices = Column(JSON, default=list)  # Positions that were empty or failed in the current run
+    conversation_ids = Column(JSON, default=list)
+    message_count = Column(Integer, default=0)
+    resumed_from = Column(Integer, default=0)  # Conversations already done when the current run started
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)  # Start of the current run
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<IngestJob(id={self.id}, status={self.status}, file={self.filename})>"
+
+
 # Index definitions for better query performance
 from sqlalchemy import Index
 
@@ -18,9 +18,10 @@ Usage:
         result = parser.parse()
 """
 
-from backend.parsers.base_parser import BaseParser, ParserFactory
+from backend.parsers.base_parser import BaseParser, ParserFactory, sniff_format
 from backend.parsers.chatgpt_parser import ChatGPTParser
 from backend.parsers.claude_parser import ClaudeParser
+from backend.parsers.json_export import iter_json_export, iter_zip_export
 from typing import Optional, Dict, List
 
 
@@ -70,14 +71,15 @@ def parse_all_html(html_content: str) -> List[Dict]:
     Returns:
         List of parsed conversation dicts (may be empty).
     """
-    fmt = ParserFactory.detect_format_type(html_content)
+    # Any parse tree built for detection is reused by the parser
+    fmt, soup = ParserFactory.detect(html_content)
 
     if fmt == 'chatgpt':
-        parser = ChatGPTParser(html_content)
+        parser = ChatGPTParser(html_content, soup=soup)
         return parser.parse_all()
 
     # For other formats, fall back to single parse
-    parser = ParserFactory.create_parser(html_content)
+    parser = ParserFactory.create_parser(html_content, soup=soup)
     if parser:
         result = parser.parse()
         if result and result.get('messages'):
@@ -113,4 +115,7 @@ __all__ = [
     'parse_html',
     'parse_all_html',
     'detect_format',
+    'sniff_format',
+    'iter_json_export',
+    'iter_zip_export',
 ]
@@ -3,26 +3,71 @@ Base parser class for chat conversation HTML exports.
 
 Provides common utilities for HTML parsing, text normalization,
 and parser type detection.
+
+Building the BeautifulSoup tree is by far the most expensive step for large
+exports, so it is built at most once per upload: format detection first
+sniffs the raw text (``sniff_format``) and only falls back to a parse tree
+when that is inconclusive, parsers build their tree lazily on first use, and
+a tree built for detection is handed on to the selected parser.
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from bs4 import BeautifulSoup
 import re
 from datetime import datetime
 
 
+# Characters of the document searched for the <title> tag when sniffing
+SNIFF_CHARS = 64 * 1024
+_TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title>', re.I | re.S)
+
+
+def make_soup(html_content: str) -> BeautifulSoup:
+    """Build the parse tree of an export."""
+    return BeautifulSoup(html_content, 'lxml')
+
+
+def sniff_format(html_content: str) -> Optional[str]:
+    """
+    Detect the format from the <title> tag without building a parse tree.
+    
+    Args:
+        html_content: Raw HTML string
+        
+    Returns:
+        'chatgpt', 'claude', or None if the title does not decide it
+    """
+    match = _TITLE_RE.search(html_content, 0, SNIFF_CHARS)
+    if not match:
+        return None
+    title_text = match.group(1).lower()
+    if 'chatgpt' in title_text:
+        return 'chatgpt'
+    if 'claude' in title_text:
+        return 'claude'
+    return None
+
+
 class BaseParser(ABC):
     """Abstract base class for chat conversation parsers."""
     
-    def __init__(self, html_content: str):
+    def __init__(self, html_content: str, soup: Optional[BeautifulSoup] = None):
         """
         Initialize parser with HTML content.
         
         Args:
             html_content: Raw HTML string of the conversation export
+            soup: Parse tree of html_content if one was already built
         """
         self.html_content = html_content
-        self.soup = BeautifulSoup(html_content, 'lxml')
+        self._soup = soup
+    
+    @property
+    def soup(self) -> BeautifulSoup:
+        """Parse tree of the export (built on first use)."""
+        if self._soup is None:
+            self._soup = make_soup(self.html_content)
+        return self._soup
     
     @abstractmethod
     def parse(self) -> Dict:
@@ -233,12 +278,16 @@ class ParserFactory:
     """Factory class for creating appropriate parser based on HTML content."""
     
     @staticmethod
-    def create_parser(html_content: str) -> Optional[BaseParser]:
+    def create_parser(html_content: str, soup: Optional[BeautifulSoup] = None) -> Optional[BaseParser]:
         """
         Detect HTML format and create appropriate parser.
         
+        Every candidate parser's detection runs on the same parse tree,
+        which the returned parser keeps.
+        
         Args:
             html_content: Raw HTML string
+            soup: Parse tree of html_content if one was already built
             
         Returns:
             Instance of appropriate parser or None if format not recognized
@@ -247,28 +296,54 @@ class ParserFactory:
         from backend.parsers.chatgpt_parser import ChatGPTParser
         from backend.parsers.claude_parser import ClaudeParser
         
+        if soup is None:
+            soup = make_soup(html_content)
+        
         # Try each parser's detection method
         parsers = [ChatGPTParser, ClaudeParser]
         
         for parser_class in parsers:
-            parser = parser_class(html_content)
+            parser = parser_class(html_content, soup=soup)
             if parser.detect_format():
                 return parser
         
         return None
     
     @staticmethod
-    def detect_format_type(html_content: str) -> Optional[str]:
+    def detect(html_content: str) -> Tuple[Optional[str], Optional[BeautifulSoup]]:
+        """
+        Detect the format type, building a parse tree only if sniffing is inconclusive.
+        
+        Args:
+            html_content: Raw HTML string
+            
+        Returns:
+            (format type or None, the parse tree built for detection or None)
+            — pass the tree on to the parser so it is not built twice.
+        """
+        format_type = sniff_format(html_content)
+        if format_type:
+            return format_type, None
+        soup = make_soup(html_content)
+        return ParserFactory.detect_format_type(html_content, soup=soup), soup
+    
+    @staticmethod
+    def detect_format_type(html_content: str, soup: Optional[BeautifulSoup] = None) -> Optional[str]:
         """
         Detect the format type without creating a parser.
         
         Args:
             html_content: Raw HTML string
+            soup: Parse tree of html_content if one was already built
             
         Returns:
             Format type string ('chatgpt', 'claude') or None
         """
-        soup = BeautifulSoup(html_content, 'lxml')
+        if soup is None:
+            format_type = sniff_format(html_content)
+            if format_type:
+                return format_type
+            soup = make_soup(html_content)
         
         # Check title tag first
         title_tag = soup.find('title')
@@ -3,16 +3,34 @@ ChatGPT HTML export parser.
 
 Parses ChatGPT conversation exports and extracts structured data.
 """
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple, Union
 from datetime import datetime
 import re
-import json
+from bs4 import BeautifulSoup
 from backend.parsers.base_parser import BaseParser
+from backend.parsers.json_stream import iter_json_array
+
+# Text in front of the conversation array of a data export
+JSON_ARRAY_START = re.compile(r'(?:var\s+jsonData|const\s+conversations|var\s+conversations)\s*=\s*\[')
 
 
 class ChatGPTParser(BaseParser):
     """Parser for ChatGPT HTML conversation exports."""
     
+    def __init__(self, html_content: str, soup: Optional[BeautifulSoup] = None, all_branches: bool = False):
+        """
+        Initialize parser with HTML content.
+        
+        Args:
+            html_content: Raw HTML string of the conversation export
+            soup: Parse tree of html_content if one was already built
+            all_branches: Return every branch of a conversation's message
+                tree (regenerated answers, edited prompts) as a separate
+                conversation instead of only the active one
+        """
+        super().__init__(html_content, soup=soup)
+        self.all_branches = all_branches
+    
     def detect_format(self) -> bool:
         """
         Detect if this is a ChatGPT export.
@@ -71,21 +89,6 @@ class ChatGPTParser(BaseParser):
             'created_at': created_at
         }
 
-    def parse_all(self) -> List[Dict]:
-        """
-        Parse all conversations from a ChatGPT HTML export.
-
-        Returns:
-            List of conversation dicts (same shape as parse()).
-            Falls back to a single parsed conversation if no JSON array found.
-        """
-        json_results = self._try_parse_json_data_all()
-        if json_results:
-            return json_results
-
-        # Fallback to a single conversation parse
-        return [self.parse()]
-    
     def parse_all(self) -> List[Dict]:
         """
         Parse ALL conversations from a ChatGPT HTML export.
@@ -105,147 +108,79 @@ class ChatGPTParser(BaseParser):
         single = self.parse()
         return [single] if single and single.get('messages') else []
 
-    def _try_parse_json_data(self) -> Optional[Dict]:
+    def iter_conversations(self, source: Optional[Union[str, TextIO]] = None) -> Iterator[Dict]:
         """
-        Try to extract the FIRST conversation from embedded JSON.
-        
-        Returns:
-            Dict with parsed data or None if no JSON found
-        """
-        all_convs = self._try_parse_all_json_data()
-        if all_convs:
-            return all_convs[0]
-        return None
-
-    def _try_parse_all_json_data(self) -> Optional[List[Dict]]:
-        """
-        Extract ALL conversations from embedded JSON in script tags.
-
-        Returns:
-            List of parsed conversation dicts, or None if no JSON found.
-        """
-        scripts = self.soup.find_all('script')
-
-        for script in scripts:
-            script_text = script.string
-            if not script_text:
-                continue
-
-            patterns = [
-                r'var\s+jsonData\s*=\s*',
-                r'const\s+conversations\s*=\s*',
-                r'var\s+conversations\s*=\s*',
-            ]
-
-            for pattern in patterns:
-                match = re.search(pattern + r'\[', script_text)
-                if match:
-                    start_pos = match.end() - 1
-                    json_text = script_text[start_pos:]
-                    json_str = self._extract_json_array(json_text)
+        Yield the conversations of the embedded JSON data one at a time.
 
-                    if json_str:
-                        try:
-                            conversations = json.loads(json_str)
-                            if conversations and isinstance(conversations, list):
-                                results = []
-                                for conv in conversations:
-                                    parsed = self._parse_json_conversation(conv)
-                                    if parsed and parsed.get('messages'):
-                                        results.append(parsed)
-                                if results:
-                                    return results
-                        except json.JSONDecodeError:
-                            continue
+        The raw text is scanned for the ``jsonData`` array and its elements
+        are decoded incrementally, without building a parse tree. Pass an
+        open text file to keep memory flat for very large exports.
 
-        return None
+        Args:
+            source: Export text or text file (defaults to this parser's HTML)
 
-    def _try_parse_json_data_all(self) -> Optional[List[Dict]]:
-        """
-        Try to extract all conversations from embedded JSON in script tags.
+        Yields:
+            Parsed conversation dicts (same shape as parse()) that have messages.
 
-        Returns:
-            List of parsed conversation dicts or None if no JSON found.
+        Raises:
+            ValueError: If the embedded JSON is malformed or truncated
         """
-        scripts = self.soup.find_all('script')
-
-        for script in scripts:
-            script_text = script.string
-            if not script_text:
+        if source is None:
+            source = self.html_content
+        for conversation_data in iter_json_array(source, JSON_ARRAY_START):
+            if not isinstance(conversation_data, dict):
                 continue
-
-            patterns = [
-                r'var\s+jsonData\s*=\s*',
-                r'const\s+conversations\s*=\s*',
-                r'var\s+conversations\s*=\s*',
-            ]
-
-            for pattern in patterns:
-                match = re.search(pattern + r'\[', script_text)
-                if match:
-                    start_pos = match.end() - 1
-                    json_text = script_text[start_pos:]
-                    json_str = self._extract_json_array(json_text)
-
-                    if json_str:
-                        try:
-                            conversations = json.loads(json_str)
-                            if conversations and isinstance(conversations, list):
-                                return [
-                                    self._parse_json_conversation(conv)
-                                    for conv in conversations
-                                ]
-                        except json.JSONDecodeError:
-                            continue
-
-        return None
+            yield from self.parse_json_conversation(conversation_data)
     
-    def _extract_json_array(self, text: str) -> Optional[str]:
+    def parse_json_conversation(self, conversation_data: Dict) -> List[Dict]:
         """
-        Extract a complete JSON array by counting brackets.
+        Parse one conversation object of a ChatGPT export.
         
         Args:
-            text: Text starting with '['
+            conversation_data: Dict with conversation JSON data
             
         Returns:
-            Complete JSON string or None
+            The parsed active branch (or every branch with ``all_branches``),
+            leaving out conversations without messages
         """
-        bracket_count = 0
-        end_pos = 0
-        in_string = False
-        escape_next = False
-        
-        for i, char in enumerate(text):
-            if escape_next:
-                escape_next = False
-                continue
-            
-            if char == '\\':
-                escape_next = True
-                continue
-                
-            if char == '"':
-                in_string = not in_string
-                continue
-            
-            if not in_string:
-                if char == '[' or char == '{':
-                    bracket_count += 1
-                elif char == ']' or char == '}':
-                    bracket_count -= 1
-                    if bracket_count == 0:
-                        end_pos = i + 1
-                        break
-        
-        if end_pos > 0:
-            return text[:end_pos]
+        if self.all_branches:
+            parsed = self._parse_json_conversation_variants(conversation_data)
+        else:
+            parsed = [self._parse_json_conversation(conversation_data)]
+        return [p for p in parsed if p.get('messages')]
+
+    def _try_parse_json_data(self) -> Optional[Dict]:
+        """
+        Try to extract the FIRST conversation from embedded JSON.
         
-        return None
+        Returns:
+            Dict with parsed data or None if no JSON found
+        """
+        try:
+            return next(self.iter_conversations(), None)
+        except ValueError:
+            return None
+
+    def _try_parse_all_json_data(self) -> Optional[List[Dict]]:
+        """
+        Extract ALL conversations from the embedded JSON data.
+
+        Returns:
+            List of parsed conversation dicts, or None if no JSON found.
+        """
+        try:
+            results = list(self.iter_conversations())
+        except ValueError:
+            return None
+        return results or None
     
     def _parse_json_conversation(self, conversation_data: Dict) -> Dict:
         """
         Parse a conversation from JSON data.
         
+        Only the branch the user last saw (``current_node``) is kept;
+        regenerated answers and edited prompts on other branches are left out.
+        
         Args:
             conversation_data: Dict with conversation JSON data
             
@@ -266,18 +201,9 @@ class ChatGPTParser(BaseParser):
         messages = []
         mapping = conversation_data.get('mapping', {})
         
-        # Build message tree and extract in order
         if mapping:
-            # Find root node
-            root_id = None
-            for node_id, node in mapping.items():
-                if node.get('parent') is None or node_id == 'client-created-root':
-                    root_id = node_id
-                    break
-            
-            # Traverse tree to get messages in order
-            if root_id:
-                messages = self._traverse_message_tree(mapping, root_id)
+            path = self._active_path(mapping, conversation_data.get('current_node'))
+            messages = self._messages_on_path(mapping, path)
         
         # If no messages found via tree traversal, try alternative extraction
         if not messages:
@@ -289,66 +215,183 @@ class ChatGPTParser(BaseParser):
             'created_at': created_at
         }
     
-    def _traverse_message_tree(self, mapping: Dict, node_id: str, sequence: int = 0) -> List[Dict]:
+    def _parse_json_conversation_variants(self, conversation_data: Dict) -> List[Dict]:
         """
-        Recursively traverse message tree to extract messages in order.
+        Parse a conversation from JSON data, one variant per branch.
+        
+        The active branch comes first, unchanged; every other branch with a
+        different transcript follows, titled "<title> (branch N)".
         
         Args:
-            mapping: Message mapping dict
-            node_id: Current node ID
-            sequence: Current sequence number
+            conversation_data: Dict with conversation JSON data
             
         Returns:
-            List of message dicts
+            List of parsed conversation dicts
         """
-        messages = []
+        active = self._parse_json_conversation(conversation_data)
+        variants = [active]
+        seen = {self._transcript_key(active['messages'])}
+        mapping = conversation_data.get('mapping') or {}
+        root_id = self._find_root(mapping)
+        if root_id is None:
+            return variants
+        
+        cache = {}
+        for path in self._branch_paths(mapping, root_id):
+            messages = self._messages_on_path(mapping, path, cache)
+            key = self._transcript_key(messages)
+            if not messages or key in seen:
+                continue
+            seen.add(key)
+            variants.append({
+                'title': f"{active['title']} (branch {len(variants) + 1})",
+                'messages': messages,
+                'created_at': active['created_at']
+            })
+        return variants
+    
+    @staticmethod
+    def _transcript_key(messages: List[Dict]) -> Tuple[Tuple[str, str], ...]:
+        """Hashable form of a transcript, to skip branches that read the same."""
+        return tuple((m['role'], m['content']) for m in messages)
+    
+    def _find_root(self, mapping: Dict) -> Optional[str]:
+        """Find the root node of a message mapping."""
+        for node_id, node in mapping.items():
+            if node.get('parent') is None or node_id == 'client-created-root':
+                return node_id
+        return None
+    
+    def _active_path(self, mapping: Dict, current_node: Optional[str] = None) -> List[str]:
+        """
+        Node IDs from the root to the active leaf of a message mapping.
         
-        node = mapping.get(node_id)
-        if not node:
-            return messages
+        Walks up the parent links from ``current_node``. Without a usable
+        ``current_node`` it walks down from the root, taking the newest
+        (last) child at every fork.
         
-        # Extract message from current node
-        message_data = node.get('message')
-        if message_data:
-            author = message_data.get('author', {})
-            role = author.get('role', 'assistant')
-            role = self.normalize_role(role)
-            
-            # Extract content from message parts
-            content_parts = []
-            content_obj = message_data.get('content')
-            
-            if content_obj:
-                if isinstance(content_obj, dict):
-                    parts = content_obj.get('parts', [])
-                    for part in parts:
-                        if isinstance(part, str):
-                            content_parts.append(part)
-                        elif isinstance(part, dict):
-                            # Handle structured parts
-                            if 'text' in part:
-                                content_parts.append(part['text'])
-                elif isinstance(content_obj, str):
-                    content_parts.append(content_obj)
-            
-            content = '\n'.join(content_parts).strip()
+        Args:
+            mapping: Message mapping dict
+            current_node: ID of the node the conversation was left on
             
-            # Only add if there's actual content and not a system message
-            if content and role != 'system':
-                messages.append({
-                    'role': role,
-                    'content': content,
-                    'sequence_number': sequence + len(messages)
-                })
+        Returns:
+            List of node IDs in conversation order
+        """
+        path = []
+        visited = set()
+        
+        if current_node in mapping:
+            node_id = current_node
+            while node_id in mapping and node_id not in visited:
+                visited.add(node_id)
+                path.append(node_id)
+                node_id = mapping[node_id].get('parent')
+            path.reverse()
+            return path
+        
+        node_id = self._find_root(mapping)
+        while node_id in mapping and node_id not in visited:
+            visited.add(node_id)
+            path.append(node_id)
+            children = mapping[node_id].get('children') or []
+            node_id = children[-1] if children else None
+        return path
+    
+    def _branch_paths(self, mapping: Dict, root_id: str) -> Iterator[List[str]]:
+        """
+        Yield the node IDs from the root to every leaf, depth first.
         
-        # Process children
-        children = node.get('children', [])
-        for child_id in children:
-            child_messages = self._traverse_message_tree(mapping, child_id, sequence + len(messages))
-            messages.extend(child_messages)
+        Args:
+            mapping: Message mapping dict
+            root_id: Root node ID
+            
+        Yields:
+            One list of node IDs per branch
+        """
+        path = []
+        visited = set()
+        # (node ID, depth) pairs; a node's path is the first `depth` entries
+        stack = [(root_id, 0)]
+        while stack:
+            node_id, depth = stack.pop()
+            if node_id not in mapping or node_id in visited:
+                continue
+            visited.add(node_id)
+            del path[depth:]
+            path.append(node_id)
+            children = [c for c in mapping[node_id].get('children') or [] if c in mapping and c not in visited]
+            if not children:
+                yield list(path)
+            for child_id in reversed(children):
+                stack.append((child_id, depth + 1))
+    
+    def _messages_on_path(self, mapping: Dict, path: List[str], cache: Optional[Dict] = None) -> List[Dict]:
+        """
+        Extract the messages of the nodes on a path, in order.
         
+        Args:
+            mapping: Message mapping dict
+            path: Node IDs in conversation order
+            cache: Node ID -> extracted message, shared between the paths of
+                one tree so nodes on many branches are extracted once
+            
+        Returns:
+            List of message dicts
+        """
+        messages = []
+        for node_id in path:
+            if cache is None:
+                message = self._node_message(mapping[node_id])
+            else:
+                if node_id not in cache:
+                    cache[node_id] = self._node_message(mapping[node_id])
+                message = cache[node_id]
+            if message:
+                messages.append({**message, 'sequence_number': len(messages)})
         return messages
     
+    def _node_message(self, node: Dict) -> Optional[Dict]:
+        """
+        Extract role and content of one mapping node.
+        
+        Args:
+            node: Mapping node
+            
+        Returns:
+            Dict with role and content, or None for empty and system messages
+        """
+        message_data = node.get('message')
+        if not message_data:
+            return None
+        
+        author = message_data.get('author', {})
+        role = author.get('role', 'assistant')
+        role = self.normalize_role(role)
+        
+        # Extract content from message parts
+        content_parts = []
+        content_obj = message_data.get('content')
+        
+        if content_obj:
+            if isinstance(content_obj, dict):
+                parts = content_obj.get('parts', [])
+                for part in parts:
+                    if isinstance(part, str):
+                        content_parts.append(part)
+                    elif isinstance(part, dict):
+                        # Handle structured parts
+                        if 'text' in part:
+                            content_parts.append(part['text'])
+            elif isinstance(content_obj, str):
+                content_parts.append(content_obj)
+        
+        content = '\n'.join(content_parts).strip()
+        
+        # Only keep actual content that is not a system message
+        if not content or role == 'system':
+            return None
+        return {'role': role, 'content': content}
+    
     def _extract_messages_flat(self, mapping: Dict) -> List[Dict]:
         """
         Extract messages from mapping without tree traversal (fallback method).
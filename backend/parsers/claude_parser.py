@@ -69,6 +69,54 @@ class ClaudeParser(BaseParser):
             'created_at': created_at
         }
     
+    def _parse_json_conversation(self, conversation_data: Dict) -> Dict:
+        """
+        Parse a conversation from Claude's data export (conversations.json).
+        
+        Args:
+            conversation_data: Dict with conversation JSON data
+            
+        Returns:
+            Dict with parsed conversation
+        """
+        messages = []
+        for message_data in conversation_data.get('chat_messages') or []:
+            role = self.normalize_role(str(message_data.get('sender') or 'assistant'))
+            
+            # Plain text, or the text blocks of structured content
+            content = message_data.get('text') or ''
+            if not content.strip():
+                content = '\n'.join(
+                    block.get('text', '')
+                    for block in message_data.get('content') or []
+                    if isinstance(block, dict) and block.get('type') == 'text'
+                )
+            content = content.strip()
+            
+            if content and role != 'system':
+                messages.append({
+                    'role': role,
+                    'content': content,
+                    'sequence_number': len(messages)
+                })
+        
+        title = conversation_data.get('name') or self.generate_title_from_first_message(messages)
+        
+        created_at = None
+        timestamp = conversation_data.get('created_at')
+        if isinstance(timestamp, str):
+            try:
+                # ISO 8601 in UTC, stored naive like the other parsers' timestamps
+                created_at = datetime.fromisoformat(timestamp.replace('Z', '+00:00')).replace(tzinfo=None)
+            except ValueError:
+                created_at = self.parse_timestamp(timestamp)
+        
+        return {
+            'title': title,
+            'messages': messages,
+            'created_at': created_at
+        }
+    
     def _extract_title(self) -> str:
         """Extract conversation title from HTML."""
         # Try various selectors for title
@@ -0,0 +1,100 @@
+"""
+Parser for the JSON data exports of ChatGPT and Claude.
+
+Both services let users download their history as a ZIP archive holding a
+``conversations.json`` array. Reading that array directly skips the HTML
+wrapper and the script extraction entirely: conversations are decoded one at
+a time (``iter_json_array``) and, for an archive, decompressed straight out
+of the ZIP entry without extracting anything to disk.
+
+Each conversation is recognised by its shape — a ChatGPT message ``mapping``
+or Claude ``chat_messages`` — so mixed or renamed files work too.
+"""
+import io
+import re
+import zipfile
+from pathlib import PurePosixPath
+from typing import BinaryIO, Dict, Iterator, Optional, TextIO, Union
+
+from backend.parsers.chatgpt_parser import ChatGPTParser
+from backend.parsers.claude_parser import ClaudeParser
+from backend.parsers.json_stream import iter_json_array
+
+# Archive entry holding the conversations (matched in any folder)
+CONVERSATIONS_ENTRY = 'conversations.json'
+
+_TOP_LEVEL_ARRAY = re.compile(r'\A\s*\[')
+
+
+def detect_json_format(conversation_data: Dict) -> Optional[str]:
+    """
+    Detect which service exported a conversation object.
+
+    Returns:
+        'chatgpt', 'claude', or None if unrecognized
+    """
+    if 'mapping' in conversation_data:
+        return 'chatgpt'
+    if 'chat_messages' in conversation_data:
+        return 'claude'
+    return None
+
+
+def iter_json_export(source: Union[str, TextIO], all_branches: bool = False) -> Iterator[Dict]:
+    """
+    Yield the conversations of a ``conversations.json`` export one at a time.
+
+    Args:
+        source: The JSON text, or a text file to read incrementally
+        all_branches: Return every branch of a ChatGPT message tree as a
+            separate conversation (see ``ChatGPTParser``)
+
+    Yields:
+        Parsed conversation dicts (title, messages, created_at) that have messages.
+
+    Raises:
+        ValueError: If the JSON is malformed or truncated
+    """
+    chatgpt, claude = ChatGPTParser('', all_branches=all_branches), ClaudeParser('')
+    for conversation_data in iter_json_array(source, _TOP_LEVEL_ARRAY):
+        if not isinstance(conversation_data, dict):
+            continue
+        format_type = detect_json_format(conversation_data)
+        if format_type == 'chatgpt':
+            yield from chatgpt.parse_json_conversation(conversation_data)
+        elif format_type == 'claude':
+            parsed = claude._parse_json_conversation(conversation_data)
+            if parsed.get('messages'):
+                yield parsed
+
+
+def iter_zip_export(archive: BinaryIO, all_branches: bool = False) -> Iterator[Dict]:
+    """
+    Yield the conversations of a data export archive one at a time.
+
+    Every ``conversations.json`` entry is decompressed as it is read.
+
+    Args:
+        archive: The ZIP file, opened in binary mode and seekable
+        all_branches: As for ``iter_json_export``
+
+    Yields:
+        Parsed conversation dicts that have messages.
+
+    Raises:
+        ValueError: If the file is not a ZIP archive, has no
+            conversations.json, or an entry is corrupt or malformed
+    """
+    try:
+        with zipfile.ZipFile(archive) as zf:
+            entries = [
+                info for info in zf.infolist()
+                if PurePosixPath(info.filename).name == CONVERSATIONS_ENTRY
+            ]
+            if not entries:
+                raise ValueError(f"No {CONVERSATIONS_ENTRY} in the archive")
+            for info in entries:
+                with zf.open(info) as entry:
+                    yield from iter_json_export(io.TextIOWrapper(entry, encoding='utf-8-sig'), all_branches)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Invalid ZIP archive: {e}") from e
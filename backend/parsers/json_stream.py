@@ -0,0 +1,115 @@
+"""
+Incremental reader for a JSON array embedded in a larger text.
+
+ChatGPT data exports are an HTML page around one huge
+``var jsonData = [...]`` script. ``iter_json_array`` scans the raw text
+(a string or a text file read chunk by chunk) for the start of that array
+and decodes its elements one at a time with ``json.JSONDecoder.raw_decode``,
+so no parse tree is built and, for a file, only the current element and one
+read chunk are held in memory. An element that still does not decode once
+MAX_ELEMENT_CHARS characters of it are buffered is reported as malformed
+rather than read to the end of the file.
+"""
+import json
+import re
+from typing import Any, Iterator, Pattern, TextIO, Union
+
+# Characters read from a file at a time (grows while a single element is larger)
+CHUNK_CHARS = 1024 * 1024
+# Largest element (in characters) that is buffered while waiting for it to decode
+MAX_ELEMENT_CHARS = 64 * 1024 * 1024
+# Tail kept between reads while looking for the array start, so a match
+# split across two chunks is still found
+_START_OVERLAP = 256
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def iter_json_array(
+    source: Union[str, TextIO],
+    start: Pattern[str],
+    chunk_chars: int = CHUNK_CHARS,
+    max_element_chars: int = MAX_ELEMENT_CHARS,
+) -> Iterator[Any]:
+    """
+    Yield the elements of the first JSON array whose opening bracket ends a match of ``start``.
+
+    Args:
+        source: The whole text, or a text file to read incrementally
+        start: Pattern for the text in front of the array, ending with ``\\[``
+        chunk_chars: Characters per read from a file
+        max_element_chars: Buffered characters after which an element that
+            does not decode is treated as malformed
+
+    Yields:
+        Decoded array elements, in order.
+
+    Raises:
+        ValueError: If the array is malformed or truncated, or an element
+            exceeds ``max_element_chars`` (elements before the error have
+            already been yielded)
+    """
+    if isinstance(source, str):
+        buf, read, eof = source, None, True
+    else:
+        buf, read, eof = "", source.read, False
+    pos = 0
+
+    def more() -> None:
+        # Drop what has been consumed; read at least as much as is still
+        # buffered so re-decoding one large element stays linear overall
+        nonlocal buf, pos, eof
+        chunk = read(max(chunk_chars, len(buf) - pos))
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    while True:
+        match = start.search(buf, pos)
+        if match:
+            pos = match.end()
+            break
+        if eof:
+            return
+        pos = max(pos, len(buf) - _START_OVERLAP)
+        more()
+
+    expect_element = True
+    while True:
+        pos = _WHITESPACE.match(buf, pos).end()
+        if pos == len(buf):
+            if eof:
+                raise ValueError("JSON array is truncated")
+            more()
+            continue
+
+        if buf[pos] == ']':
+            return
+
+        if not expect_element:
+            if buf[pos] != ',':
+                raise ValueError(f"Expected ',' or ']' in JSON array, found {buf[pos]!r}")
+            pos += 1
+            expect_element = True
+            continue
+
+        try:
+            element, end = _decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError as e:
+            if eof:
+                raise ValueError(f"Malformed JSON array: {e}") from e
+            if len(buf) - pos > max_element_chars:
+                raise ValueError(
+                    f"Malformed JSON array: element does not decode within {max_element_chars} characters ({e})"
+                ) from e
+            more()
+            continue
+        if end == len(buf) and not eof and isinstance(element, (int, float)):
+            # A number may continue in the next chunk
+            more()
+            continue
+        pos = end
+        expect_element = False
+        yield element
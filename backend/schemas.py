@@ -120,6 +120,10 @@ class SearchRequest(BaseModel):
     cluster_filter: Optional[int] = None
     topic_filter: Optional[List[str]] = None
     evaluate: bool = Field(default=False, description="Enable Backboard.io retrieval quality evaluation")
+    nprobe: Optional[int] = Field(
+        default=None, ge=0,
+        description="IVF lists to probe when the ANN index is built (0 = exact scan; default from VECTOR_ANN_NPROBE)"
+    )
 
 
 class SearchResultItem(BaseModel):
@@ -180,6 +184,27 @@ class SearchResponse(BaseModel):
     evaluation: Optional[RetrievalEvaluation] = None  # Backboard evaluation (when evaluate=true)
 
 
+class BatchSearchRequest(BaseModel):
+    """Schema for several searches answered in one round trip (scored like SearchRequest)."""
+    queries: List[str] = Field(..., min_length=1, max_length=100)
+    limit: int = Field(default=10, ge=1, le=100)
+    keyword_weight: float = Field(default=0.3, ge=0.0, le=1.0)
+    semantic_weight: float = Field(default=0.7, ge=0.0, le=1.0)
+    cluster_filter: Optional[int] = None
+    topic_filter: Optional[List[str]] = None
+    nprobe: Optional[int] = Field(
+        default=None, ge=0,
+        description="IVF lists to probe when the ANN index is built (0 = exact scan; default from VECTOR_ANN_NPROBE)"
+    )
+
+
+class BatchSearchResponse(BaseModel):
+    """Schema for batch search response (one SearchResponse per query, in order)."""
+    results: List[SearchResponse]
+    total_queries: int
+    search_time_ms: float
+
+
 # ============================================================================
 # Ingestion Schemas
 # ============================================================================
@@ -210,6 +235,29 @@ class IngestBatchResponse(BaseModel):
     total_time_ms: float
 
 
+class IngestJobResponse(BaseModel):
+    """Schema for background ingest job status."""
+    job_id: str
+    filename: str
+    status: str
+    total_conversations: Optional[int] = None
+    processed: int = 0
+    failed: int = 0
+    message_count: int = 0
+    conversation_ids: List[str] = []
+    throughput_per_sec: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class IngestJobSubmitResponse(BaseModel):
+    """Schema for the jobs created by a background upload."""
+    jobs: List[IngestJobResponse]
+
+
 # ============================================================================
 # Prompt Generation Schemas
 # ============================================================================
@@ -0,0 +1,189 @@
+"""
+Approximate nearest-neighbour index for the local vector store.
+
+A pure-numpy IVF (inverted file) index: a spherical k-means coarse quantiser
+splits the normalised embedding rows into ``n_lists`` cells, and a query only
+scores the rows of its ``nprobe`` nearest cells. ``nprobe`` is the recall vs
+latency knob — probing every list is equivalent to the exact scan.
+
+The index stores one list assignment per row of VectorStoreService's matrix.
+Rows added after training are assigned to their nearest centroid on insert, so
+the index never needs a rebuild to stay complete (only to stay balanced).
+"""
+
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+# Rows per chunk when assigning vectors to centroids (bounds temp memory)
+_ASSIGN_CHUNK = 16384
+# Rebuild the sorted inverted lists once this fraction of rows is pending
+_PENDING_REBUILD_RATIO = 0.1
+
+
+def default_n_lists(n_rows: int) -> int:
+    """sqrt(N) lists, clamped to a sensible range."""
+    return int(np.clip(np.sqrt(n_rows), 16, 4096))
+
+
+def nearest_centroids(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the most similar centroid for each (normalised) vector."""
+    out = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), _ASSIGN_CHUNK):
+        chunk = np.asarray(vectors[start:start + _ASSIGN_CHUNK], dtype=np.float32)
+        out[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return out
+
+
+def train_centroids(
+    vectors: np.ndarray,
+    n_lists: int,
+    n_iter: int = 10,
+    sample_size: int = 256,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Spherical k-means over a sample of ``vectors``.
+
+    Args:
+        vectors: (N, D) normalised rows.
+        n_lists: Number of centroids.
+        n_iter: Lloyd iterations.
+        sample_size: Training points per centroid (caps training cost).
+        seed: RNG seed.
+
+    Returns:
+        (n_lists, D) float32 array of unit-norm centroids.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    n_lists = min(n_lists, n)
+    sample_idx = rng.choice(n, size=min(n, n_lists * sample_size), replace=False)
+    sample = np.asarray(vectors[np.sort(sample_idx)], dtype=np.float32)
+
+    centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+    for _ in range(n_iter):
+        assign = nearest_centroids(sample, centroids)
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=n_lists)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+        nonempty = counts > 0
+        sums = np.add.reduceat(sample[order], starts[nonempty], axis=0)
+        centroids[nonempty] = sums
+        # Re-seed empty cells with random training points
+        n_empty = int((~nonempty).sum())
+        if n_empty:
+            centroids[~nonempty] = sample[rng.choice(len(sample), size=n_empty, replace=False)]
+
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids /= norms
+
+    return centroids.astype(np.float32)
+
+
+class IVFIndex:
+    """
+    Inverted-file index over the rows of an embedding matrix.
+
+    ``assign[row]`` is the list of each row. Queries read the rows of a list
+    from ``_order[_offsets[c]:_offsets[c + 1]]`` (rows sorted by list, rebuilt
+    lazily) plus the small set of rows assigned since that rebuild.
+    Tombstoned rows stay in their list and are filtered by the caller.
+    """
+
+    def __init__(self, centroids: np.ndarray):
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.assign = np.zeros(0, dtype=np.int32)
+        self._n_rows = 0
+        self._order: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._indexed_rows = 0
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    # ------------------------------------------------------------------
+    # Row maintenance
+    # ------------------------------------------------------------------
+    def set_assignments(self, assign: np.ndarray) -> None:
+        """Replace all row assignments (row i -> assign[i])."""
+        self.assign = np.asarray(assign, dtype=np.int32).copy()
+        self._n_rows = len(assign)
+        self._order = None
+
+    def assign_row(self, row: int, vec: np.ndarray) -> None:
+        """Assign a (new or overwritten) row to its nearest list."""
+        if row >= len(self.assign):
+            grown = np.zeros(max(1024, 2 * len(self.assign), row + 1), dtype=np.int32)
+            grown[: self._n_rows] = self.assign[: self._n_rows]
+            self.assign = grown
+        new_list = int(np.argmax(self.centroids @ vec))
+        if row < self._indexed_rows and self.assign[row] != new_list:
+            self._order = None  # an indexed row moved lists
+        self.assign[row] = new_list
+        self._n_rows = max(self._n_rows, row + 1)
+
+    def keep_rows(self, start: int, keep: np.ndarray) -> None:
+        """Mirror a matrix compaction: rows ``keep`` move to ``start, start+1, ...``."""
+        n_keep = len(keep)
+        self.assign[start:start + n_keep] = self.assign[keep]
+        self._n_rows = start + n_keep
+        self._order = None
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+    def _rebuild_lists(self) -> None:
+        assign = self.assign[: self._n_rows]
+        self._order = np.argsort(assign, kind="stable")
+        self._offsets = np.searchsorted(assign[self._order], np.arange(self.n_lists + 1))
+        self._indexed_rows = self._n_rows
+
+    def candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        """Rows in the ``nprobe`` lists nearest to ``query``."""
+        nprobe = min(nprobe, self.n_lists)
+        pending = self._n_rows - self._indexed_rows
+        if self._order is None or pending > _PENDING_REBUILD_RATIO * self._n_rows:
+            self._rebuild_lists()
+
+        centroid_scores = self.centroids @ query
+        if nprobe < self.n_lists:
+            probes = np.argpartition(centroid_scores, self.n_lists - nprobe)[-nprobe:]
+        else:
+            probes = np.arange(self.n_lists)
+
+        parts: List[np.ndarray] = [
+            self._order[self._offsets[c]:self._offsets[c + 1]] for c in probes
+        ]
+        if self._n_rows > self._indexed_rows:
+            tail = np.arange(self._indexed_rows, self._n_rows)
+            parts.append(tail[np.isin(self.assign[tail], probes)])
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    @staticmethod
+    def save(path: Path, centroids: np.ndarray, ids: List[str], assign: np.ndarray) -> None:
+        """Persist centroids and per-conversation assignments (keyed by ID)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(str(path) + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, centroids=centroids, ids=np.asarray(ids, dtype=str), assign=assign)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path):
+        """
+        Load a saved index.
+
+        Returns:
+            (index, ids, assign) — assignments are re-mapped onto rows by the caller.
+        """
+        with np.load(path) as data:
+            index = cls(data["centroids"])
+            return index, list(data["ids"]), data["assign"]
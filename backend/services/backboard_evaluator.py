@@ -15,6 +15,7 @@ from typing import List, Optional, Dict, Any
 import httpx
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
+from backend.http_clients import get_http_client
 from backend.schemas import (
     SearchResultItem,
     RetrievalEvaluation,
@@ -167,77 +168,77 @@ Memory {i}:
         }
 
         # Create a thread if we don't have one
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            if not self._thread_id:
-                # Create assistant if needed
-                if not self._assistant_id:
-                    assistant_payload = {
-                        "name": "CORTEX Evaluator",
-                        "llm_provider": "openai",
-                        "llm_model_name": self.model,
-                        "instructions": "You are a retrieval quality evaluator. Always respond with valid JSON.",
-                    }
-                    response = await client.post(
-                        f"{self.api_url}/assistants",
-                        headers=headers,
-                        json=assistant_payload,
-                    )
-                    response.raise_for_status()
-                    self._assistant_id = response.json().get("id")
-
-                # Create thread
-                thread_response = await client.post(
-                    f"{self.api_url}/threads",
+        client = get_http_client("backboard")
+        if not self._thread_id:
+            # Create assistant if needed
+            if not self._assistant_id:
+                assistant_payload = {
+                    "name": "CORTEX Evaluator",
+                    "llm_provider": "openai",
+                    "llm_model_name": self.model,
+                    "instructions": "You are a retrieval quality evaluator. Always respond with valid JSON.",
+                }
+                response = await client.post(
+                    f"{self.api_url}/assistants",
                     headers=headers,
-                    json={"assistant_id": self._assistant_id},
+                    json=assistant_payload,
                 )
-                thread_response.raise_for_status()
-                self._thread_id = thread_response.json().get("id")
+                response.raise_for_status()
+                self._assistant_id = response.json().get("id")
 
-            # Send message and get response
-            message_payload = {
-                "content": prompt,
-                "role": "user",
-            }
-
-            response = await client.post(
-                f"{self.api_url}/threads/{self._thread_id}/messages",
+            # Create thread
+            thread_response = await client.post(
+                f"{self.api_url}/threads",
                 headers=headers,
-                json=message_payload,
+                json={"assistant_id": self._assistant_id},
             )
-            response.raise_for_status()
+            thread_response.raise_for_status()
+            self._thread_id = thread_response.json().get("id")
 
-            # Get the assistant's response
-            messages_response = await client.get(
-                f"{self.api_url}/threads/{self._thread_id}/messages",
-                headers=headers,
-            )
-            messages_response.raise_for_status()
-
-            messages = messages_response.json().get("data", [])
-            if messages:
-                # Get the latest assistant message
-                for msg in messages:
-                    if msg.get("role") == "assistant":
-                        content = msg.get("content", "")
-                        try:
-                            # Try to parse JSON from the response
-                            # Handle cases where JSON is wrapped in markdown code blocks
-                            if "```json" in content:
-                                json_start = content.find("```json") + 7
-                                json_end = content.find("```", json_start)
-                                content = content[json_start:json_end].strip()
-                            elif "```" in content:
-                                json_start = content.find("```") + 3
-                                json_end = content.find("```", json_start)
-                                content = content[json_start:json_end].strip()
-
-                            return json.loads(content)
-                        except json.JSONDecodeError:
-                            logger.warning(f"Failed to parse JSON from Backboard response: {content[:200]}")
-                            return {}
+        # Send message and get response
+        message_payload = {
+            "content": prompt,
+            "role": "user",
+        }
 
-            return {}
+        response = await client.post(
+            f"{self.api_url}/threads/{self._thread_id}/messages",
+            headers=headers,
+            json=message_payload,
+        )
+        response.raise_for_status()
+
+        # Get the assistant's response
+        messages_response = await client.get(
+            f"{self.api_url}/threads/{self._thread_id}/messages",
+            headers=headers,
+        )
+        messages_response.raise_for_status()
+
+        messages = messages_response.json().get("data", [])
+        if messages:
+            # Get the latest assistant message
+            for msg in messages:
+                if msg.get("role") == "assistant":
+                    content = msg.get("content", "")
+                    try:
+                        # Try to parse JSON from the response
+                        # Handle cases where JSON is wrapped in markdown code blocks
+                        if "```json" in content:
+                            json_start = content.find("```json") + 7
+                            json_end = content.find("```", json_start)
+                            content = content[json_start:json_end].strip()
+                        elif "```" in content:
+                            json_start = content.find("```") + 3
+                            json_end = content.find("```", json_start)
+                            content = content[json_start:json_end].strip()
+
+                        return json.loads(content)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Failed to parse JSON from Backboard response: {content[:200]}")
+                        return {}
+
+        return {}
 
     async def evaluate_relevance(
         self,
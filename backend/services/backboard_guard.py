@@ -11,10 +11,14 @@ from typing import List, Optional, Dict, Any
 import httpx
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
+from backend.http_clients import get_http_client
 from backend.schemas import GuardResult
 
 logger = logging.getLogger(__name__)
 
+# Per-request timeout; the guard sits on the MCP search path, so fail fast
+REQUEST_TIMEOUT = 15.0
+
 
 # ============================================================================
 # Guard Prompt (Optimized for Speed - Single-Hop Reasoning)
@@ -98,76 +102,80 @@ class RelevanceGuard:
             "Content-Type": "application/json",
         }
 
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            # Create thread/assistant if needed (reuse for efficiency)
-            if not self._thread_id:
-                if not self._assistant_id:
-                    assistant_payload = {
-                        "name": "CORTEX Guard",
-                        "llm_provider": "openai",
-                        "llm_model_name": self.model,
-                        "instructions": "You are a relevance guard. Only respond with valid JSON. Be strict.",
-                    }
-                    response = await client.post(
-                        f"{self.api_url}/assistants",
-                        headers=headers,
-                        json=assistant_payload,
-                    )
-                    response.raise_for_status()
-                    self._assistant_id = response.json().get("id")
-
-                thread_response = await client.post(
-                    f"{self.api_url}/threads",
+        client = get_http_client("backboard")
+        # Create thread/assistant if needed (reuse for efficiency)
+        if not self._thread_id:
+            if not self._assistant_id:
+                assistant_payload = {
+                    "name": "CORTEX Guard",
+                    "llm_provider": "openai",
+                    "llm_model_name": self.model,
+                    "instructions": "You are a relevance guard. Only respond with valid JSON. Be strict.",
+                }
+                response = await client.post(
+                    f"{self.api_url}/assistants",
                     headers=headers,
-                    json={"assistant_id": self._assistant_id},
+                    timeout=REQUEST_TIMEOUT,
+                    json=assistant_payload,
                 )
-                thread_response.raise_for_status()
-                self._thread_id = thread_response.json().get("id")
+                response.raise_for_status()
+                self._assistant_id = response.json().get("id")
 
-            # Send message
-            message_payload = {
-                "content": prompt,
-                "role": "user",
-            }
-
-            response = await client.post(
-                f"{self.api_url}/threads/{self._thread_id}/messages",
+            thread_response = await client.post(
+                f"{self.api_url}/threads",
                 headers=headers,
-                json=message_payload,
+                timeout=REQUEST_TIMEOUT,
+                json={"assistant_id": self._assistant_id},
             )
-            response.raise_for_status()
+            thread_response.raise_for_status()
+            self._thread_id = thread_response.json().get("id")
 
-            # Get response
-            messages_response = await client.get(
-                f"{self.api_url}/threads/{self._thread_id}/messages",
-                headers=headers,
-            )
-            messages_response.raise_for_status()
-
-            messages = messages_response.json().get("data", [])
-            if messages:
-                for msg in messages:
-                    if msg.get("role") == "assistant":
-                        content = msg.get("content", "")
-                        try:
-                            # Parse JSON from response
-                            if "```json" in content:
-                                json_start = content.find("```json") + 7
-                                json_end = content.find("```", json_start)
-                                content = content[json_start:json_end].strip()
-                            elif "```" in content:
-                                json_start = content.find("```") + 3
-                                json_end = content.find("```", json_start)
-                                content = content[json_start:json_end].strip()
-
-                            return json.loads(content)
-                        except json.JSONDecodeError:
-                            logger.warning(f"Failed to parse guard response: {content[:100]}")
-                            # Default to allowing if we can't parse
-                            return {"is_relevant": True, "confidence": 0.5, "reason": "Parse error"}
-
-            # Default to allowing if no response
-            return {"is_relevant": True, "confidence": 0.5, "reason": "No response"}
+        # Send message
+        message_payload = {
+            "content": prompt,
+            "role": "user",
+        }
+
+        response = await client.post(
+            f"{self.api_url}/threads/{self._thread_id}/messages",
+            headers=headers,
+            timeout=REQUEST_TIMEOUT,
+            json=message_payload,
+        )
+        response.raise_for_status()
+
+        # Get response
+        messages_response = await client.get(
+            f"{self.api_url}/threads/{self._thread_id}/messages",
+            headers=headers,
+            timeout=REQUEST_TIMEOUT,
+        )
+        messages_response.raise_for_status()
+
+        messages = messages_response.json().get("data", [])
+        if messages:
+            for msg in messages:
+                if msg.get("role") == "assistant":
+                    content = msg.get("content", "")
+                    try:
+                        # Parse JSON from response
+                        if "```json" in content:
+                            json_start = content.find("```json") + 7
+                            json_end = content.find("```", json_start)
+                            content = content[json_start:json_end].strip()
+                        elif "```" in content:
+                            json_start = content.find("```") + 3
+                            json_end = content.find("```", json_start)
+                            content = content[json_start:json_end].strip()
+
+                        return json.loads(content)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Failed to parse guard response: {content[:100]}")
+                        # Default to allowing if we can't parse
+                        return {"is_relevant": True, "confidence": 0.5, "reason": "Parse error"}
+
+        # Default to allowing if no response
+        return {"is_relevant": True, "confidence": 0.5, "reason": "No response"}
 
     async def check_relevance(
         self,
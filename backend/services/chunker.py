@@ -0,0 +1,84 @@
+"""
+Token-bounded message windows for chunked (multi-vector) embeddings.
+
+With EMBEDDING_CHUNKING=true every conversation is embedded twice: once as a
+whole (title, summary, topics and the opening messages, as before) and once
+per window of its transcript, so content far past the opening is still
+searchable; the vector store keeps the windows as child vectors of the
+conversation.
+
+Windows are at most EMBEDDING_CHUNK_TOKENS tokens, consecutive windows share
+EMBEDDING_CHUNK_OVERLAP tokens, and a conversation contributes at most
+EMBEDDING_MAX_CHUNKS windows, so storage per conversation is bounded by
+EMBEDDING_MAX_CHUNKS * dim * 4 bytes and search cost by the total chunk count.
+Transcripts short enough for that many windows are covered completely. For
+longer ones the windows are picked evenly across the whole transcript, first
+and last included, so the whole length stays searchable but text that falls
+between the picked windows is not.
+
+Tokens are estimated without a tokenizer (one token per ~4 characters of a
+whitespace-delimited word), which is close to BPE counts for English prose.
+"""
+
+import os
+from typing import Any, Dict, List, Tuple
+
+EMBEDDING_CHUNKING = os.getenv("EMBEDDING_CHUNKING", "false").lower() in ("1", "true", "yes")
+EMBEDDING_CHUNK_TOKENS = int(os.getenv("EMBEDDING_CHUNK_TOKENS", "256"))
+EMBEDDING_CHUNK_OVERLAP = int(os.getenv("EMBEDDING_CHUNK_OVERLAP", "32"))
+EMBEDDING_MAX_CHUNKS = int(os.getenv("EMBEDDING_MAX_CHUNKS", "32"))
+
+
+def estimate_tokens(word: str) -> int:
+    """Approximate BPE token count of one whitespace-delimited word."""
+    return max(1, (len(word) + 3) // 4)
+
+
+def chunk_messages(
+    messages: List[Dict[str, Any]],
+    max_tokens: int = EMBEDDING_CHUNK_TOKENS,
+    overlap_tokens: int = EMBEDDING_CHUNK_OVERLAP,
+    max_chunks: int = EMBEDDING_MAX_CHUNKS,
+) -> List[str]:
+    """
+    Split a transcript into overlapping windows of at most ``max_tokens`` tokens.
+
+    Each message contributes ``ROLE:`` followed by its words, so windows keep
+    track of who said what across message boundaries. If the transcript
+    needs more than ``max_chunks`` windows, ``max_chunks`` of them are picked
+    evenly across it (always including the first and the last).
+
+    Returns:
+        Up to ``max_chunks`` window texts, in transcript order.
+    """
+    words: List[str] = []
+    for msg in messages:
+        content = msg.get("content", "")
+        if not content:
+            continue
+        words.append(f"{msg.get('role', 'unknown').upper()}:")
+        words.extend(content.split())
+    costs = [estimate_tokens(w) for w in words]
+
+    spans: List[Tuple[int, int]] = []
+    start = 0
+    while start < len(words):
+        end, used = start, 0
+        while end < len(words) and (end == start or used + costs[end] <= max_tokens):
+            used += costs[end]
+            end += 1
+        spans.append((start, end))
+        if end >= len(words):
+            break
+
+        # Step back over up to overlap_tokens of this window, always advancing
+        next_start, overlap = end, 0
+        while next_start - 1 > start and overlap + costs[next_start - 1] <= overlap_tokens:
+            next_start -= 1
+            overlap += costs[next_start]
+        start = next_start
+
+    if len(spans) > max_chunks:
+        step = (len(spans) - 1) / max(1, max_chunks - 1)
+        spans = [spans[round(i * step)] for i in range(max_chunks)]
+    return [" ".join(words[start:end]) for start, end in spans]
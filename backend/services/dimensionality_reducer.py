@@ -2,10 +2,15 @@
 UMAP dimensionality reduction service for conversation embeddings.
 
 This module handles:
-- Reducing 384D embeddings to 3D coordinates for visualization
+- Reducing embeddings (768D, or truncated) to 3D coordinates for visualization
 - Fitting UMAP models on all conversation embeddings
 - Saving/loading fitted UMAP models for consistency
 - Generating vector arrows for 3D visualization
+
+With UMAP_INPUT_DIM set (it defaults to VECTOR_MATRYOSHKA_DIM), embeddings are
+truncated to their first UMAP_INPUT_DIM dimensions and re-normalised before
+fitting and transforming, which makes UMAP's neighbour search correspondingly
+cheaper for Matryoshka-trained models.
 """
 
 import os
@@ -16,11 +21,15 @@ from pathlib import Path
 import numpy as np
 from umap import UMAP
 
+from backend.services.matryoshka import truncate_embeddings
+
 
 # UMAP configuration from environment or defaults
 UMAP_N_NEIGHBORS = int(os.getenv("UMAP_N_NEIGHBORS", "15"))
 UMAP_MIN_DIST = float(os.getenv("UMAP_MIN_DIST", "0.1"))
 UMAP_RANDOM_STATE = 42  # For reproducibility
+# Truncate (Matryoshka) embeddings to this many dimensions before UMAP (0 = full)
+UMAP_INPUT_DIM = int(os.getenv("UMAP_INPUT_DIM", os.getenv("VECTOR_MATRYOSHKA_DIM", "0")))
 
 # Model storage directory (configurable via env for Docker)
 MODEL_DIR = Path(os.getenv("MODEL_DIR", str(Path(__file__).parent.parent.parent / ".models")))
@@ -28,6 +37,28 @@ MODEL_DIR.mkdir(parents=True, exist_ok=True)
 MODEL_PATH = MODEL_DIR / "umap_model.pkl"
 
 
+def _prepare_input(embeddings: List[List[float]]) -> np.ndarray:
+    """
+    Convert embeddings to a 2D array, truncated to UMAP_INPUT_DIM if set.
+    
+    Raises:
+        ValueError: If embeddings are not a 2D array of at least 2 dimensions
+    """
+    X = np.array(embeddings, dtype=np.float32)
+    
+    # Validate dimensions
+    if X.ndim != 2:
+        raise ValueError("Embeddings must be 2D array")
+    
+    if X.shape[1] < 2:
+        raise ValueError(f"Expected at least 2D embeddings, got {X.shape[1]}D")
+    
+    if 0 < UMAP_INPUT_DIM < X.shape[1]:
+        X = truncate_embeddings(X, UMAP_INPUT_DIM)
+    
+    return X
+
+
 def fit_umap_model(
     embeddings: List[List[float]],
     save_model: bool = True
@@ -40,7 +71,7 @@ def fit_umap_model(
     2. After adding new conversations (to re-fit on all data)
     
     Args:
-        embeddings: List of 384D embedding vectors
+        embeddings: List of embedding vectors
         save_model: Whether to save the fitted model to disk
     
     Returns:
@@ -52,15 +83,7 @@ def fit_umap_model(
     if not embeddings:
         raise ValueError("Cannot fit UMAP: embeddings list is empty")
     
-    # Convert to numpy array
-    X = np.array(embeddings)
-    
-    # Validate dimensions
-    if X.ndim != 2:
-        raise ValueError("Embeddings must be 2D array")
-    
-    if X.shape[1] not in (384, 768):
-        raise ValueError(f"Expected 384D or 768D embeddings, got {X.shape[1]}D")
+    X = _prepare_input(embeddings)
     
     if X.shape[0] < 2:
         raise ValueError("Need at least 2 embeddings to fit UMAP")
@@ -99,10 +122,10 @@ def reduce_embeddings(
     generate_vectors: bool = True
 ) -> List[Dict[str, Any]]:
     """
-    Reduce embeddings from 384D to 3D coordinates.
+    Reduce embeddings to 3D coordinates.
     
     Args:
-        embeddings: List of 384D embedding vectors
+        embeddings: List of embedding vectors
         model: Optional pre-fitted UMAP model (loads from disk if None)
         generate_vectors: Whether to generate vector arrow coordinates
     
@@ -125,12 +148,7 @@ def reduce_embeddings(
         if model is None:
             raise ValueError("No UMAP model found. Call fit_umap_model first.")
     
-    # Convert to numpy array
-    X = np.array(embeddings)
-    
-    # Validate dimensions
-    if X.shape[1] not in (384, 768):
-        raise ValueError(f"Expected 384D or 768D embeddings, got {X.shape[1]}D")
+    X = _prepare_input(embeddings)
     
     # Transform to 3D
     coords_3d = model.transform(X)
@@ -266,7 +284,7 @@ def refit_and_reduce_all(
     Use this when re-clustering after adding new conversations.
     
     Args:
-        embeddings: List of 384D embedding vectors
+        embeddings: List of embedding vectors
         normalize: Whether to normalize coordinates
         scale: Scale for normalization
     
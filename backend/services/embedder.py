@@ -1,19 +1,23 @@
 """
-Embedding generation service supporting Ollama (local) and HuggingFace Inference API (cloud).
+Embedding generation service supporting Ollama (local), HuggingFace Inference API (cloud)
+and an in-process sentence-transformers model (EMBEDDING_PROVIDER=local).
 
 This module handles:
 - Generating 768-dimensional embeddings from text
-- Provider routing (Ollama nomic-embed-text or HuggingFace nomic-embed-text-v1.5)
+- Provider routing (Ollama nomic-embed-text, HuggingFace, or the local model)
 - Retry logic with exponential backoff
-- Caching embeddings by conversation ID
+- Content-addressed embedding cache (SHA-256 of model id + text) in one SQLite file
 - Batch embedding generation for multiple texts
+- An in-memory LRU of search query embeddings
+- Micro-batching of concurrent single-text requests into one provider call
 """
 
 import os
-import json
+import math
 import hashlib
+import sqlite3
 import asyncio
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from pathlib import Path
 
 import httpx
@@ -25,13 +29,23 @@ from tenacity import (
     retry_if_not_exception_type
 )
 
+from backend.http_clients import get_http_client
+from backend.services.embedding_cache import EmbeddingCache
+from backend.services.local_embedder import LOCAL_EMBEDDING_MODEL, embed_texts_local
 from backend.services.provider import get_embedding_provider
+from backend.services.query_cache import QueryEmbeddingCache
 
 
 # Ollama configuration
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 EMBEDDING_MODEL = os.getenv("OLLAMA_EMBEDDING_MODEL", "nomic-embed-text")
 EMBEDDING_DIMENSION = 768  # nomic-embed-text produces 768D embeddings
+# Texts per /api/embed request, and concurrent single-text requests when the
+# server lacks /api/embed (Ollama < 0.2)
+OLLAMA_EMBED_BATCH_SIZE = int(os.getenv("OLLAMA_EMBED_BATCH_SIZE", "64"))
+OLLAMA_EMBED_CONCURRENCY = int(os.getenv("OLLAMA_EMBED_CONCURRENCY", "4"))
+# None until the first batch call tells us whether /api/embed exists
+_ollama_batch_supported: bool | None = None
 
 # HuggingFace configuration
 HF_API_TOKEN = os.getenv("HF_API_TOKEN", "")
@@ -43,26 +57,55 @@ class PermanentAPIError(Exception):
     """Non-retryable API error (4xx except 429)."""
     pass
 
+
+class _BatchEndpointUnavailable(Exception):
+    """The Ollama server predates the /api/embed batch endpoint."""
+    pass
+
 # Cache directory for embeddings (configurable via env for Docker)
 _cache_base = Path(os.getenv("CACHE_DIR", str(Path(__file__).parent.parent.parent / ".cache")))
 CACHE_DIR = _cache_base / "embeddings"
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
+# Size budget of the embedding cache; least recently used vectors are evicted beyond it
+EMBEDDING_CACHE_MAX_MB = float(os.getenv("EMBEDDING_CACHE_MAX_MB", "512"))
+_embedding_cache: EmbeddingCache | None = None
+
+# Query embedding LRU for the search path (size 0 disables it)
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+QUERY_CACHE_TTL = float(os.getenv("QUERY_EMBEDDING_CACHE_TTL", "3600"))
+_query_cache = QueryEmbeddingCache(QUERY_CACHE_SIZE, QUERY_CACHE_TTL)
+
+# Micro-batching of concurrent single-text requests (window 0 disables it)
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+EMBEDDING_BATCH_MAX_ITEMS = int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS", "32"))
+
+
+def get_embedding_model_id() -> str:
+    """Identify the active provider and model, e.g. "ollama:nomic-embed-text"."""
+    provider = get_embedding_provider()
+    if provider == "huggingface":
+        model = HF_MODEL_ID
+    elif provider == "local":
+        model = LOCAL_EMBEDDING_MODEL
+    else:
+        model = EMBEDDING_MODEL
+    return f"{provider}:{model}"
 
 
 async def generate_embedding(
     text: str,
-    conversation_id: str | None = None,
     use_cache: bool = True
 ) -> List[float]:
     """
     Generate a 768-dimensional embedding vector from text.
 
-    Routes to HuggingFace or Ollama based on provider config.
+    Routes to HuggingFace or Ollama based on provider config. Embeddings are
+    cached by content (see embedding_cache_key), so the same text embedded
+    with the same model never reaches the provider twice.
 
     Args:
         text: Text content to embed
-        conversation_id: Optional conversation ID for caching
-        use_cache: Whether to use cached embeddings if available
+        use_cache: Whether to read and write the embedding cache
 
     Returns:
         List of 768 floats representing the embedding vector
@@ -75,28 +118,28 @@ async def generate_embedding(
         raise ValueError("Cannot generate embedding: text is empty")
 
     # Check cache first
-    if use_cache and conversation_id:
-        cached = _load_from_cache(conversation_id)
+    cache_key = embedding_cache_key(text)
+    if use_cache:
+        cached = _load_from_cache(cache_key)
         if cached:
             return cached
 
-    # Generate embedding using the configured provider
-    provider = get_embedding_provider()
-    if provider == "huggingface":
-        embedding = await _call_huggingface_embedding_api(text)
+    # Generate embedding using the configured provider; concurrent callers
+    # are coalesced into one batched provider call
+    if EMBEDDING_BATCH_WINDOW_MS > 0:
+        embedding = await _dispatcher.embed(text)
     else:
-        embedding = await _call_embedding_api(text)
+        embedding = (await _embed_texts([text]))[0]
 
     # Cache the result
-    if conversation_id:
-        _save_to_cache(conversation_id, embedding)
+    if use_cache:
+        _save_to_cache(cache_key, embedding)
 
     return embedding
 
 
 async def generate_embeddings_batch(
     texts: List[str],
-    conversation_ids: List[str] | None = None,
     use_cache: bool = True
 ) -> List[List[float]]:
     """
@@ -106,35 +149,32 @@ async def generate_embeddings_batch(
 
     Args:
         texts: List of text strings to embed
-        conversation_ids: Optional list of conversation IDs for caching
-        use_cache: Whether to use cached embeddings if available
+        use_cache: Whether to read and write the embedding cache
 
     Returns:
         List of embedding vectors (one per input text)
 
     Raises:
-        ValueError: If texts list is empty or lengths don't match
+        ValueError: If texts list is empty or contains an empty text
         httpx.HTTPError: If API call fails after retries
     """
     if not texts:
         raise ValueError("Cannot generate embeddings: texts list is empty")
 
-    if conversation_ids and len(texts) != len(conversation_ids):
-        raise ValueError("texts and conversation_ids must have same length")
-
     # Check cache for each text
     embeddings = []
     texts_to_generate = []
     indices_to_generate = []
+    cache_keys = [embedding_cache_key(text) for text in texts]
 
     for i, text in enumerate(texts):
         if not text or not text.strip():
             raise ValueError(f"Text at index {i} is empty")
 
-        # Check cache if conversation_id provided
-        cached = None
-        if use_cache and conversation_ids and conversation_ids[i]:
-            cached = _load_from_cache(conversation_ids[i])
+    cached_embeddings = _load_many_from_cache(cache_keys) if use_cache else {}
+
+    for i, text in enumerate(texts):
+        cached = cached_embeddings.get(cache_keys[i])
 
         if cached:
             embeddings.append(cached)
@@ -145,23 +185,160 @@ async def generate_embeddings_batch(
 
     # Generate embeddings for non-cached texts
     if texts_to_generate:
-        provider = get_embedding_provider()
-        if provider == "huggingface":
-            generated = await _call_huggingface_embedding_api_batch(texts_to_generate)
-        else:
-            generated = await _call_embedding_api_batch(texts_to_generate)
+        generated = await _embed_texts(texts_to_generate)
 
         # Fill in the generated embeddings
         for idx, embedding in zip(indices_to_generate, generated):
             embeddings[idx] = embedding
 
-            # Cache if conversation_id provided
-            if conversation_ids and conversation_ids[idx]:
-                _save_to_cache(conversation_ids[idx], embedding)
+        if use_cache:
+            _save_many_to_cache({cache_keys[idx]: embeddings[idx] for idx in indices_to_generate})
 
     return embeddings
 
 
+async def generate_query_embedding(query: str) -> List[float]:
+    """
+    Embed a search query, reusing a recent embedding of the same query.
+
+    Lookups go through an in-memory LRU keyed by model id plus normalised
+    query text (QUERY_EMBEDDING_CACHE_SIZE entries, QUERY_EMBEDDING_CACHE_TTL
+    seconds).
+
+    Args:
+        query: Search query text
+
+    Returns:
+        List of 768 floats representing the embedding vector
+    """
+    model_id = get_embedding_model_id()
+    cached = _query_cache.get(model_id, query)
+    if cached is not None:
+        return cached
+
+    embedding = await generate_embedding(query, use_cache=False)
+    _query_cache.put(model_id, query, embedding)
+    return embedding
+
+
+async def generate_query_embeddings(queries: List[str]) -> List[List[float]]:
+    """
+    Embed several search queries, batching only the cache misses.
+
+    Args:
+        queries: Search query texts
+
+    Returns:
+        One embedding per query, in input order
+    """
+    model_id = get_embedding_model_id()
+    embeddings = [_query_cache.get(model_id, q) for q in queries]
+    missing = [i for i, emb in enumerate(embeddings) if emb is None]
+
+    if missing:
+        generated = await generate_embeddings_batch([queries[i] for i in missing], use_cache=False)
+        for i, embedding in zip(missing, generated):
+            embeddings[i] = embedding
+            _query_cache.put(model_id, queries[i], embedding)
+
+    return embeddings
+
+
+def get_query_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters and occupancy of the query embedding LRU."""
+    return _query_cache.get_stats()
+
+
+async def _embed_texts(texts: List[str]) -> List[List[float]]:
+    """Embed texts with the configured provider (single call for one text)."""
+    provider = get_embedding_provider()
+    if provider == "local":
+        return await _call_local_embedding(texts)
+    if len(texts) == 1:
+        if provider == "huggingface":
+            return [await _call_huggingface_embedding_api(texts[0])]
+        return [await _call_embedding_api(texts[0])]
+    if provider == "huggingface":
+        return await _call_huggingface_embedding_api_batch(texts)
+    return await _call_embedding_api_batch(texts)
+
+
+async def _call_local_embedding(texts: List[str]) -> List[List[float]]:
+    """Embed texts with the in-process model (see local_embedder)."""
+    embeddings = await embed_texts_local(texts)
+    for embedding in embeddings:
+        if len(embedding) != EMBEDDING_DIMENSION:
+            raise ValueError(
+                f"Expected {EMBEDDING_DIMENSION}D embedding, got {len(embedding)}D"
+            )
+    return embeddings
+
+
+# ---------------------------------------------------------------------------
+# Micro-batching dispatcher
+# ---------------------------------------------------------------------------
+
+class _EmbeddingDispatcher:
+    """
+    Coalesces concurrent generate_embedding() calls into batched provider calls.
+
+    The first request of a batch opens a window of ``window_ms``; every
+    request arriving within it joins the batch, which is flushed when the
+    window closes or ``max_items`` texts are queued. One provider call embeds
+    the batch and each caller's future is resolved with its own vector (or
+    the call's exception).
+    """
+
+    def __init__(self, window_ms: float, max_items: int):
+        self.window = window_ms / 1000.0
+        self.max_items = max(1, max_items)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set = set()
+
+    async def embed(self, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # State from a previous event loop (e.g. an earlier asyncio.run) is dead
+            self._loop = loop
+            self._pending = []
+            self._timer = None
+
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = self._loop.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        try:
+            embeddings = await _embed_texts([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+
+
+_dispatcher = _EmbeddingDispatcher(EMBEDDING_BATCH_WINDOW_MS, EMBEDDING_BATCH_MAX_ITEMS)
+
+
 # ---------------------------------------------------------------------------
 # HuggingFace Inference API
 # ---------------------------------------------------------------------------
@@ -195,21 +372,21 @@ async def _call_huggingface_embedding_api_batch(texts: List[str]) -> List[List[f
 async def _hf_request(inputs) -> List[List[float]]:
     """Shared HuggingFace API call with proper error handling."""
     try:
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                HF_MODEL_URL,
-                headers={"Authorization": f"Bearer {HF_API_TOKEN}"},
-                json={"inputs": inputs, "options": {"wait_for_model": True}}
+        client = get_http_client("huggingface")
+        response = await client.post(
+            HF_MODEL_URL,
+            headers={"Authorization": f"Bearer {HF_API_TOKEN}"},
+            json={"inputs": inputs, "options": {"wait_for_model": True}}
+        )
+
+        # Don't retry permanent errors (401, 403, 404, 410)
+        if response.status_code in (401, 403, 404, 410):
+            raise PermanentAPIError(
+                f"HuggingFace API returned {response.status_code} for {HF_MODEL_ID}: "
+                f"{response.text}"
             )
 
-            # Don't retry permanent errors (401, 403, 404, 410)
-            if response.status_code in (401, 403, 404, 410):
-                raise PermanentAPIError(
-                    f"HuggingFace API returned {response.status_code} for {HF_MODEL_ID}: "
-                    f"{response.text}"
-                )
-
-            response.raise_for_status()
+        response.raise_for_status()
 
         result = response.json()
 
@@ -247,8 +424,21 @@ async def _hf_request(inputs) -> List[List[float]]:
 
 # ---------------------------------------------------------------------------
 # Ollama API (local)
+#
+# /api/embeddings (one text) returns raw vectors while /api/embed (batch)
+# returns L2-normalised ones. Both share the "ollama:<model>" cache key, so
+# every Ollama vector is normalised before it is cached or returned (cache
+# reads need no second pass; see embedding_cache_key).
 # ---------------------------------------------------------------------------
 
+def _l2_normalize(embedding: List[float]) -> List[float]:
+    """Scale ``embedding`` to unit length (a zero vector is returned unchanged)."""
+    norm = math.sqrt(sum(x * x for x in embedding))
+    if norm == 0 or abs(norm - 1.0) < 1e-6:
+        return embedding
+    return [x / norm for x in embedding]
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -260,15 +450,16 @@ async def _call_embedding_api(text: str) -> List[float]:
     Call Ollama Embeddings API (nomic-embed-text) for a single text.
     """
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{OLLAMA_BASE_URL}/api/embeddings",
-                json={
-                    "model": EMBEDDING_MODEL,
-                    "prompt": text
-                }
-            )
-            response.raise_for_status()
+        client = get_http_client("ollama")
+        response = await client.post(
+            f"{OLLAMA_BASE_URL}/api/embeddings",
+            json={
+                "model": EMBEDDING_MODEL,
+                "prompt": text
+            },
+            timeout=60.0
+        )
+        response.raise_for_status()
 
         result = response.json()
         embedding = result.get("embedding", [])
@@ -280,7 +471,7 @@ async def _call_embedding_api(text: str) -> List[float]:
                 f"got {len(embedding)}D"
             )
 
-        return embedding
+        return _l2_normalize(embedding)
 
     except httpx.HTTPError as e:
         raise Exception(f"Ollama Embeddings API call failed (is 'ollama serve' running?): {e}")
@@ -290,82 +481,143 @@ async def _call_embedding_api(text: str) -> List[float]:
         raise Exception(f"Embedding generation failed: {e}")
 
 
+async def _call_embedding_api_batch(texts: List[str]) -> List[List[float]]:
+    """
+    Call Ollama for multiple texts.
+
+    Uses the /api/embed batch endpoint (array input, OLLAMA_EMBED_BATCH_SIZE
+    texts per request) when the server has it. Older servers without it get
+    a bounded-concurrency fan-out of single-text calls, each retried on its
+    own, so one failing text does not re-embed the whole batch.
+    """
+    global _ollama_batch_supported
+
+    if _ollama_batch_supported is not False:
+        try:
+            embeddings = []
+            for start in range(0, len(texts), OLLAMA_EMBED_BATCH_SIZE):
+                embeddings.extend(
+                    await _call_embed_endpoint(texts[start:start + OLLAMA_EMBED_BATCH_SIZE])
+                )
+            _ollama_batch_supported = True
+            return embeddings
+        except _BatchEndpointUnavailable:
+            _ollama_batch_supported = False
+
+    semaphore = asyncio.Semaphore(OLLAMA_EMBED_CONCURRENCY)
+
+    async def embed_one(text: str) -> List[float]:
+        async with semaphore:
+            return await _call_embedding_api(text)
+
+    return list(await asyncio.gather(*(embed_one(text) for text in texts)))
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=2, max=10),
-    retry=retry_if_exception_type(Exception),
+    retry=retry_if_not_exception_type(_BatchEndpointUnavailable),
     reraise=True
 )
-async def _call_embedding_api_batch(texts: List[str]) -> List[List[float]]:
+async def _call_embed_endpoint(texts: List[str]) -> List[List[float]]:
     """
-    Call Ollama Embeddings API for multiple texts (sequentially, as Ollama
-    does not support batch embedding in a single call).
+    Embed several texts with one Ollama /api/embed request.
     """
-    embeddings = []
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        for text in texts:
-            try:
-                response = await client.post(
-                    f"{OLLAMA_BASE_URL}/api/embeddings",
-                    json={
-                        "model": EMBEDDING_MODEL,
-                        "prompt": text
-                    }
+    try:
+        client = get_http_client("ollama")
+        response = await client.post(
+            f"{OLLAMA_BASE_URL}/api/embed",
+            json={
+                "model": EMBEDDING_MODEL,
+                "input": texts
+            }
+        )
+        # Servers without the endpoint answer a bare 404; a missing model is
+        # also a 404 but names the model, and should surface as an error
+        if response.status_code == 404 and "model" not in response.text.lower():
+            raise _BatchEndpointUnavailable(response.text)
+        response.raise_for_status()
+
+        embeddings = response.json().get("embeddings", [])
+        if len(embeddings) != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+        for embedding in embeddings:
+            if len(embedding) != EMBEDDING_DIMENSION:
+                raise ValueError(
+                    f"Expected {EMBEDDING_DIMENSION}D embedding, "
+                    f"got {len(embedding)}D"
                 )
-                response.raise_for_status()
 
-                result = response.json()
-                embedding = result.get("embedding", [])
+        return [_l2_normalize(embedding) for embedding in embeddings]
 
-                if len(embedding) != EMBEDDING_DIMENSION:
-                    raise ValueError(
-                        f"Expected {EMBEDDING_DIMENSION}D embedding, "
-                        f"got {len(embedding)}D"
-                    )
-
-                embeddings.append(embedding)
-
-            except Exception as e:
-                raise Exception(f"Ollama Embeddings API batch call failed: {e}")
-
-    return embeddings
+    except _BatchEndpointUnavailable:
+        raise
+    except httpx.HTTPError as e:
+        raise Exception(f"Ollama Embed API batch call failed (is 'ollama serve' running?): {e}")
+    except Exception as e:
+        if "Ollama" in str(e):
+            raise
+        raise Exception(f"Ollama Embed API batch call failed: {e}")
 
 
 # ---------------------------------------------------------------------------
 # Cache helpers
 # ---------------------------------------------------------------------------
 
-def _load_from_cache(conversation_id: str) -> List[float] | None:
-    """Load cached embedding from disk."""
-    cache_file = CACHE_DIR / f"{conversation_id}.json"
-
-    if not cache_file.exists():
-        return None
+def embedding_cache_key(text: str) -> str:
+    """
+    Content address of an embedding: SHA-256 of the model id and the text.
 
+    Identical text embedded with the same provider/model shares one entry
+    (re-imports, duplicate conversations); switching models changes every
+    key, so stale vectors are never served. Ollama keys also carry a
+    ``unit`` marker: those vectors are cached L2-normalised, and raw
+    vectors cached before that are never read back.
+    """
+    model_id = get_embedding_model_id()
+    if get_embedding_provider() == "ollama":
+        model_id += "\0unit"
+    content = f"{model_id}\0{text}"
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _get_embedding_cache() -> EmbeddingCache:
+    """Open (once) the SQLite embedding cache under CACHE_DIR."""
+    global _embedding_cache
+    path = CACHE_DIR / "embeddings.sqlite3"
+    if _embedding_cache is None or _embedding_cache.path != path:
+        if _embedding_cache is not None:
+            _embedding_cache.close()
+        _embedding_cache = EmbeddingCache(path, int(EMBEDDING_CACHE_MAX_MB * 1024 * 1024))
+    return _embedding_cache
+
+
+def _load_many_from_cache(cache_keys: List[str]) -> Dict[str, List[float]]:
+    """Load cached embeddings for several keys in one lookup."""
     try:
-        with open(cache_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return data.get("embedding")
-    except (json.JSONDecodeError, IOError):
-        return None
+        return _get_embedding_cache().get_many(cache_keys)
+    except sqlite3.Error:
+        return {}
 
 
-def _save_to_cache(conversation_id: str, embedding: List[float]) -> None:
-    """Save embedding to cache."""
-    cache_file = CACHE_DIR / f"{conversation_id}.json"
+def _load_from_cache(cache_key: str) -> List[float] | None:
+    """Load cached embedding from disk."""
+    return _load_many_from_cache([cache_key]).get(cache_key)
 
-    data = {
-        "embedding": embedding,
-        "dimension": len(embedding)
-    }
 
+def _save_many_to_cache(embeddings: Dict[str, List[float]]) -> None:
+    """Save several embeddings to the cache in one transaction."""
     try:
-        with open(cache_file, "w", encoding="utf-8") as f:
-            json.dump(data, f)
-    except IOError:
+        _get_embedding_cache().put_many(embeddings, model=get_embedding_model_id())
+    except sqlite3.Error:
         pass  # Silently fail if cache write fails
 
 
+def _save_to_cache(cache_key: str, embedding: List[float]) -> None:
+    """Save embedding to cache."""
+    _save_many_to_cache({cache_key: embedding})
+
+
 def prepare_text_for_embedding(
     title: str,
     summary: str,
@@ -412,9 +664,14 @@ def prepare_text_for_embedding(
     return "\n\n".join(parts)
 
 
+def get_embedding_cache_stats() -> Dict[str, int]:
+    """Entry count and size of the embedding cache."""
+    return _get_embedding_cache().stats()
+
+
 def clear_cache() -> int:
-    """Clear all cached embeddings."""
-    count = 0
+    """Clear all cached embeddings (including legacy one-file-per-entry JSON)."""
+    count = _get_embedding_cache().clear()
     for cache_file in CACHE_DIR.glob("*.json"):
         try:
             cache_file.unlink()
@@ -0,0 +1,141 @@
+"""
+Single-file embedding cache backed by SQLite.
+
+Replaces one JSON file per embedding with one table in
+``CACHE_DIR/embeddings/embeddings.sqlite3``:
+
+    embeddings(key TEXT PRIMARY KEY, model TEXT, dim INTEGER,
+               vector BLOB, accessed REAL)
+
+Vectors are stored as raw float32 bytes, lookups are batched into
+``WHERE key IN (...)`` queries, and once the stored vectors exceed
+``max_bytes`` the least recently used entries are evicted.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+# Keys per SELECT (stays well below SQLite's bound-parameter limit)
+_LOOKUP_CHUNK = 500
+# Evict down to this fraction of max_bytes so eviction is not run on every write
+_EVICT_TARGET = 0.9
+
+
+class EmbeddingCache:
+    """
+    Keyed float32 vector store with LRU eviction by size.
+
+    Thread-safe; one connection is shared behind a lock.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 512 * 1024 * 1024):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY, model TEXT, dim INTEGER,"
+            " vector BLOB NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_accessed ON embeddings(accessed)")
+        self._conn.commit()
+        self._total_bytes = self._stored_bytes()
+
+    def _stored_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """Look up several keys at once; missing keys are absent from the result."""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for start in range(0, len(keys), _LOOKUP_CHUNK):
+                chunk = keys[start:start + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET accessed = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+        return found
+
+    def get(self, key: str) -> List[float] | None:
+        """Look up one key."""
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Dict[str, List[float]], model: str = "") -> None:
+        """Insert or replace several vectors, then evict if over budget."""
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for key, vector in items.items():
+            blob = np.asarray(vector, dtype=np.float32).tobytes()
+            rows.append((key, model, len(blob) // 4, blob, now))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dim, vector, accessed)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            self._total_bytes += sum(len(row[3]) for row in rows)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def put(self, key: str, vector: List[float], model: str = "") -> None:
+        """Insert or replace one vector."""
+        self.put_many({key: vector}, model)
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until under the target size (lock held)."""
+        self._total_bytes = self._stored_bytes()
+        target = int(self.max_bytes * _EVICT_TARGET)
+        while self._total_bytes > target:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+            ).fetchone()
+            if not count:
+                break
+            n_evict = max(1, int((self._total_bytes - target) / (total / count)) + 1)
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN"
+                " (SELECT key FROM embeddings ORDER BY accessed LIMIT ?)",
+                (n_evict,),
+            )
+            self._conn.commit()
+            self._total_bytes = self._stored_bytes()
+
+    def clear(self) -> int:
+        """Delete every entry. Returns the number removed."""
+        with self._lock:
+            count = self._conn.execute("DELETE FROM embeddings").rowcount
+            self._conn.commit()
+            self._total_bytes = 0
+        return count
+
+    def stats(self) -> Dict[str, int]:
+        """Entry count and stored vector bytes."""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            return {"entries": count, "bytes": self._total_bytes, "max_bytes": self.max_bytes}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
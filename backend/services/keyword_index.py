@@ -0,0 +1,84 @@
+"""
+In-process BM25 keyword index for the local vector store.
+
+Indexes the same per-conversation documents the vector store keeps (title,
+summary, topics and the full message text) so hybrid search can fuse exact
+term matches with cosine similarity. Documents are added and removed one at a
+time, so the index stays current as conversations are ingested.
+
+Tokens are Unicode word characters, case-folded, so non-Latin scripts and
+accented terms are indexed as well.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Case-folded Unicode word tokens of ``text``."""
+    return _TOKEN_PATTERN.findall(text.casefold())
+
+
+class BM25Index:
+    """
+    Okapi BM25 over an incrementally maintained inverted index.
+
+    ``_postings[term][doc_id]`` is the term frequency of ``term`` in the document.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index (or re-index) a document."""
+        self.remove(doc_id)
+        tokens = tokenize(text)
+        counts = Counter(tokens)
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+        self._doc_terms[doc_id] = list(counts)
+        self._doc_lengths[doc_id] = len(tokens)
+        self._total_length += len(tokens)
+
+    def remove(self, doc_id: str) -> None:
+        """Drop a document (no-op if it is not indexed)."""
+        length = self._doc_lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in self._doc_terms.pop(doc_id):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+
+    def scores(self, query: str) -> Dict[str, float]:
+        """BM25 score of every document containing at least one query term."""
+        n_docs = len(self._doc_lengths)
+        if not n_docs:
+            return {}
+        avg_length = self._total_length / n_docs or 1.0
+
+        scores: Dict[str, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+            for doc_id, tf in postings.items():
+                norm = self.k1 * (1.0 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1.0) / (tf + norm)
+        return scores
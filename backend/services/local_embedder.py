@@ -0,0 +1,83 @@
+"""
+In-process CPU embedding provider (EMBEDDING_PROVIDER=local).
+
+Loads a sentence-transformers model (nomic-embed-text v1.5 by default, or
+e.g. BAAI/bge-base-en-v1.5) into the backend process, so an embedding costs
+only model compute instead of an HTTP round trip to Ollama or HuggingFace.
+Setting LOCAL_EMBEDDING_BACKEND=onnx runs the model on ONNX Runtime instead
+of PyTorch.
+
+sentence-transformers is an optional dependency:
+
+    pip install sentence-transformers            # PyTorch backend
+    pip install "sentence-transformers[onnx]"    # ONNX Runtime backend
+
+Inference runs on a dedicated thread pool so it never blocks the event loop;
+each call encodes its whole batch in one forward pass per
+LOCAL_EMBEDDING_BATCH_SIZE texts.
+"""
+
+import asyncio
+import importlib.util
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List
+
+LOCAL_EMBEDDING_MODEL = os.getenv("LOCAL_EMBEDDING_MODEL", "nomic-ai/nomic-embed-text-v1.5")
+# "torch" (sentence-transformers default) or "onnx"
+LOCAL_EMBEDDING_BACKEND = os.getenv("LOCAL_EMBEDDING_BACKEND", "torch").lower()
+LOCAL_EMBEDDING_BATCH_SIZE = int(os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", "32"))
+# Concurrent inference calls; the model already uses all cores per call
+LOCAL_EMBEDDING_THREADS = int(os.getenv("LOCAL_EMBEDDING_THREADS", "1"))
+
+_model: Any = None
+_model_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+
+
+def is_available() -> bool:
+    """Whether sentence-transformers is installed."""
+    return importlib.util.find_spec("sentence_transformers") is not None
+
+
+def _get_model() -> Any:
+    """Load the model once (thread-safe; first call downloads it if needed)."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                except ImportError as e:
+                    raise RuntimeError(
+                        "EMBEDDING_PROVIDER=local requires sentence-transformers "
+                        "(pip install sentence-transformers)"
+                    ) from e
+                kwargs = {"device": "cpu", "trust_remote_code": True}
+                if LOCAL_EMBEDDING_BACKEND != "torch":
+                    kwargs["backend"] = LOCAL_EMBEDDING_BACKEND
+                _model = SentenceTransformer(LOCAL_EMBEDDING_MODEL, **kwargs)
+    return _model
+
+
+def _encode(texts: List[str]) -> List[List[float]]:
+    vectors = _get_model().encode(
+        texts,
+        batch_size=LOCAL_EMBEDDING_BATCH_SIZE,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    )
+    return vectors.tolist()
+
+
+async def embed_texts_local(texts: List[str]) -> List[List[float]]:
+    """Embed ``texts`` with the in-process model, off the event loop."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=max(1, LOCAL_EMBEDDING_THREADS), thread_name_prefix="local-embed"
+        )
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, _encode, texts)
@@ -0,0 +1,39 @@
+"""
+Matryoshka (truncated-dimension) embeddings for the local vector store.
+
+nomic-embed-text v1.5 is trained with Matryoshka representation learning:
+the leading components of each embedding carry most of its information, so
+the first 256 (or 128) of its 768 dimensions, re-normalised, are still a
+usable embedding. Scanning those short rows is 3-6x cheaper than scanning the
+full ones; searches can then re-rank a shortlist with the full vectors.
+
+Only models trained this way truncate gracefully; for other models the
+short-vector scan loses much more recall.
+"""
+
+import numpy as np
+
+# Rows truncated at a time (bounds temp memory when reading a memmap)
+_TRUNCATE_CHUNK = 16384
+
+
+def truncate_embeddings(vectors: np.ndarray, dim: int) -> np.ndarray:
+    """
+    Keep the first ``dim`` components of (D,) or (N, D) vectors and L2-normalise.
+
+    Works chunk by chunk, so ``vectors`` may be a large memmap. Zero rows stay
+    zero.
+
+    Returns:
+        float32 array of shape (dim,) or (N, dim).
+    """
+    if vectors.ndim == 1:
+        return truncate_embeddings(vectors[None, :], dim)[0]
+    if not 0 < dim <= vectors.shape[1]:
+        raise ValueError(f"Cannot truncate {vectors.shape[1]}D embeddings to {dim}D")
+    out = np.empty((len(vectors), dim), dtype=np.float32)
+    for start in range(0, len(vectors), _TRUNCATE_CHUNK):
+        chunk = np.asarray(vectors[start:start + _TRUNCATE_CHUNK, :dim], dtype=np.float32)
+        norms = np.linalg.norm(chunk, axis=1, keepdims=True)
+        out[start:start + len(chunk)] = chunk / np.where(norms > 0, norms, 1.0)
+    return out
@@ -0,0 +1,83 @@
+"""
+Bulk database writes for ingested conversations.
+
+Inserts the conversations, messages and embeddings of a whole ingest batch
+with one Core ``INSERT`` per table (executemany) inside the caller's
+transaction, instead of building and flushing one ORM object per row. Column
+defaults (timestamps) are still applied by SQLAlchemy.
+"""
+
+import uuid
+from typing import Any, Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from backend.models import Conversation, Embedding, Message, MessageRole
+
+
+def bulk_insert_conversations(db: Session, conversations: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Insert conversations with their messages and embeddings.
+
+    Each dict needs ``id``, ``title``, ``summary``, ``topics``,
+    ``message_count``, ``created_at``, ``messages`` (dicts with ``role``,
+    ``content``, ``sequence_number``) and ``embedding`` (the full vector).
+    New conversations start unclustered at the origin until the next
+    re-processing run.
+
+    The caller commits.
+
+    Returns:
+        Rows inserted per table.
+    """
+    if not conversations:
+        return {"conversations": 0, "messages": 0, "embeddings": 0}
+
+    conversation_rows = []
+    message_rows = []
+    embedding_rows = []
+    for conv in conversations:
+        conversation_id = conv["id"]
+        conversation_rows.append({
+            "id": conversation_id,
+            "title": conv["title"],
+            "summary": conv["summary"],
+            "topics": conv["topics"],
+            "cluster_id": 0,
+            "cluster_name": "Unclustered",
+            "message_count": conv["message_count"],
+            "created_at": conv["created_at"],
+        })
+        message_rows.extend(
+            {
+                "id": str(uuid.uuid4()),
+                "conversation_id": conversation_id,
+                "role": MessageRole(msg["role"]),
+                "content": msg["content"],
+                "sequence_number": msg["sequence_number"],
+            }
+            for msg in conv["messages"]
+        )
+        embedding_rows.append({
+            "conversation_id": conversation_id,
+            "embedding_384d": conv["embedding"],
+            "vector_3d": [0.0, 0.0, 0.0],
+            "start_x": 0.0,
+            "start_y": 0.0,
+            "start_z": 0.0,
+            "end_x": 0.0,
+            "end_y": 0.0,
+            "end_z": 0.0,
+            "magnitude": 1.0,
+        })
+
+    db.execute(insert(Conversation), conversation_rows)
+    if message_rows:
+        db.execute(insert(Message), message_rows)
+    db.execute(insert(Embedding), embedding_rows)
+    return {
+        "conversations": len(conversation_rows),
+        "messages": len(message_rows),
+        "embeddings": len(embedding_rows),
+    }
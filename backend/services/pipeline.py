@@ -0,0 +1,194 @@
+"""
+Staged asyncio pipeline with bounded queues between stages.
+
+Items flow from a source through a chain of stages; consecutive stages are
+connected by an ``asyncio.Queue`` of at most ``queue_size`` items, so a slow
+stage applies back-pressure to everything upstream instead of letting work
+pile up in memory. Each stage runs ``concurrency`` workers of its own, and a
+stage with ``batch_size > 1`` receives lists of whatever items are already
+queued (up to ``batch_size``) so it can make one batched call per list.
+
+Used by the ingest endpoints (``backend.api.ingest``) to overlap parsing,
+summarisation, embedding and persistence across conversations.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# End-of-stream marker passed down the queues
+_END = object()
+
+
+class PipelineStage:
+    """
+    One pipeline stage.
+
+    ``fn`` is an async callable. With ``batch_size == 1`` it takes one item
+    and returns the item to pass on (None drops it); otherwise it takes a
+    list of items and returns a list with one entry per item, in which an
+    exception instance stands for an item that failed on its own. A raised
+    exception drops the item(s); every failed item is counted in ``failed``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[Any], Awaitable[Any]],
+        concurrency: int = 1,
+        batch_size: int = 1,
+    ):
+        if concurrency < 1 or batch_size < 1:
+            raise ValueError(f"Stage {name!r}: concurrency and batch_size must be >= 1")
+        self.name = name
+        self.fn = fn
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "busy_seconds": round(self.busy_seconds, 3),
+        }
+
+
+async def _take(inbox: asyncio.Queue, batch_size: int) -> Optional[List[Any]]:
+    """Wait for one item, then take any already queued up to ``batch_size`` (None at end)."""
+    item = await inbox.get()
+    if item is _END:
+        inbox.put_nowait(_END)  # let sibling workers see it too
+        return None
+    batch = [item]
+    while len(batch) < batch_size and not inbox.empty():
+        item = inbox.get_nowait()
+        if item is _END:
+            inbox.put_nowait(_END)
+            break
+        batch.append(item)
+    return batch
+
+
+async def _run_stage(
+    stage: PipelineStage,
+    inbox: asyncio.Queue,
+    emit: Callable[[Any], Awaitable[None]],
+    drop: Optional[Callable[[Any], Awaitable[None]]] = None,
+) -> None:
+    async def worker() -> None:
+        while True:
+            batch = await _take(inbox, stage.batch_size)
+            if batch is None:
+                return
+            started = time.perf_counter()
+            dropped: List[Any] = []
+            try:
+                if stage.batch_size == 1:
+                    result = await stage.fn(batch[0])
+                    outputs = [] if result is None else [result]
+                    if result is None:
+                        dropped.append(batch[0])
+                else:
+                    outputs = []
+                    for item, out in zip(batch, await stage.fn(batch)):
+                        if isinstance(out, Exception):
+                            stage.failed += 1
+                            logger.warning("Pipeline stage %s failed on an item: %s", stage.name, out)
+                            dropped.append(item)
+                        elif out is None:
+                            dropped.append(item)
+                        else:
+                            outputs.append(out)
+            except Exception as e:
+                stage.failed += len(batch)
+                logger.warning("Pipeline stage %s failed on %d item(s): %s", stage.name, len(batch), e)
+                outputs, dropped = [], batch
+            finally:
+                stage.busy_seconds += time.perf_counter() - started
+            stage.processed += len(batch)
+            for out in outputs:
+                await emit(out)
+            if drop is not None:
+                for item in dropped:
+                    await drop(item)
+
+    await asyncio.gather(*(worker() for _ in range(stage.concurrency)))
+
+
+async def iterate_in_thread(iterable: Iterable[Any]) -> AsyncIterator[Any]:
+    """
+    Iterate a blocking iterable from async code, one ``next()`` per worker thread call.
+
+    Lets a lazily decoding source (e.g. a streaming parser reading a file)
+    feed a pipeline without stalling the event loop.
+    """
+    iterator = iter(iterable)
+    while True:
+        item = await asyncio.to_thread(next, iterator, _END)
+        if item is _END:
+            return
+        yield item
+
+
+async def run_pipeline(
+    source: Union[Iterable[Any], AsyncIterable[Any]],
+    stages: List[PipelineStage],
+    queue_size: int = 16,
+    on_output: Optional[Callable[[Any], Awaitable[None]]] = None,
+    on_drop: Optional[Callable[[Any], Awaitable[None]]] = None,
+) -> List[Any]:
+    """
+    Push every item of ``source`` through ``stages``.
+
+    Args:
+        source: Items to process (a plain or async iterable; it is consumed
+            lazily, only as fast as the first stage accepts items).
+        stages: Stages in order.
+        queue_size: Capacity of each queue between stages.
+        on_output: Awaited with every item that leaves the last stage.
+        on_drop: Awaited with every item a stage dropped or failed on.
+
+    Returns:
+        The outputs of the last stage, in completion order.
+    """
+    if not stages:
+        raise ValueError("A pipeline needs at least one stage")
+    queues = [asyncio.Queue(maxsize=queue_size) for _ in stages]
+    outputs: List[Any] = []
+
+    async def feed() -> None:
+        if hasattr(source, "__aiter__"):
+            async for item in source:
+                await queues[0].put(item)
+        else:
+            for item in source:
+                await queues[0].put(item)
+        await queues[0].put(_END)
+
+    async def collect(item: Any) -> None:
+        outputs.append(item)
+        if on_output is not None:
+            await on_output(item)
+
+    async def stage_task(i: int) -> None:
+        emit = queues[i + 1].put if i + 1 < len(stages) else collect
+        await _run_stage(stages[i], queues[i], emit, on_drop)
+        if i + 1 < len(stages):
+            await queues[i + 1].put(_END)
+
+    tasks = [asyncio.ensure_future(feed())]
+    tasks += [asyncio.ensure_future(stage_task(i)) for i in range(len(stages))]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return outputs
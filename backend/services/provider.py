@@ -1,16 +1,17 @@
 """
 Provider detection for embedding and chat/summarization backends.
 
-Routes to HuggingFace / Groq (cloud) or Ollama (local) based on env vars.
+Routes to HuggingFace / Groq (cloud), Ollama (local server) or an in-process
+model (embeddings only) based on env vars.
 """
 
 import os
 
 
 def get_embedding_provider() -> str:
-    """Return 'huggingface' or 'ollama' based on env config."""
+    """Return 'huggingface', 'ollama' or 'local' based on env config."""
     explicit = os.getenv("EMBEDDING_PROVIDER", "").lower()
-    if explicit in ("huggingface", "ollama"):
+    if explicit in ("huggingface", "ollama", "local"):
         return explicit
     # Auto-detect: if HF token is set, use HuggingFace
     return "huggingface" if os.getenv("HF_API_TOKEN") else "ollama"
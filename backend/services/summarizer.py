@@ -24,6 +24,7 @@ from tenacity import (
     retry_if_exception_type
 )
 
+from backend.http_clients import get_http_client
 from backend.services.provider import get_chat_provider
 
 
@@ -160,25 +161,25 @@ async def _call_groq(conversation_text: str) -> Tuple[str, List[str]]:
 
 async def _call_groq_inner(conversation_text: str) -> Tuple[str, List[str]]:
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                GROQ_API_URL,
-                headers={
-                    "Authorization": f"Bearer {GROQ_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": GROQ_MODEL,
-                    "messages": [
-                        {"role": "system", "content": SUMMARIZE_SYSTEM_PROMPT},
-                        {"role": "user", "content": _build_summarize_user_prompt(conversation_text)}
-                    ],
-                    "response_format": {"type": "json_object"},
-                    "temperature": 0.3,
-                    "max_tokens": 500
-                }
-            )
-            response.raise_for_status()
+        client = get_http_client("groq")
+        response = await client.post(
+            GROQ_API_URL,
+            headers={
+                "Authorization": f"Bearer {GROQ_API_KEY}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": GROQ_MODEL,
+                "messages": [
+                    {"role": "system", "content": SUMMARIZE_SYSTEM_PROMPT},
+                    {"role": "user", "content": _build_summarize_user_prompt(conversation_text)}
+                ],
+                "response_format": {"type": "json_object"},
+                "temperature": 0.3,
+                "max_tokens": 500
+            }
+        )
+        response.raise_for_status()
 
         content = response.json()["choices"][0]["message"]["content"]
         if not content:
@@ -214,24 +215,24 @@ async def _call_ollama(conversation_text: str) -> Tuple[str, List[str]]:
     Call Qwen 2.5 via Ollama's local HTTP API with structured JSON output.
     """
     try:
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                f"{OLLAMA_BASE_URL}/api/chat",
-                json={
-                    "model": OLLAMA_MODEL,
-                    "messages": [
-                        {"role": "system", "content": SUMMARIZE_SYSTEM_PROMPT},
-                        {"role": "user", "content": _build_summarize_user_prompt(conversation_text)}
-                    ],
-                    "format": "json",
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.3,
-                        "num_predict": 500
-                    }
+        client = get_http_client("ollama")
+        response = await client.post(
+            f"{OLLAMA_BASE_URL}/api/chat",
+            json={
+                "model": OLLAMA_MODEL,
+                "messages": [
+                    {"role": "system", "content": SUMMARIZE_SYSTEM_PROMPT},
+                    {"role": "user", "content": _build_summarize_user_prompt(conversation_text)}
+                ],
+                "format": "json",
+                "stream": False,
+                "options": {
+                    "temperature": 0.3,
+                    "num_predict": 500
                 }
-            )
-            response.raise_for_status()
+            }
+        )
+        response.raise_for_status()
 
         content = response.json().get("message", {}).get("content", "")
         if not content:
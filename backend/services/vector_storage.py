@@ -0,0 +1,386 @@
+"""
+Binary on-disk storage for the local vector store.
+
+Replaces the whole-file JSON rewrite with three kinds of files inside one
+data directory:
+
+    meta.json           Metadata sidecar and commit point of the latest snapshot:
+                        {"generation": g, "dim": d, "ids": [...],
+                         "documents": [...], "metadata": [...]}
+    vectors.<g>.npy     Snapshot of the normalised float32 embedding matrix
+                        (row i belongs to ids[i]); memory-mappable.
+    wal.<g>.log         Append-only write-ahead log of upserts and deletes made
+                        after snapshot g.
+
+Each WAL record is:
+
+    <uint32 header_len> <uint32 vector_len> <uint32 crc32> <header json> <float32 vector>
+
+Logs are read back one record at a time. A torn record at the tail of the log
+(crash mid-write) fails its CRC check and is truncated away on the next load.
+
+Compaction folds the WAL into a new snapshot: the caller rotates the log to
+generation g+1 (so new writes keep flowing), writes vectors.<g+1>.npy, then
+atomically replaces meta.json. A crash at any point leaves either the old
+snapshot plus every newer log, or the new snapshot plus its own log; load
+replays all logs from the snapshot's generation on and keeps appending to the
+newest, so the next compaction starts past it.
+
+Only one process writes a data directory: the first to take the inter-process
+lock on ``writer.lock`` (``acquire_writer_lock``). Any other process — e.g. a
+second uvicorn worker — opens the storage read-only: it never appends, rotates,
+truncates or compacts, and instead follows the writer's logs (``follow``) and
+notices new snapshots (``snapshot_changed``).
+"""
+
+import json
+import os
+import re
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no inter-process lock, every process writes
+    fcntl = None
+
+_RECORD_HEADER = struct.Struct("<III")
+_FILE_PATTERN = re.compile(r"^(vectors|wal)\.(\d+)\.(npy|log)$")
+
+# Writer locks held by this process: lock path -> [open lock file, holders].
+# POSIX record locks belong to the process, so storages in the same process
+# share one lock, and it is released only when the last of them closes.
+_writer_locks: Dict[str, list] = {}
+_writer_locks_guard = threading.Lock()
+
+
+class ReadOnlyStorageError(PermissionError):
+    """A write was attempted on storage whose writer is another process."""
+    pass
+
+
+class BinaryVectorStorage:
+    """
+    Snapshot + write-ahead-log persistence for VectorStoreService.
+
+    Not thread-safe on its own; VectorStoreService serialises calls with its lock.
+    """
+
+    def __init__(self, data_dir: str):
+        self.data_dir = Path(data_dir)
+        self.generation = 0  # of the WAL being appended to (>= the snapshot's)
+        self.read_only = False
+        self._wal = None
+        self._wal_bytes = 0
+        self._lock_key: Optional[str] = None
+        self._meta_stamp: Optional[Tuple[int, int]] = None  # meta.json as loaded
+        self._read_offsets: Dict[int, int] = {}  # read-only: bytes read per log
+
+    # ------------------------------------------------------------------
+    # Paths
+    # ------------------------------------------------------------------
+    @property
+    def meta_path(self) -> Path:
+        return self.data_dir / "meta.json"
+
+    def vectors_path(self, generation: int) -> Path:
+        return self.data_dir / f"vectors.{generation}.npy"
+
+    def wal_path(self, generation: int) -> Path:
+        return self.data_dir / f"wal.{generation}.log"
+
+    @property
+    def wal_bytes(self) -> int:
+        """Bytes appended to the current WAL since the last snapshot."""
+        return self._wal_bytes
+
+    @property
+    def lock_path(self) -> Path:
+        return self.data_dir / "writer.lock"
+
+    def acquire_writer_lock(self) -> bool:
+        """
+        Try to become the writer of the data directory.
+
+        Returns:
+            True if this process holds (or already held) the writer lock;
+            False if another process does, in which case the storage is
+            switched to read-only.
+        """
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        key = str(self.lock_path.resolve())
+        with _writer_locks_guard:
+            held = _writer_locks.get(key)
+            if held is None:
+                lock_file = open(self.lock_path, "a+")
+                if fcntl is not None:
+                    try:
+                        fcntl.lockf(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        lock_file.close()
+                        self.read_only = True
+                        return False
+                held = _writer_locks[key] = [lock_file, 0]
+            held[1] += 1
+        self._lock_key = key
+        self.read_only = False
+        return True
+
+    def _release_writer_lock(self) -> None:
+        if self._lock_key is None:
+            return
+        with _writer_locks_guard:
+            held = _writer_locks[self._lock_key]
+            held[1] -= 1
+            if held[1] == 0:
+                held[0].close()
+                del _writer_locks[self._lock_key]
+        self._lock_key = None
+
+    def exists(self) -> bool:
+        """True if a snapshot or WAL has ever been written."""
+        if self.meta_path.exists():
+            return True
+        return self.data_dir.is_dir() and any(self.data_dir.glob("wal.*.log"))
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def load_snapshot(
+        self, mmap: bool = False
+    ) -> Tuple[List[str], List[str], List[Dict[str, Any]], Optional[np.ndarray]]:
+        """
+        Read the committed snapshot.
+
+        Args:
+            mmap: Return the vectors as a read-only np.memmap instead of
+                reading them into memory.
+
+        Returns:
+            (ids, documents, metadata, vectors) — vectors is None for an
+            empty snapshot.
+        """
+        self._read_offsets = {}
+        self._meta_stamp = self._stat_meta()
+        if self._meta_stamp is None:
+            self.generation = 0
+            return [], [], [], None
+
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        self.generation = meta["generation"]
+        ids = meta["ids"]
+        vectors = None
+        if ids:
+            vectors = np.load(self.vectors_path(self.generation), mmap_mode="r" if mmap else None)
+        return ids, meta["documents"], meta["metadata"], vectors
+
+    def replay(self) -> Iterator[Tuple[Dict[str, Any], Optional[np.ndarray]]]:
+        """
+        Yield (header, vector) for every WAL record after the snapshot.
+
+        Also replays the logs of interrupted compactions (generations above
+        the snapshot's), in order. Once replay is complete ``generation``
+        is that of the newest log, which is opened for appending (read-only:
+        followed from where replay stopped).
+        """
+        generations = self._log_generations()
+        for gen in generations:
+            yield from self._read_log(gen)
+        if generations:
+            self.generation = generations[-1]
+        if not self.read_only:
+            self._open_wal(self.generation)
+
+    def follow(self) -> Iterator[Tuple[Dict[str, Any], Optional[np.ndarray]]]:
+        """
+        Read-only: yield the records the writer appended since the last call.
+
+        Logs removed by the writer's compaction meanwhile are skipped; the
+        caller detects that compaction with snapshot_changed() and reloads.
+        """
+        for gen in self._log_generations():
+            try:
+                yield from self._read_log(gen)
+            except FileNotFoundError:
+                continue
+            self.generation = gen
+
+    def snapshot_changed(self) -> bool:
+        """Read-only: whether the writer has committed a snapshot since load_snapshot()."""
+        return self._stat_meta() != self._meta_stamp
+
+    def _stat_meta(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.meta_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _log_generations(self) -> List[int]:
+        """Generations of the logs from the snapshot's on, ascending."""
+        paths = self.data_dir.iterdir() if self.data_dir.is_dir() else []
+        return sorted(
+            int(match.group(2))
+            for match in (_FILE_PATTERN.match(path.name) for path in paths)
+            if match and match.group(1) == "wal" and int(match.group(2)) >= self.generation
+        )
+
+    def _read_log(self, generation: int) -> Iterator[Tuple[Dict[str, Any], Optional[np.ndarray]]]:
+        """
+        Yield the records of one log, reading them from the file one at a time.
+
+        Read-only storages start where the previous read of the log stopped
+        and leave an incomplete tail alone (the writer may be mid-append).
+        """
+        path = self.wal_path(generation)
+        offset = self._read_offsets.get(generation, 0) if self.read_only else 0
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            f.seek(offset)
+            while offset + _RECORD_HEADER.size <= size:
+                header_len, vector_len, crc = _RECORD_HEADER.unpack(f.read(_RECORD_HEADER.size))
+                end = offset + _RECORD_HEADER.size + header_len + vector_len
+                if end > size:
+                    break
+                payload = f.read(header_len + vector_len)
+                if zlib.crc32(payload) != crc:
+                    break
+
+                header = json.loads(payload[:header_len])
+                vector = None
+                if vector_len:
+                    vector = np.frombuffer(payload, dtype=np.float32, count=vector_len // 4,
+                                           offset=header_len)
+                yield header, vector
+                offset = end
+                if self.read_only:
+                    self._read_offsets[generation] = offset
+
+        if offset < size and not self.read_only:
+            # Torn write at the tail — drop it so appends start on a record boundary
+            with open(path, "r+b") as f:
+                f.truncate(offset)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise ReadOnlyStorageError(
+                f"{self.data_dir} is open read-only (another process is the writer)"
+            )
+
+    def _open_wal(self, generation: int) -> None:
+        self._check_writable()
+        if self._wal is not None:
+            self._wal.close()
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        path = self.wal_path(generation)
+        self._wal = open(path, "ab")
+        self._wal_bytes = path.stat().st_size
+
+    def _append(self, header: Dict[str, Any], vector: Optional[np.ndarray] = None) -> None:
+        if self._wal is None:
+            self._open_wal(self.generation)
+        header_bytes = json.dumps(header).encode("utf-8")
+        vector_bytes = b"" if vector is None else np.ascontiguousarray(vector, dtype=np.float32).tobytes()
+        payload = header_bytes + vector_bytes
+        record = _RECORD_HEADER.pack(len(header_bytes), len(vector_bytes), zlib.crc32(payload)) + payload
+        self._wal.write(record)
+        self._wal.flush()
+        self._wal_bytes += len(record)
+
+    def append_upsert(
+        self,
+        conversation_id: str,
+        document: str,
+        metadata: Dict[str, Any],
+        vector: np.ndarray,
+    ) -> None:
+        """Log an upsert of a (normalised) vector with its document and metadata."""
+        self._append(
+            {"op": "upsert", "id": conversation_id, "document": document, "metadata": metadata},
+            vector,
+        )
+
+    def append_delete(self, conversation_id: str) -> None:
+        """Log a delete."""
+        self._append({"op": "delete", "id": conversation_id})
+
+    def append_metadata(self, conversation_id: str, metadata: Dict[str, Any]) -> None:
+        """Log a metadata-only update (the vector and document are unchanged)."""
+        self._append({"op": "metadata", "id": conversation_id, "metadata": metadata})
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+    def rotate(self) -> int:
+        """
+        Start a new WAL generation and return it.
+
+        Writes after this call land in the new log; the caller must then
+        pass the state as of this instant to write_snapshot().
+        """
+        new_generation = self.generation + 1
+        self._open_wal(new_generation)
+        return new_generation
+
+    def write_snapshot(
+        self,
+        generation: int,
+        ids: List[str],
+        documents: List[str],
+        metadata: List[Dict[str, Any]],
+        vectors: Optional[np.ndarray],
+    ) -> None:
+        """Write and commit snapshot ``generation``, then delete older files."""
+        self._check_writable()
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+
+        if ids:
+            tmp_vectors = self.data_dir / f"vectors.{generation}.npy.tmp"
+            with open(tmp_vectors, "wb") as f:
+                np.save(f, np.ascontiguousarray(vectors, dtype=np.float32))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_vectors, self.vectors_path(generation))
+
+        meta = {
+            "generation": generation,
+            "dim": int(vectors.shape[1]) if ids else 0,
+            "ids": ids,
+            "documents": documents,
+            "metadata": metadata,
+        }
+        tmp_meta = self.data_dir / "meta.json.tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_meta, self.meta_path)  # commit point
+
+        self.generation = generation
+        self._remove_stale_files()
+
+    def _remove_stale_files(self) -> None:
+        for path in self.data_dir.iterdir():
+            match = _FILE_PATTERN.match(path.name)
+            if match and int(match.group(2)) < self.generation:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def close(self) -> None:
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
+        self._release_writer_lock()
+
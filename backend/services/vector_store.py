@@ -1,23 +1,76 @@
 """
 Local Vector Store Service for CORTEX.
 
-A lightweight, pure-numpy vector store that persists to a JSON file on disk.
+A lightweight, pure-numpy vector store persisted to a binary snapshot plus an
+append-only write-ahead log (see ``backend.services.vector_storage``).
 Replaces the previous OpenAI Vector Store with zero external service dependencies.
 
 Uses cosine similarity for semantic search over nomic-embed-text embeddings (768D).
+Embeddings are kept in memory as one preallocated, L2-normalised float32 matrix
+so a query is a single matrix-vector product plus a top-k selection.
 
-Storage format:
-    {
-        "conversation_id": {
-            "document": "...",
-            "embedding": [float, ...],
-            "metadata": {...}
-        },
-        ...
-    }
+On-disk layout (VECTOR_STORE_PATH=/data/.vector_store.json):
+    /data/.vector_store/meta.json         ids, documents, metadata
+    /data/.vector_store/vectors.<g>.npy   float32 embedding snapshot
+    /data/.vector_store/wal.<g>.log       upserts/deletes since the snapshot
+
+A legacy ``.vector_store.json`` file at VECTOR_STORE_PATH is migrated into the
+binary layout the first time the store is opened; the JSON file is left in
+place but no longer read or written.
+
+By default the snapshot's vector block is opened with ``np.memmap`` (read-only),
+so startup does not copy or parse vectors and the pages are shared between
+processes through the OS page cache. Set VECTOR_STORE_MMAP=false to load the
+snapshot fully into memory instead.
+
+Only one process writes a store: the first to open it takes an inter-process
+lock on its data directory. A store opened by another process (e.g. a second
+uvicorn worker) is read-only: writes raise ReadOnlyStorageError, and every
+read first applies what the writer has logged since, reloading after the
+writer's compactions, so searches stay current in every worker.
+
+Stores with at least VECTOR_ANN_MIN_ROWS conversations also build an IVF
+approximate nearest-neighbour index (``backend.services.ann_index``) in the
+background; searches then score only the ``nprobe`` nearest lists. ``nprobe``
+can be set per request (0 = exact scan).
+
+With VECTOR_QUANTIZATION=int8 every row is also kept as int8 codes with a
+per-row scale (``backend.services.quantization``). Searches score the codes
+first and re-rank the best ``max_results * VECTOR_RERANK_FACTOR`` rows with the
+exact float32 vectors, so the float32 snapshot can stay memory-mapped while
+only the 4x smaller codes have to be resident.
+
+With VECTOR_MATRYOSHKA_DIM=<d> (e.g. 256 or 128) every row is also kept
+truncated to its first ``d`` dimensions and re-normalised
+(``backend.services.matryoshka``). Searches scan those short rows and, unless
+VECTOR_MATRYOSHKA_RERANK=false, re-rank the shortlist with the full vectors
+as for int8. Only useful for Matryoshka-trained models such as
+nomic-embed-text v1.5.
+
+Searches can be restricted to a cluster and/or a set of topics. The store keeps
+a per-row cluster column and per-topic inverted lists built from each
+conversation's ``cluster_id`` / ``topics`` metadata, so filters select the
+matching rows before anything is scored.
+
+``hybrid_search()`` fuses cosine similarity with BM25 keyword scores from an
+in-process inverted index over the stored documents
+(``backend.services.keyword_index``). The index is built from the documents by
+a background thread when the store is opened and updated on every
+upsert/delete after that; until it is ready, hybrid searches rank by cosine
+similarity alone rather than wait for it.
+
+With EMBEDDING_CHUNKING=true (``backend.services.chunker``) a second store at
+VECTOR_CHUNK_STORE_PATH holds one vector per transcript window, keyed
+``<conversation_id>#<n>`` with the parent id in its metadata. Hybrid search
+then also scans the chunks, aggregates their similarities per conversation
+(VECTOR_CHUNK_AGGREGATION: ``max`` or ``mean``) and uses that in place of the
+conversation's own cosine when it is higher.
 """
 
+import asyncio
+import functools
 import json
+import logging
 import os
 import threading
 from pathlib import Path
@@ -25,6 +78,15 @@ from typing import Dict, List, Optional, Any
 
 import numpy as np
 
+from backend.services.ann_index import IVFIndex, default_n_lists, nearest_centroids, train_centroids
+from backend.services.chunker import EMBEDDING_CHUNKING
+from backend.services.keyword_index import BM25Index
+from backend.services.matryoshka import truncate_embeddings
+from backend.services.quantization import int8_scores, quantize_int8
+from backend.services.vector_storage import BinaryVectorStorage, ReadOnlyStorageError
+
+logger = logging.getLogger(__name__)
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
@@ -33,42 +95,845 @@ VECTOR_STORE_PATH = os.getenv(
     os.path.join(os.path.dirname(os.path.dirname(__file__)), ".vector_store.json"),
 )
 
+# Initial row capacity of the in-memory embedding matrix (grows geometrically)
+INITIAL_CAPACITY = 1024
+# Compact the matrix once tombstoned rows exceed this fraction of used rows
+COMPACTION_RATIO = 0.25
+# Fold the WAL into a new snapshot once it outgrows the snapshot (and this floor)
+WAL_COMPACTION_MIN_BYTES = 16 * 1024 * 1024
+# Memory-map the snapshot's vector block instead of reading it into RAM
+VECTOR_STORE_MMAP = os.getenv("VECTOR_STORE_MMAP", "true").lower() in ("1", "true", "yes")
+# Top-k selection strategy: "partition" (argpartition, O(N)) or "sort" (full argsort)
+SEARCH_SELECTION = os.getenv("VECTOR_SEARCH_SELECTION", "partition")
+SELECTION_STRATEGIES = ("partition", "sort")
+# Approximate nearest-neighbour index: "ivf" or "none"
+VECTOR_ANN_INDEX = os.getenv("VECTOR_ANN_INDEX", "ivf").lower()
+# Only build the ANN index once the store holds this many conversations
+ANN_MIN_ROWS = int(os.getenv("VECTOR_ANN_MIN_ROWS", "20000"))
+# Default number of IVF lists probed per query (0 = exact scan)
+ANN_NPROBE = int(os.getenv("VECTOR_ANN_NPROBE", "32"))
+# Retrain the index once the store has grown this many times past its training size
+ANN_RETRAIN_GROWTH = 4
+# Compressed first-stage representation: "none" or "int8"
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none").lower()
+QUANTIZATION_MODES = ("none", "int8")
+# Rows re-ranked with exact float32 vectors per requested result
+RERANK_FACTOR = int(os.getenv("VECTOR_RERANK_FACTOR", "4"))
+# Matryoshka first stage: scan the first N dimensions of every row (0 = off)
+MATRYOSHKA_DIM = int(os.getenv("VECTOR_MATRYOSHKA_DIM", "0"))
+# Re-rank the Matryoshka shortlist with the full-dimension vectors
+MATRYOSHKA_RERANK = os.getenv("VECTOR_MATRYOSHKA_RERANK", "true").lower() in ("1", "true", "yes")
+# Queries scored per matrix-matrix product in search_many() (bounds the score buffer)
+SEARCH_BATCH_QUERIES = 32
+# Rows gathered at a time when scoring a subset of rows (bounds temp memory)
+GATHER_CHUNK = 16384
+# _row_cluster value for rows without a cluster
+_NO_CLUSTER = -1
+# Candidates taken from each of the semantic and keyword rankings per hybrid result
+HYBRID_CANDIDATE_FACTOR = 4
+
+# Chunk store (EMBEDDING_CHUNKING): per-window child vectors of each conversation
+VECTOR_CHUNK_STORE_PATH = os.getenv(
+    "VECTOR_CHUNK_STORE_PATH",
+    str(Path(VECTOR_STORE_PATH).with_name(
+        Path(VECTOR_STORE_PATH).stem + "_chunks" + Path(VECTOR_STORE_PATH).suffix
+    )),
+)
+CHUNK_AGGREGATIONS = ("max", "mean")
+CHUNK_AGGREGATION = os.getenv("VECTOR_CHUNK_AGGREGATION", "max").lower()
+# Chunks retrieved per requested conversation before aggregation
+CHUNK_CANDIDATE_FACTOR = 8
+
+
+def data_dir_for(store_path: str) -> str:
+    """Directory holding the binary store for a VECTOR_STORE_PATH value."""
+    path = Path(store_path)
+    return str(path.with_suffix("") if path.suffix == ".json" else path)
+
+
+def select_top_k(
+    scores: np.ndarray,
+    k: int,
+    score_threshold: float = 0.0,
+    strategy: str = "partition",
+) -> np.ndarray:
+    """
+    Indices of the ``k`` highest scores that are >= ``score_threshold``, best first.
+
+    Rows scored ``-inf`` (tombstones) are never returned.
+
+    Args:
+        scores: 1-D score array.
+        k: Number of indices to return at most.
+        score_threshold: Minimum score to include.
+        strategy: "partition" masks the threshold in one vectorised pass and
+            uses ``np.argpartition`` so only the k survivors are sorted;
+            "sort" is the original full ``argsort`` + early-exit scan, kept
+            for benchmarking.
+    """
+    if strategy not in SELECTION_STRATEGIES:
+        raise ValueError(f"Unknown selection strategy: {strategy!r}")
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    if strategy == "sort":
+        selected = []
+        for idx in np.argsort(-scores):
+            if scores[idx] < score_threshold or scores[idx] == -np.inf:
+                break
+            selected.append(idx)
+            if len(selected) >= k:
+                break
+        return np.asarray(selected, dtype=np.int64)
+
+    candidates = np.flatnonzero((scores >= score_threshold) & (scores > -np.inf))
+    if len(candidates) > k:
+        top = np.argpartition(scores[candidates], len(candidates) - k)[-k:]
+        candidates = candidates[top]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
 
 # ---------------------------------------------------------------------------
 # Service Class
 # ---------------------------------------------------------------------------
 class VectorStoreService:
     """
-    In-process vector store backed by a JSON file and numpy cosine similarity.
+    In-process vector store backed by binary files and numpy cosine similarity.
+
+    Embeddings are L2-normalised at insert time and stored in two segments:
+
+    - ``_base``: the snapshot's rows ``[0, _n_base)``, memory-mapped read-only
+      (None when the store was loaded into memory or started empty).
+    - ``_matrix``: a preallocated in-memory float32 array holding rows
+      ``[_n_base, _n_rows)``; it grows geometrically as rows are appended.
+
+    ``_row_ids`` / ``_id_rows`` map rows to conversation IDs. Deleted rows are
+    tombstoned (``_live`` is cleared). Tombstones in ``_matrix`` are reclaimed by
+    compaction once they make up ``COMPACTION_RATIO`` of its rows; tombstones in
+    the read-only base are dropped by the next storage snapshot.
+
+    Every upsert/delete is appended to the write-ahead log; a background thread
+    periodically folds the log into a fresh snapshot.
+
+    ``_ann`` is the optional IVF index; it is kept in step with the matrix on
+    every append, overwrite and compaction, and persisted next to the snapshot.
+    ``_codes`` / ``_code_scales`` are the optional int8 copies of every row
+    (both segments), maintained the same way but rebuilt on load; ``_short``
+    is the optional Matryoshka copy (first ``matryoshka_dim`` dimensions,
+    re-normalised), handled likewise.
+
+    ``_row_cluster`` (cluster id per row) and ``_topic_ids`` (topic -> set of
+    conversation IDs) index the ``cluster_id`` / ``topics`` metadata for
+    filtered searches. ``_keywords`` is the BM25 index over the documents;
+    it is built by a background thread after loading (None until then) and
+    kept current on every upsert and delete.
 
     Thread-safe via a simple reentrant lock.
     """
 
-    def __init__(self, store_path: Optional[str] = None):
+    def __init__(
+        self,
+        store_path: Optional[str] = None,
+        mmap: Optional[bool] = None,
+        quantization: Optional[str] = None,
+        matryoshka_dim: Optional[int] = None,
+        matryoshka_rerank: Optional[bool] = None,
+        keyword_index: bool = True,
+    ):
         self.store_path = store_path or VECTOR_STORE_PATH
+        self.mmap = VECTOR_STORE_MMAP if mmap is None else mmap
+        self.quantization = quantization or VECTOR_QUANTIZATION
+        if self.quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization mode: {self.quantization!r}")
+        self.matryoshka_dim = MATRYOSHKA_DIM if matryoshka_dim is None else matryoshka_dim
+        self.matryoshka_rerank = MATRYOSHKA_RERANK if matryoshka_rerank is None else matryoshka_rerank
+        if self.matryoshka_dim < 0:
+            raise ValueError(f"Invalid Matryoshka dimension: {self.matryoshka_dim}")
+        if self.matryoshka_dim and self.quantization != "none":
+            raise ValueError("Matryoshka truncation cannot be combined with quantization")
         self._lock = threading.RLock()
         self._data: Dict[str, Dict[str, Any]] = {}
+        self._base: Optional[np.ndarray] = None
+        self._n_base = 0
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._live = np.zeros(0, dtype=bool)
+        self._dim = 0
+        self._row_ids: List[Optional[str]] = []
+        self._id_rows: Dict[str, int] = {}
+        self._n_rows = 0
+        self._n_dead = 0
+        self._n_dead_base = 0
+        self._codes: Optional[np.ndarray] = None
+        self._code_scales: Optional[np.ndarray] = None
+        self._short: Optional[np.ndarray] = None
+        self._row_cluster = np.zeros(0, dtype=np.int32)
+        self._topic_ids: Dict[str, set] = {}
+        self._keywords: Optional[BM25Index] = None
+        self._keyword_thread: Optional[threading.Thread] = None
+        self._keyword_build_lock = threading.Lock()
+        self._keywords_touched: Optional[set] = None  # documents written during a build
+        self._storage = BinaryVectorStorage(data_dir_for(self.store_path))
+        self.read_only = not self._storage.acquire_writer_lock()
+        if self.read_only:
+            logger.warning(
+                "Vector store %s is open read-only: another process is its writer",
+                self._storage.data_dir,
+            )
+        self._keyword_index_enabled = keyword_index
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._ann: Optional[IVFIndex] = None
+        self._ann_trained_rows = 0
+        self._ann_thread: Optional[threading.Thread] = None
+        self._ann_touched: Optional[set] = None  # rows written during a build
+        self._layout_version = 0  # bumped whenever rows are renumbered
         self._load()
+        self._load_ann_index()
+        self._maybe_build_ann_index()
+        if keyword_index:
+            self._start_keyword_build()
 
     # ------------------------------------------------------------------
     # Persistence helpers
     # ------------------------------------------------------------------
     def _load(self) -> None:
-        """Load store from disk (if it exists)."""
-        if os.path.exists(self.store_path):
+        """Load the snapshot and replay the WAL, migrating legacy JSON if needed."""
+        if self._storage.exists():
+            ids, documents, metadata, vectors = self._storage.load_snapshot(mmap=self.mmap)
+            self._data = {
+                cid: {"document": doc, "metadata": meta}
+                for cid, doc, meta in zip(ids, documents, metadata)
+            }
+            self._reset_matrix(ids, vectors)
+
+            for header, vector in self._storage.replay():
+                self._apply(header, vector)
+        elif os.path.exists(self.store_path):
+            self._migrate_json()
+
+    def _apply(self, header: Dict[str, Any], vector: Optional[np.ndarray]) -> None:
+        """Apply one WAL record in memory."""
+        if header["op"] == "upsert":
+            self._put(header["id"], header["document"], vector, header["metadata"])
+        elif header["op"] == "delete":
+            self._drop(header["id"])
+        elif header["op"] == "metadata":
+            self._set_metadata(header["id"], header["metadata"])
+
+    def _sync(self) -> None:
+        """Read-only: catch up with the writer process's log, reloading after its compactions."""
+        if not self.read_only:
+            return
+        with self._lock:
+            for header, vector in self._storage.follow():
+                self._apply(header, vector)
+            if self._storage.snapshot_changed():
+                self._reload()
+
+    def _reload(self) -> None:
+        """Rebuild all in-memory state from the latest snapshot and logs on disk."""
+        if self._keywords_touched is not None:
+            # A keyword build in progress must also drop documents gone after the reload
+            self._keywords_touched.update(self._data)
+        self._data = {}
+        self._keywords = None
+        for attempt in range(3):
             try:
-                with open(self.store_path, "r") as f:
-                    self._data = json.load(f)
-            except (json.JSONDecodeError, OSError):
-                self._data = {}
+                self._load()
+                break
+            except FileNotFoundError:
+                # The writer replaced the snapshot while it was being read
+                if attempt == 2:
+                    raise
+        self._load_ann_index()
+        self._maybe_build_ann_index()
+        if self._keyword_index_enabled:
+            self._start_keyword_build()
+
+    def _check_writable(self) -> None:
+        """Raise unless this process is the writer, taking over if the writer has exited."""
+        if not self.read_only:
+            return
+        with self._lock:
+            if self.read_only and self._storage.acquire_writer_lock():
+                self.read_only = False
+                self._reload()
+                logger.info("Vector store %s taken over for writing", self._storage.data_dir)
+        if self.read_only:
+            raise ReadOnlyStorageError(
+                f"Vector store {self._storage.data_dir} is open read-only (another process is the writer)"
+            )
+
+    @property
+    def _ann_path(self) -> Path:
+        return self._storage.data_dir / "ivf.npz"
+
+    def _load_ann_index(self) -> None:
+        """Restore a persisted IVF index, assigning rows it has not seen yet."""
+        if VECTOR_ANN_INDEX != "ivf" or not self._ann_path.exists() or not self._id_rows:
+            return
+        try:
+            index, ids, assign = IVFIndex.load(self._ann_path)
+        except (OSError, ValueError, KeyError):
+            return
+        if index.centroids.shape[1] != self._dim:
+            return
+
+        saved = dict(zip(ids, assign.tolist()))
+        rows_assign = np.zeros(self._n_rows, dtype=np.int32)
+        missing = []
+        for row, cid in enumerate(self._row_ids):
+            if cid is None:
+                continue
+            if cid in saved:
+                rows_assign[row] = saved[cid]
+            else:
+                missing.append(row)
+        if missing:
+            missing = np.asarray(missing)
+            rows_assign[missing] = nearest_centroids(self._gather(missing), index.centroids)
+
+        index.set_assignments(rows_assign)
+        self._ann = index
+        self._ann_trained_rows = len(ids)
+
+    def _migrate_json(self) -> None:
+        """One-time import of the legacy whole-file JSON store."""
+        try:
+            with open(self.store_path, "r") as f:
+                legacy = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return
+
+        for cid, entry in legacy.items():
+            self._put(cid, entry["document"], entry["embedding"], entry.get("metadata") or {})
+        if self.read_only:
+            return
+
+        self._storage.write_snapshot(self._storage.generation, *self._snapshot_state())
+        logger.info(
+            "Migrated %d conversations from %s to %s",
+            len(self._data), self.store_path, self._storage.data_dir,
+        )
+
+    def _snapshot_state(self):
+        """Copy of (ids, documents, metadata, vectors) for the live rows."""
+        keep = np.flatnonzero(self._live[: self._n_rows])
+        ids = [self._row_ids[i] for i in keep]
+        documents = [self._data[cid]["document"] for cid in ids]
+        metadata = [self._data[cid]["metadata"] for cid in ids]
+        vectors = self._gather(keep) if ids else None
+        return ids, documents, metadata, vectors
+
+    def _ann_state(self):
+        """Copy of (centroids, live-row assignments) for persisting the index."""
+        if self._ann is None:
+            return None
+        keep = np.flatnonzero(self._live[: self._n_rows])
+        return self._ann.centroids, self._ann.assign[keep].copy()
+
+    def _write_snapshot(self, generation: int, state, ann_state) -> None:
+        """Background compaction body: write the snapshot, then the index."""
+        self._storage.write_snapshot(generation, *state)
+        if ann_state is not None:
+            IVFIndex.save(self._ann_path, ann_state[0], state[0], ann_state[1])
+
+    def _maybe_compact_storage(self) -> None:
+        """Start a background snapshot once the WAL outgrows the snapshot."""
+        snapshot_bytes = self._n_rows * self._dim * 4
+        if self._storage.wal_bytes > max(WAL_COMPACTION_MIN_BYTES, snapshot_bytes):
+            self.compact_storage()
+
+    def compact_storage(self, wait: bool = False) -> None:
+        """
+        Fold the WAL into a new snapshot on a background thread.
+
+        Writes keep flowing into a fresh WAL while the snapshot is written.
+
+        Args:
+            wait: Block until the snapshot is committed.
+        """
+        self._check_writable()
+        with self._lock:
+            thread = self._compaction_thread
+            if thread is None or not thread.is_alive():
+                generation = self._storage.rotate()
+                thread = threading.Thread(
+                    target=self._write_snapshot,
+                    args=(generation, self._snapshot_state(), self._ann_state()),
+                    name="vector-store-compaction",
+                    daemon=True,
+                )
+                thread.start()
+                self._compaction_thread = thread
+        if wait:
+            thread.join()
+
+    def close(self) -> None:
+        """Wait for any running compaction or index build and close the WAL."""
+        for thread in (self._compaction_thread, self._ann_thread, self._keyword_thread):
+            if thread is not None:
+                thread.join()
+        with self._lock:
+            self._storage.close()
+
+    # ------------------------------------------------------------------
+    # ANN index
+    # ------------------------------------------------------------------
+    def _maybe_build_ann_index(self) -> None:
+        """Start a background IVF build once the store is big enough (or has outgrown it)."""
+        if VECTOR_ANN_INDEX != "ivf":
+            return
+        n_live = self._n_rows - self._n_dead
+        if n_live < ANN_MIN_ROWS:
+            return
+        if self._ann is not None and n_live < ANN_RETRAIN_GROWTH * self._ann_trained_rows:
+            return
+        if self._ann_thread is not None and self._ann_thread.is_alive():
+            return
+        self._ann_thread = threading.Thread(
+            target=self.build_ann_index, name="vector-store-ann-build", daemon=True
+        )
+        self._ann_thread.start()
+
+    def build_ann_index(self, n_lists: Optional[int] = None, seed: int = 0) -> bool:
+        """
+        Train an IVF index over the current rows and install it.
+
+        Training and the bulk assignment run without holding the store lock;
+        rows written meanwhile are re-assigned before the index is installed.
+
+        Args:
+            n_lists: Number of IVF lists (default: sqrt of the row count).
+            seed: RNG seed for k-means.
+
+        Returns:
+            True if an index was built.
+        """
+        with self._lock:
+            keep = np.flatnonzero(self._live[: self._n_rows])
+            if len(keep) == 0:
+                return False
+            n_lists = n_lists or default_n_lists(len(keep))
+            rng = np.random.default_rng(seed)
+            sample_rows = np.sort(rng.choice(keep, size=min(len(keep), n_lists * 256), replace=False))
+            sample = self._gather(sample_rows)
+            base, matrix, nb, n_rows = self._base, self._matrix, self._n_base, self._n_rows
+            version = self._layout_version
+            self._ann_touched = set()
+
+        try:
+            centroids = train_centroids(sample, n_lists, seed=seed)
+            assign = np.empty(n_rows, dtype=np.int32)
+            if nb:
+                assign[:nb] = nearest_centroids(base, centroids)
+            assign[nb:] = nearest_centroids(matrix[: n_rows - nb], centroids)
+
+            with self._lock:
+                index = IVFIndex(centroids)
+                if version != self._layout_version:
+                    # Rows were renumbered meanwhile: assign everything again
+                    index.set_assignments(
+                        nearest_centroids(self._gather(np.arange(self._n_rows)), centroids)
+                    )
+                else:
+                    index.set_assignments(assign)
+                    redo = sorted(self._ann_touched | set(range(n_rows, self._n_rows)))
+                    for row in redo:
+                        index.assign_row(row, self._gather(np.asarray([row]))[0])
+                self._ann = index
+                self._ann_trained_rows = len(keep)
+                ann_state = self._ann_state()
+                ids = [self._row_ids[i] for i in np.flatnonzero(self._live[: self._n_rows])]
+        finally:
+            self._ann_touched = None
+
+        if not self.read_only:
+            IVFIndex.save(self._ann_path, ann_state[0], ids, ann_state[1])
+        logger.info("Built IVF index with %d lists over %d conversations", n_lists, len(keep))
+        return True
+
+    # ------------------------------------------------------------------
+    # Embedding matrix helpers (callers must hold self._lock)
+    # ------------------------------------------------------------------
+    def _reset_matrix(
+        self,
+        ids: List[str],
+        vectors: Optional[np.ndarray],
+        dim: int = 0,
+    ) -> None:
+        """
+        Replace all rows with already-normalised ``vectors`` (row i = ids[i]).
+
+        A memory-mapped ``vectors`` array becomes the read-only base segment;
+        anything else is copied into the in-memory matrix.
+        """
+        n = len(ids)
+        dim = vectors.shape[1] if n else dim
+        if n and isinstance(vectors, np.memmap):
+            self._base, self._n_base = vectors, n
+        else:
+            self._base, self._n_base = None, 0
+        tail_rows = n - self._n_base
+        capacity = max(INITIAL_CAPACITY, tail_rows)
+
+        self._matrix = np.zeros((capacity, dim), dtype=np.float32)
+        if tail_rows:
+            self._matrix[:tail_rows] = vectors
+        self._live = np.zeros(self._n_base + capacity, dtype=bool)
+        self._live[:n] = True
+        if self.quantization == "int8":
+            self._codes = np.zeros((self._n_base + capacity, dim), dtype=np.int8)
+            self._code_scales = np.zeros(self._n_base + capacity, dtype=np.float32)
+            if n:
+                self._codes[:n], self._code_scales[:n] = quantize_int8(vectors)
+        self._short = None
+        if 0 < self.matryoshka_dim < dim:
+            self._short = np.zeros((self._n_base + capacity, self.matryoshka_dim), dtype=np.float32)
+            if n:
+                self._short[:n] = truncate_embeddings(vectors, self.matryoshka_dim)
+        self._dim = dim
+        self._row_ids = list(ids)
+        self._id_rows = {cid: row for row, cid in enumerate(ids)}
+        self._n_rows = n
+        self._n_dead = 0
+        self._n_dead_base = 0
+        self._ann = None
+        self._layout_version += 1
+
+        self._row_cluster = np.full(self._n_base + capacity, _NO_CLUSTER, dtype=np.int32)
+        self._topic_ids = {}
+        for cid in ids:
+            entry = self._data.get(cid)
+            if entry is not None:
+                self._index_filters(cid, entry["metadata"])
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        """Return ``vector`` as an L2-normalised float32 array (zeros stay zeros)."""
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        if norm > 0:
+            vec = vec / norm
+        return vec
+
+    def _scores(self, queries: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity of normalised queries against every row (dead rows = -inf).
+
+        ``queries`` is one (D,) vector or a (Q, D) batch; the result is (N,) or
+        (Q, N) respectively.
+        """
+        nb = self._n_base
+        scores = np.empty((self._n_rows,) + queries.shape[:-1], dtype=np.float32)
+        if nb:
+            scores[:nb] = self._base @ queries.T
+        scores[nb:] = self._matrix[: self._n_rows - nb] @ queries.T
+        scores[~self._live[: self._n_rows]] = -np.inf
+        return np.ascontiguousarray(scores.T)
+
+    def _approx_scores(self, queries: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """int8 first-stage scores for ``rows`` (default: every row, dead rows = -inf)."""
+        if rows is not None:
+            return int8_scores(self._codes[rows], self._code_scales[rows], queries.T).T
+        scores = int8_scores(self._codes[: self._n_rows], self._code_scales[: self._n_rows], queries.T)
+        scores[~self._live[: self._n_rows]] = -np.inf
+        return np.ascontiguousarray(scores.T)
+
+    def _short_scores(self, queries: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Matryoshka first-stage scores for ``rows`` (default: every row, dead rows = -inf)."""
+        queries = truncate_embeddings(queries, self.matryoshka_dim)
+        if rows is not None:
+            return queries @ self._short[rows].T
+        scores = self._short[: self._n_rows] @ queries.T
+        scores[~self._live[: self._n_rows]] = -np.inf
+        return np.ascontiguousarray(scores.T)
+
+    def _row_scores(self, queries: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Exact scores of (D,) or (Q, D) queries against ``rows`` only."""
+        out = np.empty(queries.shape[:-1] + (len(rows),), dtype=np.float32)
+        for start in range(0, len(rows), GATHER_CHUNK):
+            chunk = rows[start:start + GATHER_CHUNK]
+            out[..., start:start + len(chunk)] = queries @ self._gather(chunk).T
+        return out
+
+    def _scan(self, queries: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        First-stage scores of (Q, D) queries against ``rows`` (default: every row).
+
+        int8 scores when quantisation is enabled, truncated-vector cosines in
+        Matryoshka mode, exact cosine similarities otherwise (rows are
+        pre-normalised, so dot products are cosines).
+        """
+        # A single query takes the (slightly faster) matrix-vector path
+        q = queries[0] if len(queries) == 1 else queries
+        if self._codes is not None:
+            scores = self._approx_scores(q, rows)
+        elif self._short is not None:
+            scores = self._short_scores(q, rows)
+        elif rows is None:
+            scores = self._scores(q)
         else:
-            self._data = {}
+            scores = self._row_scores(q, rows)
+        return scores[None] if len(queries) == 1 else scores
+
+    def _gather(self, rows: np.ndarray) -> np.ndarray:
+        """Copy the vectors of ``rows`` (indices into either segment)."""
+        nb = self._n_base
+        out = np.empty((len(rows), self._dim), dtype=np.float32)
+        in_base = rows < nb
+        if in_base.any():
+            out[in_base] = self._base[rows[in_base]]
+        out[~in_base] = self._matrix[rows[~in_base] - nb]
+        return out
 
-    def _save(self) -> None:
-        """Persist store to disk."""
-        Path(self.store_path).parent.mkdir(parents=True, exist_ok=True)
-        with open(self.store_path, "w") as f:
-            json.dump(self._data, f)
+    def _append_row(self, conversation_id: str, vec: np.ndarray) -> None:
+        """Write a normalised vector into the next free row, growing the matrix if needed."""
+        if vec.shape[0] != self._dim:
+            if self._n_rows - self._n_dead > 0:
+                raise ValueError(f"Expected {self._dim}D embedding, got {vec.shape[0]}D")
+            # Empty store: (re)size the matrix to this embedding's dimension
+            self._reset_matrix([], None, dim=vec.shape[0])
+
+        nb = self._n_base
+        if self._n_rows - nb == self._matrix.shape[0]:
+            capacity = max(INITIAL_CAPACITY, self._matrix.shape[0] * 2)
+            matrix = np.zeros((capacity, self._dim), dtype=np.float32)
+            matrix[: self._n_rows - nb] = self._matrix[: self._n_rows - nb]
+            live = np.zeros(nb + capacity, dtype=bool)
+            live[: self._n_rows] = self._live[: self._n_rows]
+            self._matrix, self._live = matrix, live
+            row_cluster = np.full(nb + capacity, _NO_CLUSTER, dtype=np.int32)
+            row_cluster[: self._n_rows] = self._row_cluster[: self._n_rows]
+            self._row_cluster = row_cluster
+            if self._codes is not None:
+                codes = np.zeros((nb + capacity, self._dim), dtype=np.int8)
+                codes[: self._n_rows] = self._codes[: self._n_rows]
+                scales = np.zeros(nb + capacity, dtype=np.float32)
+                scales[: self._n_rows] = self._code_scales[: self._n_rows]
+                self._codes, self._code_scales = codes, scales
+            if self._short is not None:
+                short = np.zeros((nb + capacity, self.matryoshka_dim), dtype=np.float32)
+                short[: self._n_rows] = self._short[: self._n_rows]
+                self._short = short
+
+        row = self._n_rows
+        self._matrix[row - nb] = vec
+        self._live[row] = True
+        self._row_ids.append(conversation_id)
+        self._id_rows[conversation_id] = row
+        self._n_rows += 1
+        self._index_row(row, vec)
+
+    def _index_row(self, row: int, vec: np.ndarray) -> None:
+        """Keep the first-stage copies and ANN index (and any in-flight build) in step with a written row."""
+        if self._codes is not None:
+            codes, scales = quantize_int8(vec[None, :])
+            self._codes[row], self._code_scales[row] = codes[0], scales[0]
+        if self._short is not None:
+            self._short[row] = truncate_embeddings(vec, self.matryoshka_dim)
+        if self._ann is not None:
+            self._ann.assign_row(row, vec)
+        if self._ann_touched is not None:
+            self._ann_touched.add(row)
+
+    def _remove_row(self, conversation_id: str) -> None:
+        """Tombstone a conversation's row and compact if too many are dead."""
+        row = self._id_rows.pop(conversation_id, None)
+        if row is None:
+            return
+        self._live[row] = False
+        self._row_ids[row] = None
+        self._n_dead += 1
+        if row < self._n_base:
+            self._n_dead_base += 1
+
+        if self._n_dead - self._n_dead_base > COMPACTION_RATIO * (self._n_rows - self._n_base):
+            self._compact_matrix()
+
+    def _compact_matrix(self) -> None:
+        """Drop tombstoned in-memory rows in place, preserving the order of live rows."""
+        nb = self._n_base
+        keep = nb + np.flatnonzero(self._live[nb : self._n_rows])
+        n_keep = len(keep)
+        self._matrix[:n_keep] = self._matrix[keep - nb]
+        self._matrix[n_keep : self._n_rows - nb] = 0.0
+        self._live[nb : nb + n_keep] = True
+        self._live[nb + n_keep : self._n_rows] = False
+        self._row_ids = self._row_ids[:nb] + [self._row_ids[i] for i in keep]
+        for row in range(nb, nb + n_keep):
+            self._id_rows[self._row_ids[row]] = row
+        self._n_rows = nb + n_keep
+        self._n_dead = self._n_dead_base
+        self._row_cluster[nb : nb + n_keep] = self._row_cluster[keep]
+        if self._codes is not None:
+            self._codes[nb : nb + n_keep] = self._codes[keep]
+            self._code_scales[nb : nb + n_keep] = self._code_scales[keep]
+        if self._short is not None:
+            self._short[nb : nb + n_keep] = self._short[keep]
+        if self._ann is not None:
+            self._ann.keep_rows(nb, keep)
+        self._layout_version += 1
+
+    def _put(
+        self,
+        conversation_id: str,
+        document: str,
+        embedding,
+        metadata: Dict[str, Any],
+    ) -> np.ndarray:
+        """Apply an upsert in memory and return the normalised vector."""
+        vec = self._normalize(embedding)
+        previous = self._data.get(conversation_id)
+        row = self._id_rows.get(conversation_id)
+        if row is not None and row >= self._n_base and vec.shape[0] == self._dim:
+            # Same dimension, in-memory row: overwrite it in place
+            self._matrix[row - self._n_base] = vec
+            self._index_row(row, vec)
+        else:
+            self._remove_row(conversation_id)
+            self._append_row(conversation_id, vec)
+
+        self._data[conversation_id] = {"document": document, "metadata": metadata}
+        self._index_filters(conversation_id, metadata, previous and previous["metadata"])
+        if self._keywords is not None:
+            self._keywords.add(conversation_id, document)
+        elif self._keywords_touched is not None:
+            self._keywords_touched.add(conversation_id)
+        return vec
+
+    def _drop(self, conversation_id: str) -> bool:
+        """Apply a delete in memory. Returns True if the conversation existed."""
+        entry = self._data.pop(conversation_id, None)
+        if entry is None:
+            return False
+        self._index_filters(conversation_id, {}, entry["metadata"])
+        if self._keywords is not None:
+            self._keywords.remove(conversation_id)
+        elif self._keywords_touched is not None:
+            self._keywords_touched.add(conversation_id)
+        self._remove_row(conversation_id)
+        return True
+
+    def _start_keyword_build(self) -> None:
+        """Build the BM25 index in a background thread (if there is anything to index)."""
+        if not self._data:
+            self._keywords = BM25Index()
+            return
+        self._keyword_thread = threading.Thread(
+            target=self.build_keyword_index, name="vector-store-keyword-build", daemon=True
+        )
+        self._keyword_thread.start()
+
+    def build_keyword_index(self) -> BM25Index:
+        """
+        Build the BM25 index over the stored documents and install it.
+
+        Tokenising runs without holding the store lock; documents written
+        meanwhile are re-indexed before the index is installed. A no-op if
+        the index already exists.
+
+        Returns:
+            The installed index.
+        """
+        with self._keyword_build_lock:
+            with self._lock:
+                if self._keywords is not None:
+                    return self._keywords
+                documents = [(cid, entry["document"]) for cid, entry in self._data.items()]
+                self._keywords_touched = set()
+
+            try:
+                index = BM25Index()
+                for cid, document in documents:
+                    index.add(cid, document)
+
+                with self._lock:
+                    for cid in self._keywords_touched:
+                        entry = self._data.get(cid)
+                        if entry is None:
+                            index.remove(cid)
+                        else:
+                            index.add(cid, entry["document"])
+                    self._keywords = index
+            finally:
+                self._keywords_touched = None
+
+        logger.info("Built keyword index over %d conversations", len(documents))
+        return index
+
+    def _keyword_index(self, wait: bool = True) -> Optional[BM25Index]:
+        """
+        The BM25 index, building it first if there is none yet.
+
+        With ``wait=False`` returns None instead of waiting while the index is
+        still being built (a build is started if none is running). Must be
+        called without holding the store lock.
+        """
+        if self._keywords is not None:
+            return self._keywords
+        thread = self._keyword_thread
+        if not wait:
+            if thread is None or not thread.is_alive():
+                self._start_keyword_build()
+            return self._keywords
+        if thread is not None:
+            thread.join()
+        if self._keywords is None:
+            return self.build_keyword_index()
+        return self._keywords
+
+    def _set_metadata(self, conversation_id: str, metadata: Dict[str, Any]) -> None:
+        """Apply a metadata-only update in memory."""
+        entry = self._data.get(conversation_id)
+        if entry is None:
+            return
+        self._index_filters(conversation_id, metadata, entry["metadata"])
+        entry["metadata"] = metadata
+
+    def _index_filters(
+        self,
+        conversation_id: str,
+        metadata: Dict[str, Any],
+        previous: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Point the cluster column and topic lists at a conversation's current metadata."""
+        if previous:
+            for topic in previous.get("topics") or []:
+                ids = self._topic_ids.get(topic)
+                if ids is not None:
+                    ids.discard(conversation_id)
+                    if not ids:
+                        del self._topic_ids[topic]
+        for topic in metadata.get("topics") or []:
+            self._topic_ids.setdefault(topic, set()).add(conversation_id)
+
+        row = self._id_rows.get(conversation_id)
+        if row is not None:
+            cluster = metadata.get("cluster_id")
+            self._row_cluster[row] = _NO_CLUSTER if cluster is None else cluster
+
+    def _filter_rows(
+        self,
+        cluster_filter: Optional[int] = None,
+        topic_filter: Optional[List[str]] = None,
+    ) -> Optional[np.ndarray]:
+        """
+        Boolean mask of live rows matching the filters, or None when unfiltered.
+
+        A row matches if it is in ``cluster_filter`` and has any of the topics
+        in ``topic_filter``.
+        """
+        if cluster_filter is None and not topic_filter:
+            return None
+        mask = self._live[: self._n_rows].copy()
+        if cluster_filter is not None:
+            mask &= self._row_cluster[: self._n_rows] == cluster_filter
+        if topic_filter:
+            ids = set().union(*(self._topic_ids.get(topic, ()) for topic in topic_filter))
+            topic_mask = np.zeros(self._n_rows, dtype=bool)
+            topic_mask[[self._id_rows[cid] for cid in ids]] = True
+            mask &= topic_mask
+        return mask
 
     # ------------------------------------------------------------------
     # Core operations
@@ -81,27 +946,63 @@ class VectorStoreService:
         metadata: Optional[Dict[str, Any]] = None,
     ) -> None:
         """Insert or update a conversation in the store."""
+        self._check_writable()
         with self._lock:
-            self._data[conversation_id] = {
-                "document": document,
-                "embedding": embedding,
-                "metadata": metadata or {},
-            }
-            self._save()
+            metadata = metadata or {}
+            vec = self._put(conversation_id, document, embedding, metadata)
+            self._storage.append_upsert(conversation_id, document, metadata, vec)
+            self._maybe_compact_storage()
+            self._maybe_build_ann_index()
 
     def delete_conversation(self, conversation_id: str) -> bool:
         """Remove a conversation. Returns True if it existed."""
+        self._check_writable()
         with self._lock:
-            removed = self._data.pop(conversation_id, None) is not None
+            removed = self._drop(conversation_id)
             if removed:
-                self._save()
+                self._storage.append_delete(conversation_id)
+                self._maybe_compact_storage()
             return removed
 
+    def update_metadata(self, updates: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Merge metadata fields into existing conversations.
+
+        Used to keep ``cluster_id`` / ``topics`` in step after reclustering.
+        Unknown IDs and updates that change nothing are skipped (and not logged).
+
+        Args:
+            updates: conversation_id -> fields to set.
+
+        Returns:
+            Number of conversations whose metadata changed.
+        """
+        self._check_writable()
+        changed = 0
+        with self._lock:
+            for cid, fields in updates.items():
+                entry = self._data.get(cid)
+                if entry is None:
+                    continue
+                metadata = {**entry["metadata"], **fields}
+                if metadata == entry["metadata"]:
+                    continue
+                self._set_metadata(cid, metadata)
+                self._storage.append_metadata(cid, metadata)
+                changed += 1
+            if changed:
+                self._maybe_compact_storage()
+        return changed
+
     def search(
         self,
         query_embedding: List[float],
         max_results: int = 10,
         score_threshold: float = 0.0,
+        selection: Optional[str] = None,
+        nprobe: Optional[int] = None,
+        cluster_filter: Optional[int] = None,
+        topic_filter: Optional[List[str]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Search the store by cosine similarity.
@@ -110,65 +1011,449 @@ class VectorStoreService:
             query_embedding: 768-D query vector.
             max_results: Maximum number of results to return.
             score_threshold: Minimum cosine similarity to include.
+            selection: Top-k strategy ("partition" or "sort"); defaults to
+                VECTOR_SEARCH_SELECTION.
+            nprobe: IVF lists to probe when an ANN index is built (0 = exact
+                scan); defaults to VECTOR_ANN_NPROBE.
+            cluster_filter: Only search conversations with this ``cluster_id``.
+            topic_filter: Only search conversations having any of these topics.
+
+        With int8 quantisation enabled, candidates are ranked by their codes
+        and the best ``max_results * RERANK_FACTOR`` are re-scored exactly, so
+        returned scores are always exact float32 cosine similarities. The
+        Matryoshka first stage works the same way; with
+        VECTOR_MATRYOSHKA_RERANK=false its truncated-vector cosines are
+        returned as they are.
 
         Returns:
             List of dicts with keys:
                 conversation_id, score, content, metadata
             sorted by descending score.
         """
+        return self.search_many(
+            [query_embedding],
+            max_results,
+            score_threshold,
+            selection=selection,
+            nprobe=nprobe,
+            cluster_filter=cluster_filter,
+            topic_filter=topic_filter,
+        )[0]
+
+    def search_many(
+        self,
+        query_embeddings: List[List[float]],
+        max_results: int = 10,
+        score_threshold: float = 0.0,
+        selection: Optional[str] = None,
+        nprobe: Optional[int] = None,
+        cluster_filter: Optional[int] = None,
+        topic_filter: Optional[List[str]] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Run several searches in one pass over the store.
+
+        The exact (and int8 / Matryoshka first-stage) scan scores up to
+        SEARCH_BATCH_QUERIES queries per matrix-matrix product instead of one
+        matrix-vector product per query. Arguments are as for search();
+        filters apply to every query.
+
+        Returns:
+            One result list per query, in input order.
+        """
+        self._sync()
         with self._lock:
-            if not self._data:
-                return []
-
-            ids = list(self._data.keys())
-            docs = [self._data[cid]["document"] for cid in ids]
-            metas = [self._data[cid]["metadata"] for cid in ids]
-            matrix = np.array(
-                [self._data[cid]["embedding"] for cid in ids], dtype=np.float32
-            )
+            if not self._id_rows:
+                return [[] for _ in query_embeddings]
+
+            queries = np.stack([self._normalize(q) for q in query_embeddings])
+            if queries.shape[1] != self._dim:
+                raise ValueError(f"Expected {self._dim}D query, got {queries.shape[1]}D")
+
+            nprobe = ANN_NPROBE if nprobe is None else nprobe
+            use_ann = self._ann is not None and nprobe > 0
+            selection = selection or SEARCH_SELECTION
+
+            # Filters pick the matching rows up front; only those are scored
+            mask = self._filter_rows(cluster_filter, topic_filter)
+            allowed = None if mask is None else np.flatnonzero(mask)
+            if allowed is not None and len(allowed) == 0:
+                return [[] for _ in query_embeddings]
+
+            results: List[List[Dict[str, Any]]] = []
+            for start in range(0, len(queries), SEARCH_BATCH_QUERIES):
+                batch = queries[start:start + SEARCH_BATCH_QUERIES]
+                batch_scores = None if use_ann else self._scan(batch, allowed)
+
+                for j, query in enumerate(batch):
+                    rows = allowed
+                    if batch_scores is not None:
+                        scores = batch_scores[j]
+                    else:
+                        # Approximate: score only the rows of the nprobe nearest lists
+                        rows = self._ann.candidates(query, nprobe)
+                        rows = rows[(self._live if mask is None else mask)[rows]]
+                        if mask is not None and len(rows) < max_results:
+                            # Selective filter: scanning every matching row is cheap
+                            rows = allowed
+                        scores = self._scan(query[None], rows)[0]
+
+                    if self._codes is not None or (self._short is not None and self.matryoshka_rerank):
+                        # Compressed first stage, then exact re-ranking of a shortlist
+                        shortlist = select_top_k(scores, max_results * RERANK_FACTOR, -np.inf)
+                        rows = shortlist if rows is None else rows[shortlist]
+                        scores = self._row_scores(query, rows)
+
+                    top_idx = select_top_k(scores, max_results, score_threshold, selection)
+                    results.append(self._format_results(rows, scores, top_idx))
+
+        return results
+
+    def hybrid_search(
+        self,
+        query_text: str,
+        query_embedding: Optional[List[float]] = None,
+        max_results: int = 10,
+        score_threshold: float = 0.0,
+        keyword_weight: float = 0.3,
+        semantic_weight: float = 0.7,
+        nprobe: Optional[int] = None,
+        cluster_filter: Optional[int] = None,
+        topic_filter: Optional[List[str]] = None,
+        chunk_scores: Optional[Dict[str, float]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Search by a weighted sum of cosine similarity and BM25 keyword score.
+
+        The best ``max_results * HYBRID_CANDIDATE_FACTOR`` conversations of each
+        ranking are merged, and every candidate is scored as::
+
+            semantic_weight * cosine + keyword_weight * bm25 / max(bm25)
+
+        with the weights normalised to sum to 1. With ``semantic_weight == 0``
+        no embedding is needed (pure keyword search); with
+        ``keyword_weight == 0`` this is plain search(). While the keyword
+        index is still being built, a search with ``semantic_weight > 0``
+        does not wait for it and ranks by cosine similarity alone; a pure
+        keyword search waits.
+
+        Args:
+            query_text: Raw query text for the keyword index.
+            query_embedding: Query vector (required if semantic_weight > 0).
+            max_results: Maximum number of results to return.
+            score_threshold: Minimum cosine similarity for semantic candidates.
+            keyword_weight: Weight of the normalised BM25 score.
+            semantic_weight: Weight of the cosine similarity.
+            nprobe: As for search().
+            cluster_filter: As for search().
+            topic_filter: As for search().
+            chunk_scores: Aggregated chunk similarities per conversation (see
+                search_parents()); they join the candidates, and a
+                conversation's cosine is raised to its chunk score if higher.
+
+        Returns:
+            Result dicts as for search(), with the fused ``score`` plus
+            ``semantic_score`` and ``keyword_score``.
+        """
+        return self.hybrid_search_many(
+            [query_text],
+            [query_embedding],
+            max_results,
+            score_threshold,
+            keyword_weight=keyword_weight,
+            semantic_weight=semantic_weight,
+            nprobe=nprobe,
+            cluster_filter=cluster_filter,
+            topic_filter=topic_filter,
+            chunk_scores=[chunk_scores],
+        )[0]
 
-        query = np.array(query_embedding, dtype=np.float32)
+    def hybrid_search_many(
+        self,
+        query_texts: List[str],
+        query_embeddings: Optional[List[Optional[List[float]]]] = None,
+        max_results: int = 10,
+        score_threshold: float = 0.0,
+        keyword_weight: float = 0.3,
+        semantic_weight: float = 0.7,
+        nprobe: Optional[int] = None,
+        cluster_filter: Optional[int] = None,
+        topic_filter: Optional[List[str]] = None,
+        chunk_scores: Optional[List[Optional[Dict[str, float]]]] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Run several hybrid searches, ranking each query as hybrid_search() does.
+
+        The semantic candidates of all queries come from one search_many()
+        pass; the BM25 scores are then fused per query. Arguments are as for
+        hybrid_search(), with one query text, embedding and chunk score dict
+        per query.
 
-        # Cosine similarity = dot(A, B) / (||A|| * ||B||)
-        norms = np.linalg.norm(matrix, axis=1)
-        query_norm = np.linalg.norm(query)
-        # Avoid division by zero
-        denom = norms * query_norm
-        denom[denom == 0] = 1e-10
-        scores = matrix @ query / denom
+        Returns:
+            One result list per query, in input order.
+        """
+        total = keyword_weight + semantic_weight
+        if total <= 0:
+            raise ValueError("keyword_weight and semantic_weight cannot both be 0")
+        keyword_weight, semantic_weight = keyword_weight / total, semantic_weight / total
+        query_embeddings = query_embeddings or [None] * len(query_texts)
+        chunk_scores = chunk_scores or [None] * len(query_texts)
+        if semantic_weight > 0 and any(q is None for q in query_embeddings):
+            raise ValueError("query_embedding is required when semantic_weight > 0")
+
+        self._sync()
+        keyword_index = None
+        if keyword_weight > 0:
+            keyword_index = self._keyword_index(wait=semantic_weight == 0)
+            if keyword_index is None:
+                keyword_weight, semantic_weight = 0.0, 1.0
+
+        with self._lock:
+            if not self._id_rows:
+                return [[] for _ in query_texts]
+            n_candidates = max_results * HYBRID_CANDIDATE_FACTOR
 
-        # Sort descending
-        sorted_idx = np.argsort(-scores)
+            hits_per_query: List[List[Dict[str, Any]]] = [[] for _ in query_texts]
+            if semantic_weight > 0:
+                hits_per_query = self.search_many(
+                    query_embeddings,
+                    n_candidates,
+                    score_threshold,
+                    nprobe=nprobe,
+                    cluster_filter=cluster_filter,
+                    topic_filter=topic_filter,
+                )
+            mask = self._filter_rows(cluster_filter, topic_filter) if keyword_weight > 0 else None
+
+            results: List[List[Dict[str, Any]]] = []
+            for query_text, query_embedding, hits, query_chunk_scores in zip(
+                query_texts, query_embeddings, hits_per_query, chunk_scores
+            ):
+                semantic = {r["conversation_id"]: r["score"] for r in hits}
+                results.append(self._fuse(
+                    query_text,
+                    query_embedding,
+                    semantic,
+                    keyword_index,
+                    mask,
+                    keyword_weight,
+                    semantic_weight,
+                    max_results,
+                    query_chunk_scores,
+                ))
+        return results
+
+    def _fuse(
+        self,
+        query_text: str,
+        query_embedding: Optional[List[float]],
+        semantic: Dict[str, float],
+        keyword_index: Optional[BM25Index],
+        mask: Optional[np.ndarray],
+        keyword_weight: float,
+        semantic_weight: float,
+        max_results: int,
+        chunk_scores: Optional[Dict[str, float]],
+    ) -> List[Dict[str, Any]]:
+        """Rank one query's semantic candidates together with its BM25 scores (store lock held)."""
+        n_candidates = max_results * HYBRID_CANDIDATE_FACTOR
+        keyword: Dict[str, float] = {}
+        if keyword_weight > 0:
+            keyword = keyword_index.scores(query_text)
+            if mask is not None:
+                keyword = {cid: s for cid, s in keyword.items() if mask[self._id_rows[cid]]}
+            if keyword:
+                best = max(keyword.values())
+                keyword = {cid: s / best for cid, s in keyword.items()}
+
+        candidates = set(semantic)
+        candidates.update(sorted(keyword, key=keyword.get, reverse=True)[:n_candidates])
+        chunk_scores = {
+            cid: score for cid, score in (chunk_scores or {}).items() if cid in self._id_rows
+        } if semantic_weight > 0 else {}
+        candidates.update(chunk_scores)
+        if semantic_weight > 0:
+            # Keyword-only candidates still need their cosine similarity
+            missing = [cid for cid in candidates if cid not in semantic]
+            if missing:
+                query = self._normalize(query_embedding)
+                rows = np.asarray([self._id_rows[cid] for cid in missing])
+                semantic.update(zip(missing, self._row_scores(query, rows).tolist()))
+            for cid, score in chunk_scores.items():
+                semantic[cid] = max(semantic[cid], score)
+
+        fused = {
+            cid: semantic_weight * semantic.get(cid, 0.0) + keyword_weight * keyword.get(cid, 0.0)
+            for cid in candidates
+        }
+        ranked = sorted(fused, key=fused.get, reverse=True)[:max_results]
 
         results: List[Dict[str, Any]] = []
-        for idx in sorted_idx:
-            sim = float(scores[idx])
-            if sim < score_threshold:
-                continue
+        for cid in ranked:
+            entry = self._data[cid]
             results.append(
                 {
-                    "conversation_id": ids[idx],
-                    "score": sim,
-                    "content": docs[idx],
-                    "metadata": metas[idx],
+                    "conversation_id": cid,
+                    "score": float(fused[cid]),
+                    "semantic_score": float(semantic.get(cid, 0.0)),
+                    "keyword_score": float(keyword.get(cid, 0.0)),
+                    "content": entry["document"],
+                    "metadata": entry["metadata"],
                 }
             )
-            if len(results) >= max_results:
-                break
+        return results
+
+    def search_parents(
+        self,
+        query_embedding: List[float],
+        max_results: int = 10,
+        score_threshold: float = 0.0,
+        aggregation: Optional[str] = None,
+        nprobe: Optional[int] = None,
+        cluster_filter: Optional[int] = None,
+        topic_filter: Optional[List[str]] = None,
+    ) -> Dict[str, float]:
+        """
+        Search a chunk store and aggregate chunk similarities per conversation.
+
+        Rows must carry their parent's ID in ``metadata["conversation_id"]``
+        (see upsert_conversation_chunks()). The best
+        ``max_results * CHUNK_CANDIDATE_FACTOR`` chunks pick the candidate
+        parents; each is scored by the max of those chunks' cosines, or by
+        the mean cosine over all of its chunks.
+
+        Args:
+            aggregation: "max" or "mean"; defaults to VECTOR_CHUNK_AGGREGATION.
+            Other arguments are as for search().
 
+        Returns:
+            conversation_id -> aggregated score for the best ``max_results``
+            conversations.
+        """
+        return self.search_parents_many(
+            [query_embedding],
+            max_results,
+            score_threshold,
+            aggregation=aggregation,
+            nprobe=nprobe,
+            cluster_filter=cluster_filter,
+            topic_filter=topic_filter,
+        )[0]
+
+    def search_parents_many(
+        self,
+        query_embeddings: List[List[float]],
+        max_results: int = 10,
+        score_threshold: float = 0.0,
+        aggregation: Optional[str] = None,
+        nprobe: Optional[int] = None,
+        cluster_filter: Optional[int] = None,
+        topic_filter: Optional[List[str]] = None,
+    ) -> List[Dict[str, float]]:
+        """
+        Run search_parents() for several queries, scanning the chunks in one search_many() pass.
+
+        Returns:
+            One conversation_id -> score dict per query, in input order.
+        """
+        aggregation = aggregation or CHUNK_AGGREGATION
+        if aggregation not in CHUNK_AGGREGATIONS:
+            raise ValueError(f"Unknown chunk aggregation: {aggregation!r}")
+
+        hits_per_query = self.search_many(
+            query_embeddings,
+            max_results * CHUNK_CANDIDATE_FACTOR,
+            score_threshold,
+            nprobe=nprobe,
+            cluster_filter=cluster_filter,
+            topic_filter=topic_filter,
+        )
+        results: List[Dict[str, float]] = []
+        for query_embedding, hits in zip(query_embeddings, hits_per_query):
+            grouped: Dict[str, List[float]] = {}
+            for hit in hits:
+                parent = hit["metadata"].get("conversation_id")
+                if parent is not None:
+                    grouped.setdefault(parent, []).append(hit["score"])
+
+            if aggregation == "max":
+                scores = {parent: float(max(values)) for parent, values in grouped.items()}
+            else:
+                # Average every chunk of the parent, not only those on the shortlist
+                query = self._normalize(query_embedding)
+                with self._lock:
+                    scores = {}
+                    for parent in grouped:
+                        rows = np.asarray(self._chunk_rows(parent))
+                        scores[parent] = float(self._row_scores(query, rows).mean())
+            best = sorted(scores, key=scores.get, reverse=True)[:max_results]
+            results.append({parent: scores[parent] for parent in best})
+        return results
+
+    def _chunk_rows(self, parent_id: str) -> List[int]:
+        """Matrix rows of the chunks ``parent_id#0``, ``parent_id#1``, ... (chunk stores)."""
+        rows = []
+        while chunk_id(parent_id, len(rows)) in self._id_rows:
+            rows.append(self._id_rows[chunk_id(parent_id, len(rows))])
+        return rows
+
+    def contains(self, conversation_id: str) -> bool:
+        """Whether ``conversation_id`` is stored."""
+        self._sync()
+        with self._lock:
+            return conversation_id in self._data
+
+    def _format_results(
+        self,
+        rows: Optional[np.ndarray],
+        scores: np.ndarray,
+        top_idx: np.ndarray,
+    ) -> List[Dict[str, Any]]:
+        """Result dicts for ``top_idx`` (indices into ``rows``, or matrix rows if None)."""
+        results: List[Dict[str, Any]] = []
+        for idx in top_idx:
+            cid = self._row_ids[idx if rows is None else rows[idx]]
+            entry = self._data[cid]
+            results.append(
+                {
+                    "conversation_id": cid,
+                    "score": float(scores[idx]),
+                    "content": entry["document"],
+                    "metadata": entry["metadata"],
+                }
+            )
         return results
 
     def get_stats(self) -> Dict[str, Any]:
         """Return basic statistics about the store."""
+        self._sync()
         with self._lock:
             return {
                 "collection_name": Path(self.store_path).stem,
                 "document_count": len(self._data),
                 "store_path": self.store_path,
+                "data_dir": str(self._storage.data_dir),
+                "read_only": self.read_only,
+                "snapshot_generation": self._storage.generation,
+                "wal_bytes": self._storage.wal_bytes,
+                "mmapped_rows": self._n_base,
+                "quantization": self.quantization,
+                "matryoshka": None if self._short is None else {
+                    "dim": self.matryoshka_dim,
+                    "full_dim": self._dim,
+                    "rerank": self.matryoshka_rerank,
+                },
+                "ann_index": None if self._ann is None else {
+                    "type": "ivf",
+                    "n_lists": self._ann.n_lists,
+                    "trained_rows": self._ann_trained_rows,
+                    "default_nprobe": ANN_NPROBE,
+                },
             }
 
     def count(self) -> int:
         """Return number of stored documents."""
+        self._sync()
         with self._lock:
             return len(self._data)
 
@@ -177,6 +1462,7 @@ class VectorStoreService:
 # Singleton
 # ---------------------------------------------------------------------------
 _instance: Optional[VectorStoreService] = None
+_chunk_instance: Optional[VectorStoreService] = None
 _instance_lock = threading.Lock()
 
 
@@ -189,6 +1475,24 @@ def get_vector_store_service(store_path: Optional[str] = None) -> VectorStoreSer
         return _instance
 
 
+def get_chunk_store_service() -> VectorStoreService:
+    """Get (or create) the singleton store of conversation chunks."""
+    global _chunk_instance
+    with _instance_lock:
+        if _chunk_instance is None:
+            _chunk_instance = VectorStoreService(VECTOR_CHUNK_STORE_PATH, keyword_index=False)
+        return _chunk_instance
+
+
+def close_vector_store_service() -> None:
+    """Flush and close the singletons (if they were ever created)."""
+    with _instance_lock:
+        if _instance is not None:
+            _instance.close()
+        if _chunk_instance is not None:
+            _chunk_instance.close()
+
+
 # ---------------------------------------------------------------------------
 # Async convenience wrappers (used in FastAPI endpoints)
 # ---------------------------------------------------------------------------
@@ -200,8 +1504,9 @@ async def upsert_conversation_to_store(
     """
     Async wrapper around VectorStoreService.upsert_conversation().
 
-    Builds a searchable document from conversation_data and stores it
-    alongside the embedding vector.
+    Builds a searchable document from conversation_data (title, summary,
+    topics and the full text of every message, which the keyword index
+    covers) and stores it alongside the embedding vector.
     """
     service = get_vector_store_service()
 
@@ -209,11 +1514,10 @@ async def upsert_conversation_to_store(
     title = conversation_data.get("title", "Untitled")
     summary = conversation_data.get("summary", "")
     topics = ", ".join(conversation_data.get("topics", []))
-    messages_text = ""
-    for msg in conversation_data.get("messages", [])[:20]:
-        role = msg.get("role", "unknown").upper()
-        content = msg.get("content", "")[:500]
-        messages_text += f"\n{role}: {content}"
+    messages_text = "".join(
+        f"\n{msg.get('role', 'unknown').upper()}: {msg.get('content', '')}"
+        for msg in conversation_data.get("messages", [])
+    )
 
     document = f"Title: {title}\nSummary: {summary}\nTopics: {topics}\n{messages_text}"
 
@@ -221,16 +1525,252 @@ async def upsert_conversation_to_store(
         "title": title,
         "topic_count": len(conversation_data.get("topics", [])),
         "message_count": len(conversation_data.get("messages", [])),
+        "topics": list(conversation_data.get("topics", [])),
+        "cluster_id": conversation_data.get("cluster_id"),
     }
 
     service.upsert_conversation(conversation_id, document, embedding, metadata)
 
 
+def chunk_id(conversation_id: str, index: int) -> str:
+    """ID of a conversation's ``index``-th chunk in the chunk store."""
+    return f"{conversation_id}#{index}"
+
+
+async def upsert_conversation_chunks(
+    conversation_id: str,
+    conversation_data: Dict[str, Any],
+    chunks: List[str],
+    embeddings: List[List[float]],
+) -> None:
+    """
+    Store a conversation's window vectors in the chunk store.
+
+    If the conversation is re-chunked under the same ID, windows left over
+    from a longer previous version are deleted. Each chunk carries the
+    parent's ``cluster_id`` / ``topics`` so filtered searches apply to chunks
+    too.
+    """
+    service = get_chunk_store_service()
+    for i, (text, embedding) in enumerate(zip(chunks, embeddings)):
+        metadata = {
+            "conversation_id": conversation_id,
+            "chunk_index": i,
+            "title": conversation_data.get("title", "Untitled"),
+            "topics": list(conversation_data.get("topics", [])),
+            "cluster_id": conversation_data.get("cluster_id"),
+        }
+        service.upsert_conversation(chunk_id(conversation_id, i), text, embedding, metadata)
+
+    _delete_chunks(service, conversation_id, start=len(chunks))
+
+
+def _delete_chunks(service: VectorStoreService, conversation_id: str, start: int = 0) -> int:
+    """Delete ``conversation_id#start``, ``#start+1``, ... from a chunk store. Returns the number deleted."""
+    index = start
+    while service.delete_conversation(chunk_id(conversation_id, index)):
+        index += 1
+    return index - start
+
+
+async def delete_conversation_from_store(conversation_id: str) -> bool:
+    """
+    Remove a deleted conversation and all of its chunks from the vector stores.
+
+    Returns:
+        True if the conversation was in the main store.
+    """
+    removed = get_vector_store_service().delete_conversation(conversation_id)
+    # Chunks may remain from a run with chunking enabled
+    if EMBEDDING_CHUNKING or Path(data_dir_for(VECTOR_CHUNK_STORE_PATH)).is_dir():
+        _delete_chunks(get_chunk_store_service(), conversation_id)
+    return removed
+
+
 async def search_store(
     query_embedding: List[float],
     max_results: int = 10,
     score_threshold: float = 0.3,
+    nprobe: Optional[int] = None,
+    cluster_filter: Optional[int] = None,
+    topic_filter: Optional[List[str]] = None,
 ) -> List[Dict[str, Any]]:
     """Async wrapper around VectorStoreService.search()."""
     service = get_vector_store_service()
-    return service.search(query_embedding, max_results, score_threshold)
+    return service.search(
+        query_embedding,
+        max_results,
+        score_threshold,
+        nprobe=nprobe,
+        cluster_filter=cluster_filter,
+        topic_filter=topic_filter,
+    )
+
+
+async def hybrid_search_store(
+    query_text: str,
+    query_embedding: Optional[List[float]] = None,
+    max_results: int = 10,
+    score_threshold: float = 0.3,
+    keyword_weight: float = 0.3,
+    semantic_weight: float = 0.7,
+    nprobe: Optional[int] = None,
+    cluster_filter: Optional[int] = None,
+    topic_filter: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """Async wrapper around VectorStoreService.hybrid_search()."""
+    service = get_vector_store_service()
+    chunk_scores = None
+    if EMBEDDING_CHUNKING and query_embedding is not None and semantic_weight > 0:
+        chunk_scores = get_chunk_store_service().search_parents(
+            query_embedding,
+            max_results * HYBRID_CANDIDATE_FACTOR,
+            score_threshold,
+            nprobe=nprobe,
+            cluster_filter=cluster_filter,
+            topic_filter=topic_filter,
+        )
+    search = functools.partial(
+        service.hybrid_search,
+        query_text,
+        query_embedding,
+        max_results,
+        score_threshold,
+        keyword_weight=keyword_weight,
+        semantic_weight=semantic_weight,
+        nprobe=nprobe,
+        cluster_filter=cluster_filter,
+        topic_filter=topic_filter,
+        chunk_scores=chunk_scores,
+    )
+    if semantic_weight <= 0:
+        # A pure keyword search may wait for the keyword index to be built
+        return await asyncio.to_thread(search)
+    return search()
+
+
+async def hybrid_search_store_many(
+    query_texts: List[str],
+    query_embeddings: Optional[List[Optional[List[float]]]] = None,
+    max_results: int = 10,
+    score_threshold: float = 0.3,
+    keyword_weight: float = 0.3,
+    semantic_weight: float = 0.7,
+    nprobe: Optional[int] = None,
+    cluster_filter: Optional[int] = None,
+    topic_filter: Optional[List[str]] = None,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Async wrapper around VectorStoreService.hybrid_search_many().
+
+    Each query is ranked as by hybrid_search_store(); with chunking enabled
+    the chunk store is also scanned once for all queries.
+    """
+    service = get_vector_store_service()
+    chunk_scores = None
+    if EMBEDDING_CHUNKING and query_embeddings is not None and semantic_weight > 0:
+        chunk_scores = get_chunk_store_service().search_parents_many(
+            query_embeddings,
+            max_results * HYBRID_CANDIDATE_FACTOR,
+            score_threshold,
+            nprobe=nprobe,
+            cluster_filter=cluster_filter,
+            topic_filter=topic_filter,
+        )
+    search = functools.partial(
+        service.hybrid_search_many,
+        query_texts,
+        query_embeddings,
+        max_results,
+        score_threshold,
+        keyword_weight=keyword_weight,
+        semantic_weight=semantic_weight,
+        nprobe=nprobe,
+        cluster_filter=cluster_filter,
+        topic_filter=topic_filter,
+        chunk_scores=chunk_scores,
+    )
+    if semantic_weight <= 0:
+        # A pure keyword search may wait for the keyword index to be built
+        return await asyncio.to_thread(search)
+    return search()
+
+
+async def search_store_many(
+    query_embeddings: List[List[float]],
+    max_results: int = 10,
+    score_threshold: float = 0.3,
+    nprobe: Optional[int] = None,
+    cluster_filter: Optional[int] = None,
+    topic_filter: Optional[List[str]] = None,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Async wrapper around VectorStoreService.search_many().
+
+    With chunking enabled each query is scored like hybrid_search_store_many()
+    with only the semantic part, so chunk matches count here too.
+    """
+    if EMBEDDING_CHUNKING:
+        return await hybrid_search_store_many(
+            [""] * len(query_embeddings),
+            query_embeddings,
+            max_results,
+            score_threshold,
+            keyword_weight=0.0,
+            semantic_weight=1.0,
+            nprobe=nprobe,
+            cluster_filter=cluster_filter,
+            topic_filter=topic_filter,
+        )
+    service = get_vector_store_service()
+    return service.search_many(
+        query_embeddings,
+        max_results,
+        score_threshold,
+        nprobe=nprobe,
+        cluster_filter=cluster_filter,
+        topic_filter=topic_filter,
+    )
+
+
+async def update_store_metadata(updates: Dict[str, Dict[str, Any]]) -> int:
+    """
+    Async wrapper around VectorStoreService.update_metadata().
+
+    With chunking enabled the same fields are applied to each conversation's
+    chunks, so cluster/topic filters stay consistent across both stores.
+    """
+    service = get_vector_store_service()
+    changed = service.update_metadata(updates)
+    if EMBEDDING_CHUNKING:
+        chunks = get_chunk_store_service()
+        chunk_updates: Dict[str, Dict[str, Any]] = {}
+        for cid, fields in updates.items():
+            i = 0
+            while chunks.contains(chunk_id(cid, i)):
+                chunk_updates[chunk_id(cid, i)] = fields
+                i += 1
+        chunks.update_metadata(chunk_updates)
+    return changed
+
+
+def sync_store_filters() -> int:
+    """
+    Copy ``cluster_id`` / ``topics`` from SQLite into the vector store metadata.
+
+    Backfills stores written before filter metadata was tracked; conversations
+    that are already in sync are left untouched.
+
+    Returns:
+        Number of conversations updated.
+    """
+    from backend.database import get_db_context
+    from backend.models import Conversation
+
+    with get_db_context() as db:
+        rows = db.query(Conversation.id, Conversation.cluster_id, Conversation.topics).all()
+    updates = {
+        cid: {"cluster_id": cluster_id, "topics": list(topics or [])}
+        for cid, cluster_id, topics in rows
+    }
+    return get_vector_store_service().update_metadata(updates)
@@ -0,0 +1,150 @@
+"""
+Ingest persistence micro-benchmark.
+
+Writes synthetic conversations (each with its messages and embedding) into a
+fresh SQLite database in a temp directory, once through the per-row ORM path
+ingest used before (one session per conversation, one ``db.add()`` per
+message) and once through ``bulk_insert_conversations()`` (one transaction
+per batch), and reports rows/sec for each.
+
+Usage:
+    python benchmarks/bench_ingest_persist.py --conversations 500 --messages 300
+    python benchmarks/bench_ingest_persist.py --batch-size 64
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend.models import Conversation, Embedding, Message, MessageRole
+from backend.services.persistence import bulk_insert_conversations
+
+
+def make_conversations(n: int, n_messages: int, dim: int) -> List[Dict[str, Any]]:
+    """Synthetic parsed conversations shaped like ingest's persist-stage input."""
+    conversations = []
+    for i in range(n):
+        messages = [
+            {
+                "role": "user" if j % 2 == 0 else "assistant",
+                "content": f"Message {j} of conversation {i}. " * 8,
+                "sequence_number": j,
+            }
+            for j in range(n_messages)
+        ]
+        conversations.append({
+            "id": str(uuid.uuid4()),
+            "title": f"Conversation {i}",
+            "summary": "Synthetic benchmark conversation",
+            "topics": ["benchmark"],
+            "message_count": n_messages,
+            "created_at": datetime.utcnow(),
+            "messages": messages,
+            "embedding": [0.01 * (k % 100) for k in range(dim)],
+        })
+    return conversations
+
+
+def persist_orm(session_factory, conversations: List[Dict[str, Any]]) -> None:
+    """The previous path: one session and one ORM object per row."""
+    for conv in conversations:
+        db = session_factory()
+        try:
+            db.add(Conversation(
+                id=conv["id"],
+                title=conv["title"],
+                summary=conv["summary"],
+                topics=conv["topics"],
+                cluster_id=0,
+                cluster_name="Unclustered",
+                message_count=conv["message_count"],
+                created_at=conv["created_at"],
+            ))
+            for msg in conv["messages"]:
+                db.add(Message(
+                    id=str(uuid.uuid4()),
+                    conversation_id=conv["id"],
+                    role=MessageRole(msg["role"]),
+                    content=msg["content"],
+                    sequence_number=msg["sequence_number"],
+                ))
+            db.add(Embedding(
+                conversation_id=conv["id"],
+                embedding_384d=conv["embedding"],
+                vector_3d=[0.0, 0.0, 0.0],
+                start_x=0.0,
+                start_y=0.0,
+                start_z=0.0,
+                end_x=0.0,
+                end_y=0.0,
+                end_z=0.0,
+                magnitude=1.0,
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+
+def persist_bulk(session_factory, conversations: List[Dict[str, Any]], batch_size: int) -> None:
+    """The bulk path: one Core executemany per table per batch."""
+    for start in range(0, len(conversations), batch_size):
+        db = session_factory()
+        try:
+            bulk_insert_conversations(db, conversations[start:start + batch_size])
+            db.commit()
+        finally:
+            db.close()
+
+
+def time_path(name: str, fn, db_dir: str, conversations: List[Dict[str, Any]]) -> None:
+    engine = create_engine(f"sqlite:///{Path(db_dir) / (name + '.db')}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    rows = sum(len(c["messages"]) + 2 for c in conversations)
+
+    start = time.perf_counter()
+    fn(session_factory, conversations)
+    elapsed = time.perf_counter() - start
+    print(f"  {name:<6} {elapsed:8.2f} s   {rows / elapsed:10.0f} rows/s   "
+          f"{len(conversations) / elapsed:8.1f} conversations/s")
+    engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=200, help="conversations to write")
+    parser.add_argument("--messages", type=int, default=300, help="messages per conversation")
+    parser.add_argument("--dim", type=int, default=768, help="embedding dimension")
+    parser.add_argument("--batch-size", type=int, default=16, help="conversations per bulk transaction")
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix="cortex_bench_")
+    try:
+        print(f"conversations={args.conversations} messages={args.messages} batch={args.batch_size}")
+        # Separate copies: both paths get fresh ids and identical content
+        time_path("orm", persist_orm, db_dir, make_conversations(args.conversations, args.messages, args.dim))
+        time_path(
+            "bulk",
+            lambda factory, convs: persist_bulk(factory, convs, args.batch_size),
+            db_dir,
+            make_conversations(args.conversations, args.messages, args.dim),
+        )
+    finally:
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
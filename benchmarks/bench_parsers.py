@@ -0,0 +1,235 @@
+"""
+Chat export parser micro-benchmark.
+
+Generates large synthetic exports and times parsing them the way ingest
+does, reporting how many BeautifulSoup trees each path builds:
+
+  chatgpt  a ChatGPT data export (one ``var jsonData = [...]`` script)
+  html     an untitled per-message HTML export (data-message-author-role divs)
+
+"before" repeats the previous flow (a tree for detection, then one per
+parser instance); "after" is ``parse_all_html()``, which sniffs the format
+and hands any tree it builds on to the parser.
+
+The ChatGPT export is also written to a temp file and read back the way
+ingest reads uploads, comparing peak traced memory of loading the file and
+parsing it whole with ``stream_upload()`` decoding one conversation at a time.
+
+Finally a single conversation with a deep, branching message tree (a
+regenerated answer every ``--fork-every`` turns) is flattened the previous
+way (recursive walk over every branch), along the active branch, and into
+one variant per branch.
+
+Usage:
+    python benchmarks/bench_parsers.py --conversations 500 --messages 40
+    python benchmarks/bench_parsers.py --tree-nodes 10000 --fork-every 10
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.parsers import ChatGPTParser, ClaudeParser, ParserFactory, parse_all_html
+from backend.parsers import base_parser
+from backend.api.ingest import stream_upload
+
+
+def make_mapping(n_messages: int, prefix: str = "") -> dict:
+    """A linear ChatGPT message mapping of ``n_messages`` alternating turns."""
+    mapping = {"root": {"id": "root", "message": None, "parent": None, "children": []}}
+    parent = "root"
+    for j in range(n_messages):
+        node_id = f"{prefix}n{j}"
+        mapping[node_id] = {
+            "id": node_id,
+            "message": {
+                "author": {"role": "user" if j % 2 == 0 else "assistant"},
+                "content": {"content_type": "text", "parts": [f"Message {j}. " + "Lorem ipsum dolor sit amet. " * 10]},
+                "create_time": 1700000000 + j,
+            },
+            "parent": parent,
+            "children": [],
+        }
+        mapping[parent]["children"].append(node_id)
+        parent = node_id
+    return mapping
+
+
+def make_chatgpt_export(n_conversations: int, n_messages: int) -> str:
+    conversations = [
+        {
+            "title": f"Conversation {i}",
+            "create_time": 1700000000 + i,
+            "mapping": make_mapping(n_messages, prefix=f"c{i}-"),
+        }
+        for i in range(n_conversations)
+    ]
+    return (
+        "<!DOCTYPE html><html><head><title>ChatGPT Data Export</title></head><body>"
+        '<div id="root"></div><script>var jsonData = ' + json.dumps(conversations) + ";</script>"
+        "</body></html>"
+    )
+
+
+def make_html_export(n_messages: int) -> str:
+    turns = "".join(
+        f'<div data-message-author-role="{"user" if j % 2 == 0 else "assistant"}">'
+        f"<p>Message {j}. {'Lorem ipsum dolor sit amet. ' * 10}</p></div>"
+        for j in range(n_messages)
+    )
+    return f'<html><body><div class="conversation">{turns}</div></body></html>'
+
+
+def parse_before(html: str) -> List[dict]:
+    """Previous flow: detection tree, then a fresh tree per parser instance."""
+    fmt = ParserFactory.detect_format_type(html, soup=base_parser.make_soup(html))
+    if fmt == "chatgpt":
+        return ChatGPTParser(html).parse_all()
+    for parser_class in (ChatGPTParser, ClaudeParser):
+        parser = parser_class(html, soup=base_parser.make_soup(html))
+        if parser.detect_format():
+            return [parser.parse()]
+    return []
+
+
+def run(name: str, fn: Callable[[str], List[dict]], html: str) -> None:
+    with patch.object(base_parser, "make_soup", wraps=base_parser.make_soup) as builds:
+        start = time.perf_counter()
+        results = fn(html)
+        elapsed = time.perf_counter() - start
+    messages = sum(len(r["messages"]) for r in results)
+    print(f"    {name:<7} {elapsed * 1000:9.1f} ms   {builds.call_count} tree(s)   "
+          f"{len(results)} conversation(s), {messages} messages")
+
+
+def load_whole(path: str) -> int:
+    with open(path, "rb") as f:
+        return len(parse_all_html(f.read().decode("utf-8")))
+
+
+def load_streaming(path: str) -> int:
+    with open(path, "rb") as f:
+        return sum(1 for _ in stream_upload(f))
+
+
+def run_file(name: str, fn: Callable[[str], int], path: str) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = fn(path)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"    {name:<7} {elapsed * 1000:9.1f} ms   peak {peak / 2**20:7.1f} MiB   {count} conversation(s)")
+
+
+def make_branching_conversation(n_nodes: int, fork_every: int) -> dict:
+    """A thread of ``n_nodes`` turns where every ``fork_every``-th answer was regenerated."""
+    mapping = make_mapping(n_nodes)
+    for j in range(1, n_nodes, fork_every):
+        node_id = f"n{j}"
+        alt_id = f"{node_id}-alt"
+        mapping[alt_id] = {
+            "id": alt_id,
+            "message": {
+                "author": {"role": "assistant"},
+                "content": {"content_type": "text", "parts": [f"Regenerated {j}. " + "Lorem ipsum. " * 10]},
+            },
+            "parent": mapping[node_id]["parent"],
+            "children": [],
+        }
+        # The regeneration the user abandoned comes first among the siblings
+        mapping[mapping[node_id]["parent"]]["children"].insert(0, alt_id)
+    return {"title": "Deep thread", "mapping": mapping, "current_node": f"n{n_nodes - 1}"}
+
+
+def traverse_recursive(parser: ChatGPTParser, mapping: dict, node_id: str, sequence: int = 0) -> List[dict]:
+    """The previous traversal: recursion per node, every branch flattened."""
+    messages = []
+    node = mapping.get(node_id)
+    if not node:
+        return messages
+    message = parser._node_message(node)
+    if message:
+        message["sequence_number"] = sequence
+        messages.append(message)
+    for child_id in node.get("children", []):
+        messages.extend(traverse_recursive(parser, mapping, child_id, sequence + len(messages)))
+    return messages
+
+
+def run_tree(n_nodes: int, fork_every: int) -> None:
+    conversation = make_branching_conversation(n_nodes, fork_every)
+    parser = ChatGPTParser("")
+    print(f"  message tree: {len(conversation['mapping'])} nodes, fork every {fork_every} turns")
+
+    try:
+        traverse_recursive(parser, conversation["mapping"], "root")
+        print("    recursive   ok at the default recursion limit")
+    except RecursionError:
+        print(f"    recursive   RecursionError at the default limit ({sys.getrecursionlimit()})")
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, 4 * n_nodes))
+    try:
+        start = time.perf_counter()
+        messages = traverse_recursive(parser, conversation["mapping"], "root")
+        elapsed = time.perf_counter() - start
+    finally:
+        sys.setrecursionlimit(limit)
+    print(f"    recursive {elapsed * 1000:9.1f} ms   {len(messages)} messages (all branches flattened, raised limit)")
+
+    start = time.perf_counter()
+    parsed = parser._parse_json_conversation(conversation)
+    elapsed = time.perf_counter() - start
+    print(f"    active    {elapsed * 1000:9.1f} ms   {len(parsed['messages'])} messages")
+
+    start = time.perf_counter()
+    variants = ChatGPTParser("", all_branches=True).parse_json_conversation(conversation)
+    elapsed = time.perf_counter() - start
+    print(f"    branches  {elapsed * 1000:9.1f} ms   {len(variants)} variant(s), "
+          f"{sum(len(v['messages']) for v in variants)} messages")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=200, help="conversations in the ChatGPT export")
+    parser.add_argument("--messages", type=int, default=40, help="messages per conversation")
+    parser.add_argument("--html-messages", type=int, default=2000, help="messages in the HTML export")
+    parser.add_argument("--tree-nodes", type=int, default=10000, help="turns in the branching message tree")
+    parser.add_argument("--fork-every", type=int, default=10, help="turns between regenerated answers")
+    args = parser.parse_args()
+
+    exports = {
+        "chatgpt": make_chatgpt_export(args.conversations, args.messages),
+        "html": make_html_export(args.html_messages),
+    }
+    for name, html in exports.items():
+        print(f"  {name} export: {len(html) / 2**20:.1f} MiB")
+        run("before", parse_before, html)
+        run("after", parse_all_html, html)
+
+    fd, path = tempfile.mkstemp(suffix=".html")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(exports["chatgpt"])
+        del exports
+        print("  chatgpt export from file:")
+        run_file("whole", load_whole, path)
+        run_file("stream", load_streaming, path)
+    finally:
+        os.unlink(path)
+
+    run_tree(args.tree_nodes, args.fork_every)
+
+
+if __name__ == "__main__":
+    main()
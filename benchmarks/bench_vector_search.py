@@ -0,0 +1,197 @@
+"""
+Vector search micro-benchmark.
+
+Builds a synthetic store of clustered, normalised embeddings in a temp
+directory and times VectorStoreService.search() per top-k selection strategy.
+With --ann it also builds the IVF index and reports recall@k vs latency for a
+range of nprobe values; with --int8 it compares int8 first-stage scoring plus
+exact re-ranking against the float32 scan; with --matryoshka it compares
+truncated-dimension (Matryoshka) first stages, with and without full-dimension
+re-ranking, against the full scan.
+
+Real Matryoshka embeddings concentrate their signal in the leading
+dimensions; --decay mimics that by scaling dimension i of the synthetic
+corpus by decay**(i / dim) (1.0 = isotropic, the worst case for truncation).
+
+Usage:
+    python benchmarks/bench_vector_search.py --n 200000 --dim 768 --queries 200
+    python benchmarks/bench_vector_search.py --n 200000 --ann
+    python benchmarks/bench_vector_search.py --n 200000 --int8
+    python benchmarks/bench_vector_search.py --n 200000 --matryoshka 256 128 --decay 0.05
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.services.vector_store import (
+    SELECTION_STRATEGIES,
+    VectorStoreService,
+    select_top_k,
+)
+
+
+def make_corpus(n: int, dim: int, n_topics: int = 64, seed: int = 0, decay: float = 1.0) -> np.ndarray:
+    """Clustered float32 embeddings (roughly what real conversation vectors look like)."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_topics, dim)).astype(np.float32)
+    labels = rng.integers(0, n_topics, size=n)
+    vectors = centers[labels] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    vectors *= (decay ** (np.arange(dim) / dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def build_store(
+    vectors: np.ndarray,
+    store_dir: str,
+    quantization: str = "none",
+    matryoshka_dim: int = 0,
+    matryoshka_rerank: bool = True,
+) -> VectorStoreService:
+    """Load ``vectors`` into a fresh store (bypassing the WAL for speed)."""
+    name = f"bench_{quantization}_{matryoshka_dim}_{int(matryoshka_rerank)}"
+    service = VectorStoreService(
+        store_path=str(Path(store_dir) / f"{name}.json"),
+        quantization=quantization,
+        matryoshka_dim=matryoshka_dim,
+        matryoshka_rerank=matryoshka_rerank,
+    )
+    ids = [f"conv_{i}" for i in range(len(vectors))]
+    service._data = {cid: {"document": "", "metadata": {}} for cid in ids}
+    service._reset_matrix(ids, vectors)
+    return service
+
+
+def time_queries(fn, queries: np.ndarray) -> float:
+    """Mean milliseconds per call of fn(query)."""
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def recall_at_k(
+    service: VectorStoreService,
+    queries: np.ndarray,
+    k: int,
+    nprobe: int,
+    reference: Optional[VectorStoreService] = None,
+) -> float:
+    """Mean overlap between approximate results and the exact top-k of ``reference``."""
+    reference = reference or service
+    hits = 0
+    for q in queries:
+        exact = {r["conversation_id"] for r in reference.search(q, k, -1.0, nprobe=0)}
+        approx = {r["conversation_id"] for r in service.search(q, k, -1.0, nprobe=nprobe)}
+        hits += len(exact & approx)
+    return hits / (k * len(queries))
+
+
+def bench_int8(
+    vectors: np.ndarray, queries: np.ndarray, k: int, store_dir: str, exact: VectorStoreService
+) -> None:
+    """Report int8 + re-rank latency, recall@k and resident vector memory vs float32."""
+    service = build_store(vectors, store_dir, quantization="int8")
+    float_mb = exact._matrix.nbytes / 2**20
+    int8_mb = (service._codes.nbytes + service._code_scales.nbytes) / 2**20
+    ms = time_queries(lambda q: service.search(q, k, -1.0, nprobe=0), queries)
+    recall = recall_at_k(service, queries, k, 0, reference=exact)
+    print(f"  int8+rerank  recall@{k} {recall:.3f}   {ms:8.3f} ms   "
+          f"{int8_mb:.0f} MiB codes vs {float_mb:.0f} MiB float32")
+    service.close()
+
+
+def bench_matryoshka(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    store_dir: str,
+    exact: VectorStoreService,
+    dims: List[int],
+) -> None:
+    """Report recall@k and latency of truncated first stages, with and without re-ranking."""
+    exact_ms = time_queries(lambda q: exact.search(q, k, -1.0, nprobe=0), queries)
+    print(f"  {'full ' + str(vectors.shape[1]) + 'D':<18} recall@{k} 1.000   {exact_ms:8.3f} ms")
+    for dim in dims:
+        for rerank in (True, False):
+            service = build_store(vectors, store_dir, matryoshka_dim=dim, matryoshka_rerank=rerank)
+            ms = time_queries(lambda q: service.search(q, k, -1.0, nprobe=0), queries)
+            recall = recall_at_k(service, queries, k, 0, reference=exact)
+            label = f"{dim}D" + ("+rerank" if rerank else "")
+            print(f"  {label:<18} recall@{k} {recall:.3f}   {ms:8.3f} ms")
+            service.close()
+
+
+def bench_ann(service: VectorStoreService, queries: np.ndarray, k: int) -> None:
+    """Report IVF build time and the recall@k / latency trade-off per nprobe."""
+    start = time.perf_counter()
+    service.build_ann_index()
+    n_lists = service._ann.n_lists
+    print(f"  IVF build: {n_lists} lists in {time.perf_counter() - start:.1f} s")
+
+    exact_ms = time_queries(lambda q: service.search(q, k, -1.0, nprobe=0), queries)
+    print(f"  {'exact':<12} recall@{k} 1.000   {exact_ms:8.3f} ms")
+    for nprobe in sorted({1, 4, 16, 32, 64, n_lists // 4}):
+        if nprobe > n_lists:
+            continue
+        ms = time_queries(lambda q: service.search(q, k, -1.0, nprobe=nprobe), queries)
+        recall = recall_at_k(service, queries, k, nprobe)
+        print(f"  nprobe={nprobe:<5} recall@{k} {recall:.3f}   {ms:8.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=100_000, help="corpus size")
+    parser.add_argument("--dim", type=int, default=768, help="embedding dimension")
+    parser.add_argument("--queries", type=int, default=100, help="number of timed queries")
+    parser.add_argument("--limit", type=int, default=30, help="top-k (search API uses limit * 3)")
+    parser.add_argument("--threshold", type=float, default=0.3, help="score threshold")
+    parser.add_argument("--ann", action="store_true", help="benchmark the IVF index")
+    parser.add_argument("--int8", action="store_true", help="benchmark int8 quantisation")
+    parser.add_argument(
+        "--matryoshka", type=int, nargs="+", metavar="DIM", help="benchmark truncated first-stage dimensions"
+    )
+    parser.add_argument("--decay", type=float, default=1.0, help="per-dimension scale decay of the corpus")
+    args = parser.parse_args()
+
+    vectors = make_corpus(args.n, args.dim, decay=args.decay)
+    queries = make_corpus(args.queries, args.dim, seed=1, decay=args.decay)
+    store_dir = tempfile.mkdtemp(prefix="cortex_bench_")
+
+    try:
+        service = build_store(vectors, store_dir)
+        print(f"corpus={args.n} dim={args.dim} k={args.limit} threshold={args.threshold}")
+
+        scores = vectors @ queries[0]
+        for strategy in SELECTION_STRATEGIES:
+            select_ms = time_queries(
+                lambda q: select_top_k(scores, args.limit, args.threshold, strategy), queries
+            )
+            search_ms = time_queries(
+                lambda q: service.search(q, args.limit, args.threshold, selection=strategy, nprobe=0),
+                queries,
+            )
+            print(f"  {strategy:<10} select-only {select_ms:8.3f} ms   full search {search_ms:8.3f} ms")
+
+        if args.int8:
+            bench_int8(vectors, queries, args.limit, store_dir, service)
+        if args.matryoshka:
+            bench_matryoshka(vectors, queries, args.limit, store_dir, service, args.matryoshka)
+        if args.ann:
+            bench_ann(service, queries, args.limit)
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
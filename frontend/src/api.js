@@ -238,6 +238,90 @@ export async function searchChats(query, limit = 30, clusterFilter = null) {
   });
 }
 
+/**
+ * Run several searches in one request.
+ *
+ * Each query is ranked exactly like {@link searchChats} (default hybrid
+ * keyword + semantic weights); the backend embeds all queries in one
+ * provider call and scores them in one pass over the vector store.
+ *
+ * @param {string[]} queries         – Natural-language search queries
+ * @param {number}   [limit=30]      – Max results per query
+ * @param {number}   [clusterFilter] – Optional cluster_id to restrict results
+ * @returns {Promise<{
+ *   results: Array<{query: string, results: Array<object>, total_results: number, search_time_ms: number}>,
+ *   total_queries: number,
+ *   search_time_ms: number
+ * }>} One search response per query, in input order (same shape as {@link searchChats})
+ * @throws {ApiError}
+ */
+export async function searchChatsBatch(queries, limit = 30, clusterFilter = null) {
+  const body = {
+    queries,
+    limit,
+  };
+  if (clusterFilter != null && clusterFilter >= 0) {
+    body.cluster_filter = clusterFilter;
+  }
+
+  return request("/api/search/batch", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(body),
+  });
+}
+
+/** Window (ms) in which {@link searchSimilar} calls are coalesced into one batch */
+const SIMILAR_BATCH_WINDOW_MS = 25;
+
+/** Max queries per coalesced batch request (backend limit is 100) */
+const SIMILAR_BATCH_MAX = 50;
+
+/** @type {Array<{query: string, limit: number, resolve: Function, reject: Function}>} */
+let similarQueue = [];
+let similarTimer = null;
+
+/** Send every queued {@link searchSimilar} call as one batch request. */
+async function flushSimilarQueue() {
+  similarTimer = null;
+  const pending = similarQueue;
+  similarQueue = [];
+
+  for (let i = 0; i < pending.length; i += SIMILAR_BATCH_MAX) {
+    const chunk = pending.slice(i, i + SIMILAR_BATCH_MAX);
+    const limit = Math.max(...chunk.map((p) => p.limit));
+    try {
+      const res = await searchChatsBatch(chunk.map((p) => p.query), limit);
+      chunk.forEach((p, k) => {
+        const r = res.results[k];
+        p.resolve({ ...r, results: r.results.slice(0, p.limit), total_results: Math.min(r.total_results, p.limit) });
+      });
+    } catch (err) {
+      chunk.forEach((p) => p.reject(err));
+    }
+  }
+}
+
+/**
+ * Like {@link searchChats}, but calls made within a short window are sent
+ * to the backend together as one {@link searchChatsBatch} request.
+ *
+ * Use for bursts of lookups (e.g. neighbour panels while hovering nodes).
+ *
+ * @param {string} query       – Natural-language search query
+ * @param {number} [limit=30]  – Max results to return
+ * @returns {Promise<object>} Same shape as {@link searchChats}
+ * @throws {ApiError}
+ */
+export function searchSimilar(query, limit = 30) {
+  return new Promise((resolve, reject) => {
+    similarQueue.push({ query, limit, resolve, reject });
+    if (similarTimer == null) {
+      similarTimer = setTimeout(flushSimilarQueue, SIMILAR_BATCH_WINDOW_MS);
+    }
+  });
+}
+
 /**
  * Get full conversation details including all messages.
  *
@@ -1,7 +1,7 @@
 import * as THREE from "three";
 import { OrbitControls } from "three/addons/controls/OrbitControls.js";
 import { PointerLockControls } from "three/addons/controls/PointerLockControls.js";
-import { fetchChats, searchChats, fetchChatDetails, uploadChatFile, healthCheck, ApiError } from "./api.js";
+import { fetchChats, searchChats, searchSimilar, fetchChatDetails, uploadChatFile, healthCheck, ApiError } from "./api.js";
 
 /**********************************************************************
  * Cortext — split-file Three.js
@@ -738,7 +738,7 @@ function populatePanel(i) {
   // Use backend semantic search for real similarity scores
   if (backendDataLoaded && n.backendId) {
     pNeighbors.innerHTML = `<div class="nbItem" style="opacity:0.5"><span class="inline-spinner"></span> Finding similar…</div>`;
-    searchChats(n.title, CFG.EDGE_K + 1).then((res) => {
+    searchSimilar(n.title, CFG.EDGE_K + 1).then((res) => {
       pNeighbors.innerHTML = "";
       for (const r of res.results) {
         // Skip the selected conversation itself
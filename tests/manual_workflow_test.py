@@ -14,7 +14,8 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.parsers import parse_html
-from backend.parsers.chatgpt_parser import ChatGPTParser
+from backend.parsers.chatgpt_parser import JSON_ARRAY_START, ChatGPTParser
+from backend.parsers.json_stream import iter_json_array
 from backend.services.summarizer import summarize_conversation
 from backend.services.embedder import generate_embedding, prepare_text_for_embedding
 
@@ -24,8 +25,6 @@ def parse_all_conversations(html_content: str):
     Parse ALL conversations from a ChatGPT HTML export (not just the first one).
     The default parser only returns conversations[0], so we dig into the JSON directly.
     """
-    import json, re
-
     parser = ChatGPTParser(html_content)
     scripts = parser.soup.find_all('script')
 
@@ -34,16 +33,12 @@ def parse_all_conversations(html_content: str):
         if not script_text:
             continue
 
-        match = re.search(r'var\s+jsonData\s*=\s*\[', script_text)
-        if match:
-            start_pos = match.end() - 1
-            json_str = parser._extract_json_array(script_text[start_pos:])
-            if json_str:
-                conversations_raw = json.loads(json_str)
-                # Use the parser's own JSON-to-dict converter for each conversation
-                return [
-                    parser._parse_json_conversation(c) for c in conversations_raw
-                ]
+        conversations_raw = list(iter_json_array(script_text, JSON_ARRAY_START))
+        if conversations_raw:
+            # Use the parser's own JSON-to-dict converter for each conversation
+            return [
+                parser._parse_json_conversation(c) for c in conversations_raw
+            ]
 
     # Fallback: single conversation via default parser
     result = parse_html(html_content)
@@ -104,8 +99,7 @@ async def main():
 
     embedding = await generate_embedding(
         text=embed_text,
-        conversation_id=None,   # skip cache
-        use_cache=False
+        use_cache=False   # skip cache
     )
     print(f"\n✅ Embedding generated!")
     print(f"   Dimensions: {len(embedding)}")
@@ -4,9 +4,20 @@ Unit tests for HTML chat parsers.
 Tests ChatGPT and Claude parser functionality with sample HTML
 and edge cases.
 """
+import io
+import json
+import re
+import sys
 import unittest
+import zipfile
 from datetime import datetime
-from backend.parsers import parse_html, detect_format, ChatGPTParser, ClaudeParser
+from unittest.mock import patch
+from backend.parsers import (
+    parse_html, parse_all_html, detect_format, sniff_format, ChatGPTParser, ClaudeParser, ParserFactory,
+    iter_json_export, iter_zip_export
+)
+from backend.parsers.base_parser import make_soup
+from backend.parsers.json_stream import iter_json_array
 
 
 class TestChatGPTParser(unittest.TestCase):
@@ -203,6 +214,245 @@ class TestParserFactory(unittest.TestCase):
         self.assertIsNotNone(result)
         self.assertIn('title', result)
         self.assertIn('messages', result)
+    
+    def test_title_sniff_skips_parse_tree(self):
+        """A decisive <title> is detected without building a parse tree."""
+        html = '<html><head><title>ChatGPT Data Export</title></head><body></body></html>'
+        with patch('backend.parsers.base_parser.make_soup', wraps=make_soup) as soup_builds:
+            self.assertEqual(detect_format(html), 'chatgpt')
+            self.assertEqual(ParserFactory.detect(html), ('chatgpt', None))
+        self.assertEqual(soup_builds.call_count, 0)
+        self.assertIsNone(sniff_format('<html><title>Notes</title></html>'))
+    
+    def test_upload_is_parsed_once(self):
+        """Detection and parsing share one parse tree."""
+        html = """
+        <html>
+        <body>
+            <div class="conversation">
+                <div data-message-author-role="user"><p>Hello there</p></div>
+                <div data-message-author-role="assistant"><p>Hi!</p></div>
+            </div>
+        </body>
+        </html>
+        """
+        with patch('backend.parsers.base_parser.make_soup', wraps=make_soup) as soup_builds:
+            results = parse_all_html(html)
+        self.assertEqual(soup_builds.call_count, 1)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(len(results[0]['messages']), 2)
+        
+        # Untitled Claude-style export: both parsers' detection runs on one tree
+        claude_html = '<html><body><div data-testid="user-message">Hello Claude</div></body></html>'
+        with patch('backend.parsers.base_parser.make_soup', wraps=make_soup) as soup_builds:
+            parser = ParserFactory.create_parser(claude_html)
+        self.assertIsInstance(parser, ClaudeParser)
+        self.assertEqual(soup_builds.call_count, 1)
+
+
+class TestStreamingExport(unittest.TestCase):
+    """Test decoding ChatGPT data exports without a parse tree."""
+    
+    @staticmethod
+    def make_export(n_conversations):
+        conversations = []
+        for i in range(n_conversations):
+            conversations.append({
+                'title': f'Conversation {i} ] [ "quoted" \\',
+                'create_time': 1700000000 + i,
+                'mapping': {
+                    'root': {'id': 'root', 'message': None, 'parent': None, 'children': ['m1']},
+                    'm1': {
+                        'id': 'm1',
+                        'message': {'author': {'role': 'user'}, 'content': {'parts': [f'Question {i} var jsonData = [']}},
+                        'parent': 'root',
+                        'children': [],
+                    },
+                },
+            })
+        # One conversation without messages is skipped
+        conversations.append({'title': 'Empty', 'mapping': {}})
+        return (
+            '<html><head><title>ChatGPT Data Export</title></head><body>'
+            '<script>var jsonData = ' + json.dumps(conversations, indent=1) + ';</script></body></html>'
+        )
+    
+    def test_iter_json_array_across_chunks(self):
+        """Elements split over many small reads decode to the same values."""
+        pattern = re.compile(r'var\s+data\s*=\s*\[')
+        text = 'x = 1; var data = [1, 23.5, "a]b", {"k": [1, 2]}, [], null];'
+        self.assertEqual(list(iter_json_array(text, pattern)), [1, 23.5, 'a]b', {'k': [1, 2]}, [], None])
+        for chunk_chars in (1, 3, 7):
+            self.assertEqual(
+                list(iter_json_array(io.StringIO(text), pattern, chunk_chars=chunk_chars)),
+                [1, 23.5, 'a]b', {'k': [1, 2]}, [], None],
+            )
+        self.assertEqual(list(iter_json_array('no array here', pattern)), [])
+        with self.assertRaises(ValueError):
+            list(iter_json_array('var data = [1, 2', pattern))
+        with self.assertRaises(ValueError):
+            list(iter_json_array('var data = [1 2]', pattern))
+
+    def test_malformed_element_stops_reading(self):
+        """A broken element fails once the buffer bound is reached, not at the end of the file."""
+        pattern = re.compile(r'var\s+data\s*=\s*\[')
+        source = io.StringIO('var data = [1, {broken' + ' ' * 10_000 + ', 2]')
+        elements = iter_json_array(source, pattern, chunk_chars=64, max_element_chars=256)
+        self.assertEqual(next(elements), 1)
+        with self.assertRaises(ValueError):
+            next(elements)
+        self.assertLess(source.tell(), 1_000)
+    
+    def test_stream_matches_full_parse(self):
+        """Streaming from a file yields what parse_all() returns, without a parse tree."""
+        html = self.make_export(5)
+        with patch('backend.parsers.base_parser.make_soup', wraps=make_soup) as soup_builds:
+            expected = parse_all_html(html)
+            streamed = list(ChatGPTParser('').iter_conversations(io.StringIO(html)))
+        self.assertEqual(soup_builds.call_count, 0)
+        self.assertEqual(len(expected), 5)
+        self.assertEqual(streamed, expected)
+        self.assertEqual(streamed[4]['messages'][0]['content'], 'Question 4 var jsonData = [')
+    
+    def test_stream_upload_is_lazy(self):
+        """Ingest decodes conversations only as they are consumed."""
+        from backend.api.ingest import stream_upload
+        upload = io.BytesIO(self.make_export(3).encode('utf-8'))
+        with patch('backend.parsers.chatgpt_parser.ChatGPTParser._parse_json_conversation',
+                   autospec=True, side_effect=ChatGPTParser._parse_json_conversation) as decoded:
+            conversations = stream_upload(upload)
+            self.assertEqual(decoded.call_count, 1)
+            self.assertEqual([c['title'] for c in conversations][2], 'Conversation 2 ] [ "quoted" \\')
+            self.assertEqual(decoded.call_count, 4)
+        
+        with self.assertRaises(ValueError):
+            stream_upload(io.BytesIO(b'<html><body>nothing</body></html>'))
+
+
+class TestMessageTree(unittest.TestCase):
+    """Test branch selection in ChatGPT message trees."""
+    
+    @staticmethod
+    def node(node_id, parent, children, role=None, text=None):
+        message = None
+        if role:
+            message = {'author': {'role': role}, 'content': {'parts': [text]}}
+        return {'id': node_id, 'message': message, 'parent': parent, 'children': children}
+    
+    def make_conversation(self, current_node=None):
+        # The first answer was regenerated; the user continued from the second one
+        mapping = {
+            'root': self.node('root', None, ['q1']),
+            'q1': self.node('q1', 'root', ['a1', 'a2'], 'user', 'Question'),
+            'a1': self.node('a1', 'q1', [], 'assistant', 'First answer'),
+            'a2': self.node('a2', 'q1', ['q2'], 'assistant', 'Second answer'),
+            'q2': self.node('q2', 'a2', [], 'user', 'Follow-up'),
+        }
+        conversation = {'title': 'Branches', 'mapping': mapping}
+        if current_node:
+            conversation['current_node'] = current_node
+        return conversation
+    
+    def contents(self, parsed):
+        return [m['content'] for m in parsed['messages']]
+    
+    def test_follows_current_node(self):
+        """Only the active branch is kept, with consecutive sequence numbers."""
+        parser = ChatGPTParser('')
+        parsed = parser._parse_json_conversation(self.make_conversation('a1'))
+        self.assertEqual(self.contents(parsed), ['Question', 'First answer'])
+        self.assertEqual([m['sequence_number'] for m in parsed['messages']], [0, 1])
+        
+        # Without current_node the newest child is followed at every fork
+        parsed = parser._parse_json_conversation(self.make_conversation())
+        self.assertEqual(self.contents(parsed), ['Question', 'Second answer', 'Follow-up'])
+    
+    def test_deep_thread(self):
+        """Threads far deeper than the recursion limit are parsed."""
+        depth = sys.getrecursionlimit() * 3
+        mapping = {'root': self.node('root', None, ['n0'])}
+        for i in range(depth):
+            children = [f'n{i + 1}'] if i + 1 < depth else []
+            mapping[f'n{i}'] = self.node(
+                f'n{i}', 'root' if i == 0 else f'n{i - 1}', children,
+                'user' if i % 2 == 0 else 'assistant', f'Message {i}'
+            )
+        parsed = ChatGPTParser('')._parse_json_conversation({'title': 'Deep', 'mapping': mapping})
+        self.assertEqual(len(parsed['messages']), depth)
+        self.assertEqual(parsed['messages'][-1]['content'], f'Message {depth - 1}')
+    
+    def test_all_branches(self):
+        """With all_branches every branch becomes its own conversation, active first."""
+        parser = ChatGPTParser('', all_branches=True)
+        variants = parser.parse_json_conversation(self.make_conversation('q2'))
+        self.assertEqual([v['title'] for v in variants], ['Branches', 'Branches (branch 2)'])
+        self.assertEqual(self.contents(variants[0]), ['Question', 'Second answer', 'Follow-up'])
+        self.assertEqual(self.contents(variants[1]), ['Question', 'First answer'])
+        
+        self.assertEqual(len(ChatGPTParser('').parse_json_conversation(self.make_conversation('q2'))), 1)
+
+
+class TestJsonExport(unittest.TestCase):
+    """Test ChatGPT and Claude data exports (conversations.json / ZIP)."""
+    
+    CHATGPT_CONVERSATION = {
+        'title': 'ChatGPT chat',
+        'create_time': 1700000000,
+        'mapping': {
+            'root': {'id': 'root', 'message': None, 'parent': None, 'children': ['m1']},
+            'm1': {
+                'id': 'm1',
+                'message': {'author': {'role': 'user'}, 'content': {'parts': ['Hello GPT']}},
+                'parent': 'root',
+                'children': [],
+            },
+        },
+    }
+    CLAUDE_CONVERSATION = {
+        'uuid': 'c1',
+        'name': 'Claude chat',
+        'created_at': '2024-03-01T12:30:00.000000Z',
+        'chat_messages': [
+            {'sender': 'human', 'text': 'Hello Claude', 'content': []},
+            {'sender': 'assistant', 'text': '', 'content': [{'type': 'text', 'text': 'Hi there'}]},
+        ],
+    }
+    
+    def make_zip(self, entries):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for name, data in entries.items():
+                zf.writestr(name, data)
+        buffer.seek(0)
+        return buffer
+    
+    def test_json_export_both_formats(self):
+        """Each conversation is parsed by the parser matching its shape."""
+        export = json.dumps([self.CHATGPT_CONVERSATION, self.CLAUDE_CONVERSATION, {'title': 'Other'}])
+        results = list(iter_json_export(export))
+        
+        self.assertEqual([r['title'] for r in results], ['ChatGPT chat', 'Claude chat'])
+        self.assertEqual(results[0]['messages'][0]['content'], 'Hello GPT')
+        self.assertEqual(
+            [(m['role'], m['content']) for m in results[1]['messages']],
+            [('user', 'Hello Claude'), ('assistant', 'Hi there')],
+        )
+        self.assertEqual(results[1]['created_at'], datetime(2024, 3, 1, 12, 30))
+    
+    def test_zip_export(self):
+        """conversations.json is read straight out of the archive."""
+        archive = self.make_zip({
+            'chat.html': '<html></html>',
+            'export/conversations.json': json.dumps([self.CLAUDE_CONVERSATION]),
+        })
+        results = list(iter_zip_export(archive))
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['title'], 'Claude chat')
+        
+        with self.assertRaises(ValueError):
+            list(iter_zip_export(self.make_zip({'chat.html': '<html></html>'})))
+        with self.assertRaises(ValueError):
+            list(iter_zip_export(io.BytesIO(b'not a zip')))
 
 
 class TestEdgeCases(unittest.TestCase):
@@ -11,12 +11,17 @@ Tests all service components:
 
 import unittest
 import asyncio
+import hashlib
+import inspect
 import json
 from unittest.mock import patch, MagicMock, AsyncMock
 from datetime import datetime
 from pathlib import Path
 import tempfile
 import shutil
+import threading
+
+import numpy as np
 
 # Import services
 from backend.services.normalizer import (
@@ -37,9 +42,21 @@ from backend.services.summarizer import (
 from backend.services.embedder import (
     generate_embedding,
     generate_embeddings_batch,
+    generate_query_embedding,
+    generate_query_embeddings,
+    get_query_cache_stats,
+    get_embedding_cache_stats,
     prepare_text_for_embedding,
     clear_cache as clear_embedding_cache
 )
+from backend.services import embedder
+from backend.services.chunker import chunk_messages, estimate_tokens
+from backend.services.provider import get_embedding_provider
+from backend.http_clients import close_http_clients, get_http_client
+from backend.services.embedding_cache import EmbeddingCache
+from backend.services.persistence import bulk_insert_conversations
+from backend.services.pipeline import PipelineStage, run_pipeline
+from backend.services.query_cache import QueryEmbeddingCache
 
 from backend.services.dimensionality_reducer import (
     fit_umap_model,
@@ -162,8 +179,8 @@ class TestSummarizer(unittest.TestCase):
             {"role": "assistant", "content": "Learn lists, dictionaries, and sets."}
         ]
     
-    @patch('backend.services.summarizer.httpx.AsyncClient')
-    def test_summarize_conversation(self, mock_async_client):
+    @patch('backend.services.summarizer.get_http_client')
+    def test_summarize_conversation(self, mock_get_client):
         """Test conversation summarization via Ollama."""
         # Mock Ollama HTTP response
         mock_response = MagicMock()
@@ -178,11 +195,10 @@ class TestSummarizer(unittest.TestCase):
             }
         }
         
-        # Set up the async context manager mock
+        # Set up the pooled client mock
         mock_client_instance = AsyncMock()
         mock_client_instance.post = AsyncMock(return_value=mock_response)
-        mock_async_client.return_value.__aenter__ = AsyncMock(return_value=mock_client_instance)
-        mock_async_client.return_value.__aexit__ = AsyncMock(return_value=False)
+        mock_get_client.return_value = mock_client_instance
         
         # Run async test
         async def run_test():
@@ -216,8 +232,8 @@ class TestSummarizer(unittest.TestCase):
 class TestEmbedder(unittest.TestCase):
     """Test embedding generation with mocked Ollama/nomic-embed-text calls."""
     
-    @patch('backend.services.embedder.httpx.AsyncClient')
-    def test_generate_embedding(self, mock_async_client):
+    @patch('backend.services.embedder.get_http_client')
+    def test_generate_embedding(self, mock_get_client):
         """Test single embedding generation via Ollama."""
         # Mock Ollama HTTP response
         mock_response = MagicMock()
@@ -229,8 +245,7 @@ class TestEmbedder(unittest.TestCase):
         
         mock_client_instance = AsyncMock()
         mock_client_instance.post = AsyncMock(return_value=mock_response)
-        mock_async_client.return_value.__aenter__ = AsyncMock(return_value=mock_client_instance)
-        mock_async_client.return_value.__aexit__ = AsyncMock(return_value=False)
+        mock_get_client.return_value = mock_client_instance
         
         # Run async test
         async def run_test():
@@ -241,21 +256,21 @@ class TestEmbedder(unittest.TestCase):
         self.assertEqual(len(embedding), 768)
         self.assertIsInstance(embedding[0], float)
     
-    @patch('backend.services.embedder.httpx.AsyncClient')
-    def test_generate_embeddings_batch(self, mock_async_client):
-        """Test batch embedding generation via Ollama."""
-        # Mock Ollama HTTP response (called once per text)
+    @patch('backend.services.embedder._ollama_batch_supported', None)
+    @patch('backend.services.embedder.get_http_client')
+    def test_generate_embeddings_batch(self, mock_get_client):
+        """Test batch embedding generation via Ollama's /api/embed."""
+        # Mock Ollama HTTP response (one call for the whole batch)
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.raise_for_status = MagicMock()
         mock_response.json.return_value = {
-            "embedding": [0.1] * 768
+            "embeddings": [[0.1] * 768, [0.2] * 768]
         }
         
         mock_client_instance = AsyncMock()
         mock_client_instance.post = AsyncMock(return_value=mock_response)
-        mock_async_client.return_value.__aenter__ = AsyncMock(return_value=mock_client_instance)
-        mock_async_client.return_value.__aexit__ = AsyncMock(return_value=False)
+        mock_get_client.return_value = mock_client_instance
         
         # Run async test
         async def run_test():
@@ -266,7 +281,225 @@ class TestEmbedder(unittest.TestCase):
         self.assertEqual(len(embeddings), 2)
         self.assertEqual(len(embeddings[0]), 768)
         self.assertEqual(len(embeddings[1]), 768)
+        mock_client_instance.post.assert_called_once()
+        self.assertTrue(mock_client_instance.post.call_args.args[0].endswith("/api/embed"))
+
+    @patch('backend.services.embedder._ollama_batch_supported', None)
+    @patch('backend.services.embedder.get_http_client')
+    def test_generate_embeddings_batch_without_embed_endpoint(self, mock_get_client):
+        """Servers without /api/embed fall back to one /api/embeddings call per text."""
+        missing = MagicMock(status_code=404, text="404 page not found")
+        single = MagicMock(status_code=200)
+        single.json.return_value = {"embedding": [0.1] * 768}
+
+        async def post(url, **kwargs):
+            return missing if url.endswith("/api/embed") else single
+
+        mock_client_instance = AsyncMock()
+        mock_client_instance.post = AsyncMock(side_effect=post)
+        mock_get_client.return_value = mock_client_instance
+
+        async def run_test():
+            first = await generate_embeddings_batch(["Text 1", "Text 2", "Text 3"], use_cache=False)
+            second = await generate_embeddings_batch(["Text 4"], use_cache=False)
+            return first, second
+
+        first, second = asyncio.run(run_test())
+
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 1)
+        urls = [c.args[0] for c in mock_client_instance.post.call_args_list]
+        # The missing endpoint is probed once, then remembered
+        self.assertEqual(sum(url.endswith("/api/embed") for url in urls), 1)
+        self.assertEqual(sum(url.endswith("/api/embeddings") for url in urls), 4)
+
+    @patch('backend.services.embedder._ollama_batch_supported', None)
+    @patch('backend.services.embedder.get_embedding_provider', return_value='ollama')
+    @patch('backend.services.embedder.get_http_client')
+    def test_ollama_single_and_batch_embeddings_match(self, mock_get_client, _provider):
+        """/api/embeddings (raw) and /api/embed (unit) vectors come out the same, cached or not."""
+        raw = [3.0, 4.0] + [0.0] * 766
+        unit = [0.6, 0.8] + [0.0] * 766
+        single = MagicMock(status_code=200)
+        single.json.return_value = {"embedding": raw}
+        batch = MagicMock(status_code=200)
+        batch.json.side_effect = lambda: {"embeddings": [unit, unit]}
+
+        async def post(url, **kwargs):
+            return batch if url.endswith("/api/embed") else single
+
+        mock_client_instance = AsyncMock()
+        mock_client_instance.post = AsyncMock(side_effect=post)
+        mock_get_client.return_value = mock_client_instance
+        cache_dir = Path(tempfile.mkdtemp())
+
+        async def run_test():
+            one = await generate_embedding("Text 1")
+            many = await generate_embeddings_batch(["Text 2", "Text 3"])
+            # A raw vector cached before normalisation (unmarked key) is not served
+            legacy_key = hashlib.sha256(f"{embedder.get_embedding_model_id()}\0Text 4".encode()).hexdigest()
+            embedder._save_to_cache(legacy_key, raw)
+            stale = await generate_embedding("Text 4")
+            return one, many, stale
+
+        try:
+            with patch('backend.services.embedder.CACHE_DIR', cache_dir), \
+                    patch('backend.services.embedder.EMBEDDING_BATCH_WINDOW_MS', 0):
+                one, many, stale = asyncio.run(run_test())
+                # Cache hits are returned as stored, without another normalisation pass
+                with patch('backend.services.embedder._l2_normalize') as normalize:
+                    cached = embedder._load_from_cache(embedder.embedding_cache_key("Text 1"))
+                normalize.assert_not_called()
+        finally:
+            embedder._embedding_cache.close()
+            embedder._embedding_cache = None
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+        for embedding in (one, cached, many[0], many[1], stale):
+            np.testing.assert_allclose(embedding, unit, rtol=1e-6)
     
+    @patch('backend.services.embedder.generate_embeddings_batch')
+    @patch('backend.services.embedder.generate_embedding')
+    def test_query_embedding_cache(self, mock_embed, mock_batch):
+        """Repeated (normalised) queries are served from the LRU."""
+        embedder._query_cache.clear()
+        mock_embed.side_effect = AsyncMock(return_value=[0.1] * 768)
+        mock_batch.side_effect = AsyncMock(return_value=[[0.2] * 768])
+
+        async def run_test():
+            first = await generate_query_embedding("Python decorators")
+            second = await generate_query_embedding("  python   DECORATORS ")
+            batch = await generate_query_embeddings(["python decorators", "rust lifetimes"])
+            return first, second, batch
+
+        first, second, batch = asyncio.run(run_test())
+
+        self.assertEqual(first, second)
+        self.assertEqual(mock_embed.call_count, 1)
+        mock_batch.assert_called_once_with(["rust lifetimes"], use_cache=False)
+        self.assertEqual(batch[0], first)
+        stats = get_query_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (2, 2, 2))
+        embedder._query_cache.clear()
+
+    @patch('backend.services.embedder._call_embedding_api')
+    def test_embedding_cache_is_content_addressed(self, mock_api):
+        """Same text + model hits the cache; a different model does not."""
+        mock_api.side_effect = AsyncMock(return_value=[1.0] + [0.0] * 767)
+        cache_dir = Path(tempfile.mkdtemp())
+
+        async def run_test():
+            await generate_embedding("Identical conversation text")
+            await generate_embedding("Identical conversation text")
+            with patch('backend.services.embedder.EMBEDDING_MODEL', 'other-model'):
+                await generate_embedding("Identical conversation text")
+            return await generate_embeddings_batch(["Identical conversation text"])
+
+        try:
+            with patch('backend.services.embedder.CACHE_DIR', cache_dir), \
+                    patch('backend.services.embedder.get_embedding_provider', return_value='ollama'):
+                batch = asyncio.run(run_test())
+                self.assertEqual(get_embedding_cache_stats()["entries"], 2)
+            self.assertEqual(mock_api.call_count, 2)
+            self.assertEqual(batch, [[1.0] + [0.0] * 767])
+        finally:
+            embedder._embedding_cache.close()
+            embedder._embedding_cache = None
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def test_embedding_cache_batched_lookup_and_eviction(self):
+        """Vectors round-trip as float32 and the oldest entries go once over budget."""
+        cache_dir = Path(tempfile.mkdtemp())
+        # Room for four 768-D float32 vectors
+        cache = EmbeddingCache(cache_dir / "cache.sqlite3", max_bytes=4 * 768 * 4)
+        try:
+            cache.put_many({"a": [0.25] * 768, "b": [0.5] * 768})
+            found = cache.get_many(["a", "b", "missing"])
+            self.assertEqual(set(found), {"a", "b"})
+            self.assertEqual(found["b"], [0.5] * 768)
+
+            for key in "cdef":
+                cache.put(key, [1.0] * 768)
+            stats = cache.stats()
+            self.assertLessEqual(stats["bytes"], stats["max_bytes"])
+            self.assertIsNone(cache.get("a"))
+            self.assertIsNotNone(cache.get("f"))
+            self.assertEqual(cache.clear(), stats["entries"])
+        finally:
+            cache.close()
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    @patch('backend.services.embedder.get_embedding_provider', return_value='ollama')
+    @patch('backend.services.embedder._call_embedding_api_batch')
+    def test_concurrent_embeddings_are_micro_batched(self, mock_batch, _provider):
+        """Concurrent single-text requests share one batched provider call."""
+        mock_batch.side_effect = AsyncMock(side_effect=lambda texts: [[float(len(t))] * 768 for t in texts])
+
+        async def run_test():
+            texts = [f"text {'x' * i}" for i in range(10)]
+            return texts, await asyncio.gather(
+                *(generate_embedding(t, use_cache=False) for t in texts)
+            )
+
+        texts, embeddings = asyncio.run(run_test())
+
+        mock_batch.assert_called_once_with(texts)
+        for text, embedding in zip(texts, embeddings):
+            self.assertEqual(embedding[0], float(len(text)))
+
+    @patch('backend.services.embedder.get_embedding_provider', return_value='ollama')
+    @patch('backend.services.embedder._call_embedding_api_batch')
+    def test_micro_batch_failure_reaches_every_caller(self, mock_batch, _provider):
+        """A failed batch call raises in each coalesced caller."""
+        mock_batch.side_effect = AsyncMock(side_effect=Exception("Ollama down"))
+
+        async def run_test():
+            return await asyncio.gather(
+                generate_embedding("first", use_cache=False),
+                generate_embedding("second", use_cache=False),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run_test())
+        self.assertEqual([str(r) for r in results], ["Ollama down", "Ollama down"])
+
+    @patch('backend.services.embedder.get_embedding_provider', return_value='local')
+    @patch('backend.services.local_embedder._get_model')
+    def test_local_provider_runs_off_event_loop(self, mock_get_model, _provider):
+        """EMBEDDING_PROVIDER=local embeds in-process on the executor thread."""
+        threads = []
+
+        def encode(texts, **kwargs):
+            threads.append(threading.current_thread().name)
+            return np.full((len(texts), 768), 0.5, dtype=np.float32)
+
+        mock_get_model.return_value.encode.side_effect = encode
+
+        async def run_test():
+            return await generate_embeddings_batch(["Text 1", "Text 2"], use_cache=False)
+
+        embeddings = asyncio.run(run_test())
+
+        self.assertEqual(embeddings, [[0.5] * 768, [0.5] * 768])
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("local-embed"))
+        with patch.dict('os.environ', {"EMBEDDING_PROVIDER": "local"}):
+            self.assertEqual(get_embedding_provider(), "local")
+
+    def test_query_cache_lru_and_ttl(self):
+        """Least recently used entries are evicted and expired entries miss."""
+        cache = QueryEmbeddingCache(max_size=2, ttl_seconds=60)
+        cache.put("m", "a", [1.0])
+        cache.put("m", "b", [2.0])
+        self.assertEqual(cache.get("m", "a"), [1.0])
+        cache.put("m", "c", [3.0])
+        self.assertIsNone(cache.get("m", "b"))
+        self.assertIsNone(cache.get("other-model", "a"))
+
+        with patch('backend.services.query_cache.time.monotonic', return_value=1e12):
+            self.assertIsNone(cache.get("m", "a"))
+        self.assertEqual(cache.get_stats()["size"], 1)
+
     def test_prepare_text_for_embedding(self):
         """Test text preparation for embedding."""
         text = prepare_text_for_embedding(
@@ -285,6 +518,245 @@ class TestEmbedder(unittest.TestCase):
         self.assertIn("Hello", text)
 
 
+class TestChunker(unittest.TestCase):
+    """Test token-bounded transcript windows."""
+
+    def setUp(self):
+        self.messages = [
+            {"role": "user", "content": " ".join(f"word{i}" for i in range(300))},
+            {"role": "assistant", "content": "final answer"},
+        ]
+
+    def test_windows_are_bounded_and_overlap(self):
+        chunks = chunk_messages(self.messages, max_tokens=64, overlap_tokens=8, max_chunks=100)
+        for chunk in chunks:
+            self.assertLessEqual(sum(estimate_tokens(w) for w in chunk.split()), 64)
+        self.assertTrue(chunks[0].startswith("USER: word0"))
+        self.assertTrue(chunks[-1].endswith("ASSISTANT: final answer"))
+        # Consecutive windows share their boundary words
+        self.assertEqual(chunks[0].split()[-4:], chunks[1].split()[:4])
+
+    def test_chunk_count_is_capped(self):
+        self.assertEqual(len(chunk_messages(self.messages, max_tokens=32, overlap_tokens=0, max_chunks=3)), 3)
+        self.assertEqual(chunk_messages([], max_tokens=32), [])
+
+    def test_capped_windows_span_the_whole_transcript(self):
+        """A transcript longer than max_chunks windows still has its last message covered."""
+        all_windows = chunk_messages(self.messages, max_tokens=32, overlap_tokens=0, max_chunks=100)
+        self.assertGreater(len(all_windows), 3)
+        chunks = chunk_messages(self.messages, max_tokens=32, overlap_tokens=0, max_chunks=3)
+        self.assertEqual(chunks[0], all_windows[0])
+        self.assertEqual(chunks[-1], all_windows[-1])
+        self.assertTrue(chunks[-1].endswith("answer"))
+        self.assertIn(chunks[1], all_windows[1:-1])
+
+
+class TestHttpClients(unittest.TestCase):
+    """Test the pooled HTTP client registry."""
+
+    def test_clients_are_pooled_per_loop(self):
+        """One client per provider per event loop; close_http_clients() closes them."""
+        async def run_test():
+            client = get_http_client("ollama")
+            self.assertIs(get_http_client("ollama"), client)
+            self.assertIsNot(get_http_client("groq"), client)
+            with self.assertRaises(ValueError):
+                get_http_client("unknown")
+            await close_http_clients()
+            return client
+
+        first = asyncio.run(run_test())
+        second = asyncio.run(run_test())
+        self.assertTrue(first.is_closed)
+        self.assertIsNot(first, second)
+
+
+class TestPipeline(unittest.TestCase):
+    """Test the staged ingest pipeline."""
+    
+    def test_items_flow_through_batched_stages(self):
+        """Every item passes every stage; batch stages receive lists."""
+        batch_sizes = []
+        
+        async def double(x):
+            return x * 2
+        
+        async def add_batch(items):
+            batch_sizes.append(len(items))
+            await asyncio.sleep(0)
+            return [x + 1 for x in items]
+        
+        stages = [PipelineStage("double", double, concurrency=3), PipelineStage("add", add_batch, batch_size=4)]
+        out = asyncio.run(run_pipeline(range(20), stages, queue_size=4))
+        
+        self.assertEqual(sorted(out), [2 * i + 1 for i in range(20)])
+        self.assertTrue(all(size <= 4 for size in batch_sizes))
+        self.assertEqual(stages[1].processed, 20)
+    
+    def test_bounded_queues_apply_back_pressure(self):
+        """A slow stage stops the source from being read far ahead of it."""
+        consumed = []
+        max_ahead = []
+        done = []
+        
+        def source():
+            for i in range(30):
+                consumed.append(i)
+                max_ahead.append(len(consumed) - len(done))
+                yield i
+        
+        async def slow(x):
+            await asyncio.sleep(0.001)
+            done.append(x)
+            return x
+        
+        asyncio.run(run_pipeline(source(), [PipelineStage("slow", slow)], queue_size=2))
+        self.assertEqual(len(done), 30)
+        # queue (2) + the item in the worker + the one the feeder is blocked on
+        self.assertLessEqual(max(max_ahead), 4)
+    
+    def test_concurrency_limit_and_failures(self):
+        """Stages never exceed their concurrency; failed items are dropped and counted."""
+        active = [0]
+        peak = [0]
+        
+        async def work(x):
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.001)
+            active[0] -= 1
+            if x == 3:
+                raise RuntimeError("boom")
+            return x
+        
+        stage = PipelineStage("work", work, concurrency=2)
+        out = asyncio.run(run_pipeline(range(10), [stage], queue_size=8))
+        
+        self.assertEqual(sorted(out), [i for i in range(10) if i != 3])
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(stage.failed, 1)
+    
+    def test_batch_stage_item_failures(self):
+        """Exceptions returned by a batch stage count as failures of those items only."""
+        async def check(items):
+            return [ValueError(x) if x % 3 == 0 else x for x in items]
+        
+        dropped = []
+        
+        async def on_drop(item):
+            dropped.append(item)
+        
+        stage = PipelineStage("check", check, batch_size=4)
+        out = asyncio.run(run_pipeline(range(9), [stage], queue_size=8, on_drop=on_drop))
+        
+        self.assertEqual(sorted(out), [1, 2, 4, 5, 7, 8])
+        self.assertEqual(stage.failed, 3)
+        self.assertEqual(stage.processed, 9)
+        self.assertEqual(sorted(dropped), [0, 3, 6])
+
+
+class TestIngestStages(unittest.TestCase):
+    """Test the ingest pipeline stages."""
+    
+    def test_chunks_embedded_in_batches_and_persist_failures_isolated(self):
+        """Chunk vectors come from the batched embed stage; one bad conversation fails alone."""
+        from contextlib import contextmanager
+        from backend.api import ingest
+        
+        embed_calls = []
+        inserted = []
+        
+        async def fake_embed(texts, use_cache=True):
+            embed_calls.append([frame.function for frame in inspect.stack()])
+            return [[0.1] * 8 for _ in texts]
+        
+        async def fake_summarize(messages):
+            return "Summary", ["Topic"]
+        
+        @contextmanager
+        def fake_db():
+            yield MagicMock()
+        
+        def fake_insert(db, conversations):
+            if any(c["title"] == "Bad" for c in conversations):
+                raise ValueError("'robot' is not a valid MessageRole")
+            inserted.extend(c["title"] for c in conversations)
+        
+        parsed = [
+            {
+                "title": "Bad" if i == 2 else f"Conversation {i}",
+                "messages": [
+                    {"role": "user", "content": f"Question {i} " * 20, "sequence_number": 0},
+                    {"role": "assistant", "content": f"Answer {i} " * 20, "sequence_number": 1},
+                ],
+            }
+            for i in range(5)
+        ]
+        with patch.object(ingest, "EMBEDDING_CHUNKING", True), \
+                patch.object(ingest, "generate_embeddings_batch", side_effect=fake_embed), \
+                patch.object(ingest, "summarize_conversation", side_effect=fake_summarize), \
+                patch.object(ingest, "get_db_context", fake_db), \
+                patch.object(ingest, "bulk_insert_conversations", side_effect=fake_insert), \
+                patch.object(ingest, "upsert_conversation_to_store", new=AsyncMock()), \
+                patch.object(ingest, "upsert_conversation_chunks", new=AsyncMock()) as upsert_chunks:
+            results = asyncio.run(ingest.run_ingest_pipeline(parsed))
+        
+        self.assertEqual([r.title for r in results], [f"Conversation {i}" for i in (0, 1, 3, 4)])
+        self.assertEqual(sorted(inserted), [f"Conversation {i}" for i in (0, 1, 3, 4)])
+        self.assertEqual(upsert_chunks.await_count, 4)
+        # Chunks are embedded by the (batched, concurrent) embed stage, not while persisting
+        self.assertTrue(embed_calls)
+        self.assertFalse(any("_persist_stage" in stack for stack in embed_calls))
+        self.assertTrue(all(args.args[3] for args in upsert_chunks.await_args_list))
+
+
+class TestBulkPersistence(unittest.TestCase):
+    """Test bulk inserts of ingested conversations."""
+    
+    def test_bulk_insert_conversations(self):
+        """Conversations, messages and embeddings land in one transaction with defaults applied."""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from backend.database import Base
+        from backend.models import Conversation, Embedding, Message, MessageRole
+        
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        conversations = [
+            {
+                "id": f"conv-{i}",
+                "title": f"Conversation {i}",
+                "summary": "Summary",
+                "topics": ["Python"],
+                "message_count": 2,
+                "created_at": datetime(2024, 1, 1),
+                "messages": [
+                    {"role": "user", "content": "Hi", "sequence_number": 0},
+                    {"role": "assistant", "content": "Hello", "sequence_number": 1},
+                ],
+                "embedding": [0.1] * 8,
+            }
+            for i in range(3)
+        ]
+        
+        counts = bulk_insert_conversations(db, conversations)
+        db.commit()
+        
+        self.assertEqual(counts, {"conversations": 3, "messages": 6, "embeddings": 3})
+        conv = db.query(Conversation).filter(Conversation.id == "conv-1").one()
+        self.assertEqual(conv.topics, ["Python"])
+        self.assertEqual(conv.cluster_name, "Unclustered")
+        self.assertIsNotNone(conv.updated_at)
+        roles = [m.role for m in sorted(conv.messages, key=lambda m: m.sequence_number)]
+        self.assertEqual(roles, [MessageRole.USER, MessageRole.ASSISTANT])
+        self.assertEqual(len({m.id for m in db.query(Message).all()}), 6)
+        self.assertEqual(conv.embedding.embedding_384d, [0.1] * 8)
+        self.assertEqual(bulk_insert_conversations(db, [])["conversations"], 0)
+        db.close()
+        engine.dispose()
+
+
 class TestDimensionalityReducer(unittest.TestCase):
     """Test UMAP dimensionality reduction."""
     
@@ -312,6 +784,17 @@ class TestDimensionalityReducer(unittest.TestCase):
         self.assertIn("start_x", results[0])
         self.assertIn("magnitude", results[0])
     
+    def test_fit_umap_model_on_truncated_embeddings(self):
+        """Matryoshka-truncated input is fitted and transformed at the short dimension."""
+        rng = np.random.default_rng(0)
+        embeddings = rng.standard_normal((10, 768)).tolist()
+        with patch("backend.services.dimensionality_reducer.UMAP_INPUT_DIM", 128):
+            model = fit_umap_model(embeddings, save_model=False)
+            results = reduce_embeddings(embeddings, model=model)
+        
+        self.assertEqual(model._raw_data.shape[1], 128)
+        self.assertEqual(len(results), 10)
+    
     def test_normalize_coordinates(self):
         """Test coordinate normalization."""
         coords_list = [
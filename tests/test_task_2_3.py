@@ -5,7 +5,7 @@ Tests all subtasks and acceptance criteria from PRD.md:
 - 2.3.1: Single file ingestion
 - 2.3.2: Batch ingestion
 - 2.3.3: Re-clustering functionality
-- 2.3.4: Progress tracking (optional - not implemented)
+- 2.3.4: Background ingest jobs with progress tracking
 - 2.3.5: Error handling
 
 Acceptance Criteria:
@@ -15,18 +15,28 @@ Acceptance Criteria:
  Error cases return appropriate HTTP status codes
 """
 
+import asyncio
+import json
 import unittest
 import sys
+import zipfile
+import shutil
+import tempfile
+import time
+import uuid
 from pathlib import Path
 from io import BytesIO
+from unittest.mock import patch
 
 # Add backend to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from fastapi.testclient import TestClient
 from backend.main import app
+from backend.api import ingest_jobs
+from backend.api.ingest import run_ingest_pipeline
 from backend.database import init_db, get_db_context
-from backend.models import Conversation, Message, Embedding
+from backend.models import Conversation, Message, Embedding, IngestJob, IngestJobStatus
 
 
 class TestTask2_3_1_SingleIngestion(unittest.TestCase):
@@ -282,6 +292,282 @@ class TestTask2_3_3_Reprocessing(unittest.TestCase):
         self.assertIn("at least 2 conversations", data["detail"].lower())
 
 
+JOB_HTML = """
+<html>
+<head><title>ChatGPT - Job Conversation</title></head>
+<body>
+    <div data-message-author-role="user"><p>Background question</p></div>
+    <div data-message-author-role="assistant"><p>Background answer</p></div>
+</body>
+</html>
+"""
+
+
+async def _fake_summarize(messages):
+    return "Job summary", ["Jobs"]
+
+
+async def _fake_embed_batch(texts, use_cache=True):
+    return [[0.1] * 768 for _ in texts]
+
+
+async def _fake_upsert(**kwargs):
+    return None
+
+
+@patch("backend.api.ingest.upsert_conversation_to_store", side_effect=_fake_upsert)
+@patch("backend.api.ingest.generate_embeddings_batch", side_effect=_fake_embed_batch)
+@patch("backend.api.ingest.summarize_conversation", side_effect=_fake_summarize)
+class TestTask2_3_4_IngestJobs(unittest.TestCase):
+    """Test Task 2.3.4: Background ingest jobs with progress tracking."""
+
+    def setUp(self):
+        init_db()
+        self.job_dir = tempfile.mkdtemp()
+        patcher = patch("backend.api.ingest_jobs.INGEST_JOB_DIR", Path(self.job_dir))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        poll = patch("backend.api.ingest_jobs.INGEST_JOB_POLL_SECONDS", 0.05)
+        poll.start()
+        self.addCleanup(poll.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.job_dir, ignore_errors=True)
+
+    def _wait(self, client, job_id, timeout=15.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            data = client.get(f"/api/ingest/jobs/{job_id}").json()
+            if data["status"] in ("completed", "failed"):
+                return data
+            time.sleep(0.05)
+        self.fail(f"Job {job_id} did not finish")
+
+    def test_upload_returns_job_and_completes(self, mock_summarize, mock_embed, mock_upsert):
+        """Upload returns 202 with a job id; polling reports the finished job."""
+        with TestClient(app) as client:
+            files = [("files", ("job.html", BytesIO(JOB_HTML.encode()), "text/html"))]
+            response = client.post("/api/ingest/jobs", files=files)
+            self.assertEqual(response.status_code, 202)
+            job = response.json()["jobs"][0]
+            self.assertIn(job["status"], ("queued", "running", "completed"))
+
+            data = self._wait(client, job["job_id"])
+            self.assertEqual(data["status"], "completed")
+            self.assertEqual(data["total_conversations"], 1)
+            self.assertEqual(data["processed"], 1)
+            self.assertEqual(data["message_count"], 2)
+            self.assertIsNotNone(data["throughput_per_sec"])
+
+        with get_db_context() as db:
+            conv = db.query(Conversation).filter(Conversation.id == data["conversation_ids"][0]).first()
+            self.assertIsNotNone(conv)
+        self.assertFalse(any(Path(self.job_dir).iterdir()))
+
+    def test_event_stream_reports_progress_until_done(self, mock_summarize, mock_embed, mock_upsert):
+        """The SSE stream sends progress events and closes with a done event."""
+        with TestClient(app) as client:
+            files = [("files", ("job.html", BytesIO(JOB_HTML.encode()), "text/html"))]
+            job_id = client.post("/api/ingest/jobs", files=files).json()["jobs"][0]["job_id"]
+            with client.stream("GET", f"/api/ingest/jobs/{job_id}/events") as response:
+                self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+                body = "".join(response.iter_text())
+        self.assertIn("event: progress", body)
+        self.assertIn('"status":"completed"', body)
+        self.assertTrue(body.rstrip().endswith('data: {"status": "completed"}'))
+
+    def test_interrupted_job_resumes_on_startup(self, mock_summarize, mock_embed, mock_upsert):
+        """A job left running by a restart resumes and skips stored conversations."""
+        upload = Path(self.job_dir) / "resume.html"
+        upload.write_text(JOB_HTML)
+        with get_db_context() as db:
+            job = IngestJob(
+                filename="resume.html",
+                upload_path=str(upload),
+                status=IngestJobStatus.RUNNING,
+                completed_indices=[0],
+                conversation_ids=["already-stored"],
+                message_count=2,
+            )
+            db.add(job)
+            db.commit()
+            job_id = job.id
+
+        with TestClient(app) as client:
+            data = self._wait(client, job_id)
+        self.assertEqual(data["status"], "completed")
+        self.assertEqual(data["processed"], 1)
+        self.assertEqual(data["conversation_ids"], ["already-stored"])
+        mock_summarize.assert_not_called()
+
+    def test_rerun_with_job_namespace_stores_nothing_twice(self, mock_summarize, mock_embed, mock_upsert):
+        """A batch re-run after a crash before its progress write is not stored again."""
+        parsed = [
+            {"title": f"Rerun {i}", "messages": [{"role": "user", "content": f"Question {i}"}]}
+            for i in range(3)
+        ]
+        namespace = str(uuid.uuid4())
+        first = asyncio.run(run_ingest_pipeline(parsed, id_namespace=namespace))
+        second = asyncio.run(run_ingest_pipeline(parsed, id_namespace=namespace))
+
+        ids = [r.conversation_id for r in first]
+        self.assertEqual(len(set(ids)), 3)
+        self.assertEqual([r.conversation_id for r in second], ids)
+        with get_db_context() as db:
+            self.assertEqual(db.query(Conversation).filter(Conversation.id.in_(ids)).count(), 3)
+
+    def test_progress_writes_are_throttled(self, mock_summarize, mock_embed, mock_upsert):
+        """A running job saves its progress in batches, not once per conversation."""
+        parsed = [
+            {"title": f"Batched {i}", "messages": [{"role": "user", "content": f"Question {i}"}]}
+            for i in range(5)
+        ]
+        with patch("backend.api.ingest_jobs.stream_upload", return_value=iter(parsed)), \
+                patch("backend.api.ingest_jobs.INGEST_JOB_PROGRESS_SECONDS", 3600), \
+                patch("backend.api.ingest_jobs._update_job", wraps=ingest_jobs._update_job) as update:
+            upload = Path(self.job_dir) / "batched.html"
+            upload.write_text(JOB_HTML)
+            with get_db_context() as db:
+                job = IngestJob(filename="batched.html", upload_path=str(upload))
+                db.add(job)
+                db.commit()
+                job_id = job.id
+            asyncio.run(ingest_jobs.run_job(job_id))
+
+        progress_writes = [c for c in update.call_args_list if "completed_indices" in c.kwargs]
+        self.assertEqual(len(progress_writes), 1)
+        self.assertEqual(progress_writes[0].kwargs["completed_indices"], [0, 1, 2, 3, 4])
+        with get_db_context() as db:
+            job = db.query(IngestJob).filter(IngestJob.id == job_id).first()
+            self.assertEqual(job.status, IngestJobStatus.COMPLETED)
+            self.assertEqual(len(job.conversation_ids), 5)
+
+    def test_failed_conversations_are_counted_while_running(self, mock_summarize, mock_embed, mock_upsert):
+        """Empty or failed conversations are recorded by position and reported as failed."""
+        parsed = [
+            {"title": "Stored", "messages": [{"role": "user", "content": "Question"}]},
+            {"title": "Empty", "messages": []},
+        ]
+        upload = Path(self.job_dir) / "partial.html"
+        upload.write_text(JOB_HTML)
+        with patch("backend.api.ingest_jobs.stream_upload", return_value=iter(parsed)):
+            with get_db_context() as db:
+                job = IngestJob(filename="partial.html", upload_path=str(upload))
+                db.add(job)
+                db.commit()
+                job_id = job.id
+            asyncio.run(ingest_jobs.run_job(job_id))
+
+        with get_db_context() as db:
+            job = db.query(IngestJob).filter(IngestJob.id == job_id).first()
+            self.assertEqual(job.failed_indices, [1])
+            data = ingest_jobs.job_to_response(job)
+            self.assertEqual((data.processed, data.failed), (1, 1))
+
+            job.status = IngestJobStatus.RUNNING
+            self.assertEqual(ingest_jobs.job_to_response(job).failed, 1)
+
+    def test_errors(self, mock_summarize, mock_embed, mock_upsert):
+        """Unknown jobs return 404 and non-HTML uploads 400."""
+        with TestClient(app) as client:
+            self.assertEqual(client.get("/api/ingest/jobs/does-not-exist").status_code, 404)
+            files = [("files", ("notes.txt", BytesIO(b"Not HTML"), "text/plain"))]
+            self.assertEqual(client.post("/api/ingest/jobs", files=files).status_code, 400)
+
+    def test_malformed_stream_fails_and_removes_upload(self, mock_summarize, mock_embed, mock_upsert):
+        """JSON that breaks off after the first conversation fails the job and removes the upload."""
+        conversation = {
+            "title": "Streamed",
+            "mapping": {
+                "root": {"id": "root", "message": None, "parent": None, "children": ["m1"]},
+                "m1": {
+                    "id": "m1",
+                    "message": {"author": {"role": "user"}, "content": {"parts": ["Hello"]}},
+                    "parent": "root",
+                    "children": [],
+                },
+            },
+        }
+        export = json.dumps([conversation]).rstrip("]") + ", {broken"
+        with TestClient(app) as client:
+            files = [("files", ("conversations.json", BytesIO(export.encode()), "application/json"))]
+            job_id = client.post("/api/ingest/jobs", files=files).json()["jobs"][0]["job_id"]
+            data = self._wait(client, job_id)
+        self.assertEqual(data["status"], "failed")
+        self.assertFalse(any(Path(self.job_dir).iterdir()))
+
+
+@patch("backend.api.ingest.upsert_conversation_to_store", side_effect=_fake_upsert)
+@patch("backend.api.ingest.generate_embeddings_batch", side_effect=_fake_embed_batch)
+@patch("backend.api.ingest.summarize_conversation", side_effect=_fake_summarize)
+class TestTask2_3_4_DataExportIngestion(unittest.TestCase):
+    """Test Task 2.3.4: Ingesting ZIP / conversations.json data exports."""
+
+    CONVERSATIONS = [
+        {
+            "name": "Claude export chat",
+            "created_at": "2024-03-01T12:30:00Z",
+            "chat_messages": [
+                {"sender": "human", "text": "What is a ZIP archive?"},
+                {"sender": "assistant", "text": "A compressed file container."},
+            ],
+        },
+        {
+            "title": "ChatGPT export chat",
+            "create_time": 1700000000,
+            "mapping": {
+                "root": {"id": "root", "message": None, "parent": None, "children": ["m1"]},
+                "m1": {
+                    "id": "m1",
+                    "message": {"author": {"role": "user"}, "content": {"parts": ["Hello from JSON"]}},
+                    "parent": "root",
+                    "children": [],
+                },
+            },
+        },
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+        cls.client = TestClient(app)
+
+    def test_ingest_zip_export(self, mock_summarize, mock_embed, mock_upsert):
+        """A data export archive is ingested without its HTML wrapper."""
+        archive = BytesIO()
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("conversations.json", json.dumps(self.CONVERSATIONS))
+        files = {"file": ("export.zip", BytesIO(archive.getvalue()), "application/zip")}
+        response = self.client.post("/api/ingest/export", files=files)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertTrue(data["success"])
+        self.assertEqual(data["title"], "2 conversations")
+        self.assertEqual(data["message_count"], 3)
+
+    def test_ingest_json_export(self, mock_summarize, mock_embed, mock_upsert):
+        """conversations.json can be uploaded on its own."""
+        files = {"file": ("conversations.json", BytesIO(json.dumps(self.CONVERSATIONS[:1]).encode()), "application/json")}
+        response = self.client.post("/api/ingest/export", files=files)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["title"], "Claude export chat")
+        with get_db_context() as db:
+            conversation = db.query(Conversation).filter(Conversation.id == data["conversation_id"]).first()
+            self.assertEqual(conversation.message_count, 2)
+
+    def test_export_errors(self, mock_summarize, mock_embed, mock_upsert):
+        """Wrong file types return 400, unusable exports 422."""
+        files = {"file": ("chat.html", BytesIO(b"<html></html>"), "text/html")}
+        self.assertEqual(self.client.post("/api/ingest/export", files=files).status_code, 400)
+        files = {"file": ("export.zip", BytesIO(b"not a zip"), "application/zip")}
+        self.assertEqual(self.client.post("/api/ingest/export", files=files).status_code, 422)
+        files = {"file": ("conversations.json", BytesIO(b"[]"), "application/json")}
+        self.assertEqual(self.client.post("/api/ingest/export", files=files).status_code, 422)
+
+
 class TestTask2_3_5_ErrorHandling(unittest.TestCase):
     """Test Task 2.3.5: Error handling."""
 
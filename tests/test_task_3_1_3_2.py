@@ -18,12 +18,17 @@ Search API endpoint integration tests.
 import os
 import sys
 import json
+import shutil
+import subprocess
 import tempfile
+import threading
 import unittest
 from io import BytesIO
 from pathlib import Path
 from unittest.mock import Mock, patch, AsyncMock
 
+import numpy as np
+
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -31,7 +36,30 @@ from fastapi.testclient import TestClient
 from backend.main import app
 from backend.database import init_db, drop_db, get_db_context
 from backend.models import Conversation, Embedding
+from backend.services.keyword_index import BM25Index
+from backend.services.vector_store import VectorStoreService, data_dir_for, select_top_k
+from backend.services.vector_storage import ReadOnlyStorageError
+
+
+# Writer process for the multi-process test: applies commands read from stdin
+_WRITER_PROCESS = """
+import sys
+sys.path.insert(0, sys.argv[1])
 from backend.services.vector_store import VectorStoreService
+service = VectorStoreService(store_path=sys.argv[2])
+for line in sys.stdin:
+    command, *args = line.split()
+    if command == "upsert":
+        i = int(args[0])
+        service.upsert_conversation(f"c{i}", f"doc c{i}", [0.0] * i + [1.0] + [0.0] * (767 - i), {})
+    elif command == "compact":
+        service.compact_storage(wait=True)
+    elif command == "exit":
+        service.close()
+    print("ok", flush=True)
+    if command == "exit":
+        break
+"""
 
 
 class TestTask3_1_VectorStoreSetup(unittest.TestCase):
@@ -45,8 +73,10 @@ class TestTask3_1_VectorStoreSetup(unittest.TestCase):
         self.service = VectorStoreService(store_path=self.tmpfile.name)
 
     def tearDown(self):
+        self.service.close()
         if os.path.exists(self.tmpfile.name):
             os.unlink(self.tmpfile.name)
+        shutil.rmtree(data_dir_for(self.tmpfile.name), ignore_errors=True)
 
     def test_initialization_creates_empty_store(self):
         """Test that a new store starts empty."""
@@ -62,11 +92,11 @@ class TestTask3_1_VectorStoreSetup(unittest.TestCase):
         )
         self.assertEqual(self.service.count(), 1)
 
-        # Verify on-disk persistence
-        with open(self.tmpfile.name) as f:
-            data = json.load(f)
-        self.assertIn("conv_001", data)
-        self.assertEqual(data["conv_001"]["metadata"]["title"], "Test")
+        # Verify on-disk persistence (appended to the write-ahead log)
+        data_dir = data_dir_for(self.tmpfile.name)
+        self.assertTrue(os.path.exists(os.path.join(data_dir, "wal.0.log")))
+        reloaded = VectorStoreService(store_path=self.tmpfile.name)
+        self.assertEqual(reloaded._data["conv_001"]["metadata"]["title"], "Test")
 
     def test_upsert_updates_existing(self):
         """Test that upserting with the same ID overwrites the doc."""
@@ -102,6 +132,165 @@ class TestTask3_1_VectorStoreSetup(unittest.TestCase):
         stats = self.service.get_stats()
         self.assertEqual(stats["document_count"], 2)
 
+    def test_matrix_rows_are_normalised_and_updated_in_place(self):
+        """Upserting an existing ID reuses its row in the embedding matrix."""
+        self.service.upsert_conversation("c1", "doc1", [3.0] + [4.0] + [0.0] * 766, {})
+        self.service.upsert_conversation("c1", "doc1b", [0.0] * 767 + [2.0], {})
+        self.assertEqual(self.service._n_rows, 1)
+        self.assertAlmostEqual(float(np.linalg.norm(self.service._matrix[0])), 1.0, places=5)
+        self.assertEqual(self.service._matrix[0, 767], 1.0)
+
+    def test_matrix_growth_and_compaction(self):
+        """The matrix grows past its initial capacity and compacts tombstones."""
+        with patch("backend.services.vector_store.INITIAL_CAPACITY", 4):
+            svc = VectorStoreService(store_path=self.tmpfile.name)
+            for i in range(10):
+                svc.upsert_conversation(f"c{i}", f"doc{i}", [float(i + 1)] + [1.0] * 767, {})
+            self.assertGreaterEqual(svc._matrix.shape[0], 10)
+
+            for i in range(5):
+                svc.delete_conversation(f"c{i}")
+            self.assertEqual(svc.count(), 5)
+            self.assertEqual(svc._n_dead, 0)  # compacted
+            self.assertEqual(svc._n_rows, 5)
+
+            results = svc.search([10.0] + [1.0] * 767, max_results=10)
+            self.assertEqual(len(results), 5)
+            self.assertEqual(results[0]["conversation_id"], "c9")
+
+    def test_migrates_legacy_json_store(self):
+        """A legacy whole-file JSON store is imported into the binary layout."""
+        legacy = {
+            "conv_legacy": {
+                "document": "legacy doc",
+                "embedding": [0.3] * 768,
+                "metadata": {"title": "Legacy"},
+            }
+        }
+        with open(self.tmpfile.name, "w") as f:
+            json.dump(legacy, f)
+
+        migrated = VectorStoreService(store_path=self.tmpfile.name)
+        self.assertEqual(migrated.count(), 1)
+        self.assertTrue(os.path.exists(os.path.join(data_dir_for(self.tmpfile.name), "meta.json")))
+
+        # Later writes go to the binary store only; the JSON file is not rewritten
+        migrated.upsert_conversation("conv_new", "new doc", [0.1] * 768, {})
+        migrated.close()
+        with open(self.tmpfile.name) as f:
+            self.assertEqual(json.load(f), legacy)
+        self.assertEqual(VectorStoreService(store_path=self.tmpfile.name).count(), 2)
+
+    def test_compaction_and_torn_wal_tail(self):
+        """Compaction folds the WAL into a snapshot; a torn WAL tail is dropped."""
+        for i in range(3):
+            self.service.upsert_conversation(f"c{i}", f"doc{i}", [float(i + 1)] + [0.5] * 767, {})
+        self.service.delete_conversation("c0")
+        self.service.compact_storage(wait=True)
+        self.service.upsert_conversation("c3", "doc3", [0.0] * 767 + [1.0], {})
+
+        data_dir = data_dir_for(self.tmpfile.name)
+        self.assertTrue(os.path.exists(os.path.join(data_dir, "vectors.1.npy")))
+        self.assertFalse(os.path.exists(os.path.join(data_dir, "wal.0.log")))
+
+        with open(os.path.join(data_dir, "wal.1.log"), "ab") as f:
+            f.write(b"\x10\x00\x00")  # partial record header
+
+        reloaded = VectorStoreService(store_path=self.tmpfile.name)
+        self.assertEqual(sorted(reloaded._data), ["c1", "c2", "c3"])
+        results = reloaded.search([0.0] * 767 + [1.0], max_results=1)
+        self.assertEqual(results[0]["conversation_id"], "c3")
+
+    def test_recovery_from_interrupted_compactions(self):
+        """Logs left by crashed compactions are all replayed, and appends continue past them."""
+        data_dir = data_dir_for(self.tmpfile.name)
+        self.service.upsert_conversation("a", "doc a", [1.0] + [0.0] * 767, {})
+        self.service._storage.rotate()  # crash after rotating, before the snapshot
+        self.service.upsert_conversation("b", "doc b", [0.0, 1.0] + [0.0] * 766, {})
+        self.service.close()
+
+        recovered = VectorStoreService(store_path=self.tmpfile.name)
+        self.assertEqual(sorted(recovered._data), ["a", "b"])
+        self.assertEqual(recovered._storage.generation, 1)
+        recovered._storage.rotate()  # crash again
+        recovered.upsert_conversation("c", "doc c", [0.0, 0.0, 1.0] + [0.0] * 765, {})
+        recovered.close()
+
+        recovered = VectorStoreService(store_path=self.tmpfile.name)
+        self.assertEqual(sorted(recovered._data), ["a", "b", "c"])
+        self.assertEqual(recovered._storage.generation, 2)
+        recovered.compact_storage(wait=True)
+        recovered.close()
+        self.assertEqual(
+            sorted(f for f in os.listdir(data_dir) if f.endswith((".log", ".npy"))),
+            ["vectors.3.npy", "wal.3.log"],
+        )
+        self.assertEqual(sorted(VectorStoreService(store_path=self.tmpfile.name)._data), ["a", "b", "c"])
+
+    @unittest.skipIf(sys.platform == "win32", "no inter-process writer lock on Windows")
+    def test_second_process_is_read_only_follower(self):
+        """Another process's store is read-only, follows the writer, and takes over once it exits."""
+        self.service.close()  # let the child process be the writer
+        child = subprocess.Popen(
+            [sys.executable, "-c", _WRITER_PROCESS, str(Path(__file__).parent.parent), self.tmpfile.name],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+
+        def send(command):
+            child.stdin.write(command + "\n")
+            child.stdin.flush()
+            self.assertEqual(child.stdout.readline().strip(), "ok")
+
+        try:
+            send("ready")
+            reader = VectorStoreService(store_path=self.tmpfile.name)
+            self.assertTrue(reader.read_only)
+            with self.assertRaises(ReadOnlyStorageError):
+                reader.upsert_conversation("x", "doc x", [1.0] + [0.0] * 767, {})
+
+            send("upsert 0")
+            self.assertEqual(reader.search([1.0] + [0.0] * 767, max_results=1)[0]["conversation_id"], "c0")
+            send("compact")
+            send("upsert 1")
+            self.assertEqual(reader.count(), 2)
+            self.assertEqual(reader.search([0.0, 1.0] + [0.0] * 766, max_results=1)[0]["conversation_id"], "c1")
+
+            send("exit")
+            child.wait(timeout=30)
+            reader.upsert_conversation("c2", "doc c2", [0.0, 0.0, 1.0] + [0.0] * 765, {})
+            self.assertFalse(reader.read_only)
+            reader.close()
+        finally:
+            if child.poll() is None:
+                child.kill()
+            child.stdin.close()
+            child.stdout.close()
+
+        reopened = VectorStoreService(store_path=self.tmpfile.name)
+        self.assertEqual(sorted(reopened._data), ["c0", "c1", "c2"])
+        reopened.close()
+
+    def test_snapshot_is_memory_mapped_on_load(self):
+        """Snapshot rows are served from a read-only memmap; updates go to memory."""
+        self.service.upsert_conversation("a", "doc a", [1.0] + [0.0] * 767, {})
+        self.service.upsert_conversation("b", "doc b", [0.0, 1.0] + [0.0] * 766, {})
+        self.service.compact_storage(wait=True)
+
+        mapped = VectorStoreService(store_path=self.tmpfile.name)
+        self.assertIsInstance(mapped._base, np.memmap)
+        self.assertEqual(mapped.get_stats()["mmapped_rows"], 2)
+
+        # Updating a mapped row tombstones it and appends to the in-memory segment
+        mapped.upsert_conversation("a", "doc a2", [0.0, 0.0, 1.0] + [0.0] * 765, {})
+        self.assertEqual(mapped.count(), 2)
+        results = mapped.search([0.0, 0.0, 1.0] + [0.0] * 765, max_results=1)
+        self.assertEqual(results[0]["conversation_id"], "a")
+        self.assertEqual(results[0]["content"], "doc a2")
+
+        in_memory = VectorStoreService(store_path=self.tmpfile.name, mmap=False)
+        self.assertIsNone(in_memory._base)
+        self.assertEqual(in_memory.count(), 2)
+
 
 class TestTask3_2_VectorSearch(unittest.TestCase):
     """Test Task 3.2: Semantic Search via cosine similarity."""
@@ -135,8 +324,10 @@ class TestTask3_2_VectorSearch(unittest.TestCase):
 
     @classmethod
     def tearDownClass(cls):
+        cls.service.close()
         if os.path.exists(cls.tmpfile.name):
             os.unlink(cls.tmpfile.name)
+        shutil.rmtree(data_dir_for(cls.tmpfile.name), ignore_errors=True)
 
     def test_search_returns_results_sorted_by_similarity(self):
         """Query closest to conv_python should return it first."""
@@ -158,6 +349,36 @@ class TestTask3_2_VectorSearch(unittest.TestCase):
         self.assertIn("conv_python", conv_ids)
         self.assertNotIn("conv_career", conv_ids)
 
+    def test_partition_and_sort_selection_agree(self):
+        """argpartition top-k returns the same ranking as the full argsort."""
+        rng = np.random.default_rng(0)
+        scores = rng.uniform(-1, 1, size=5000).astype(np.float32)
+        scores[::7] = -np.inf  # tombstones
+        for k, threshold in [(10, 0.0), (30, 0.9), (5000, -1.0)]:
+            fast = select_top_k(scores, k, threshold, "partition")
+            slow = select_top_k(scores, k, threshold, "sort")
+            np.testing.assert_array_equal(scores[fast], scores[slow])
+            self.assertTrue(np.all(scores[fast] >= threshold))
+
+        query = [1.0] + [0.0] * 767
+        self.assertEqual(
+            self.service.search(query, 3, selection="sort"),
+            self.service.search(query, 3, selection="partition"),
+        )
+
+    def test_search_many_matches_individual_searches(self):
+        """Batched queries return the same results as one search per query."""
+        queries = [
+            [1.0] + [0.0] * 767,
+            [0.0, 1.0] + [0.0] * 766,
+            [0.5] * 768,
+        ]
+        batched = self.service.search_many(queries, max_results=2, score_threshold=0.1)
+        self.assertEqual(len(batched), 3)
+        for query, results in zip(queries, batched):
+            self.assertEqual(results, self.service.search(query, max_results=2, score_threshold=0.1))
+        self.assertEqual(batched[1][0]["conversation_id"], "conv_career")
+
     def test_search_result_structure(self):
         """Each result must have the expected keys."""
         results = self.service.search([0.5] * 768, max_results=1)
@@ -177,6 +398,425 @@ class TestTask3_2_VectorSearch(unittest.TestCase):
             os.unlink("/tmp/_cortex_empty_test.json")
 
 
+class TestTask3_2_FilteredSearch(unittest.TestCase):
+    """Test cluster/topic pre-filtering inside the vector store."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store_path = os.path.join(self.tmpdir, "store.json")
+        self.service = VectorStoreService(store_path=self.store_path)
+        rng = np.random.default_rng(0)
+        self.query = rng.standard_normal(32)
+        for i in range(60):
+            vec = self.query + 0.5 * rng.standard_normal(32)
+            topics = ["python"] if i % 10 == 0 else ["cooking"]
+            self.service.upsert_conversation(
+                f"c{i}", f"doc{i}", vec.tolist(), {"cluster_id": i % 3, "topics": topics}
+            )
+
+    def tearDown(self):
+        self.service.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _ids(self, **kwargs):
+        return [r["conversation_id"] for r in self.service.search(self.query.tolist(), **kwargs)]
+
+    def test_filters_return_exactly_limit_matching_results(self):
+        """Selective filters still fill the result list with matching rows only."""
+        ids = self._ids(max_results=5, cluster_filter=1)
+        self.assertEqual(len(ids), 5)
+        self.assertTrue(all(int(cid[1:]) % 3 == 1 for cid in ids))
+
+        ids = self._ids(max_results=10, topic_filter=["python"])
+        self.assertEqual(sorted(ids), sorted(f"c{i}" for i in range(0, 60, 10)))
+
+        ids = self._ids(max_results=10, cluster_filter=0, topic_filter=["python", "rust"])
+        self.assertEqual(sorted(ids), ["c0", "c30"])
+        self.assertEqual(self._ids(cluster_filter=7), [])
+
+    def test_metadata_updates_move_rows_between_filters(self):
+        """update_metadata re-indexes rows, and the change survives reloads."""
+        changed = self.service.update_metadata({"c1": {"cluster_id": 0}, "c2": {"cluster_id": 2}, "nope": {}})
+        self.assertEqual(changed, 1)
+        self.service.delete_conversation("c0")
+        self.assertIn("c1", self._ids(max_results=60, cluster_filter=0))
+        self.assertNotIn("c0", self._ids(max_results=60, topic_filter=["python"]))
+
+        reloaded = VectorStoreService(store_path=self.store_path)
+        ids = [r["conversation_id"] for r in reloaded.search(self.query.tolist(), 60, cluster_filter=0)]
+        self.assertIn("c1", ids)
+        self.assertNotIn("c0", ids)
+        self.assertEqual(len(ids), 20)
+        reloaded.close()
+
+
+class TestTask3_2_HybridSearch(unittest.TestCase):
+    """Test BM25 keyword search fused with cosine similarity."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store_path = os.path.join(self.tmpdir, "store.json")
+        self.service = VectorStoreService(store_path=self.store_path)
+        docs = {
+            "conv_python": ("Title: Python decorators\nHow do functools.wraps decorators work?", 0),
+            "conv_rust": ("Title: Rust lifetimes\nBorrow checker and lifetime elision", 1),
+            "conv_cooking": ("Title: Sourdough\nStarter hydration and baking times", 2),
+        }
+        for cid, (doc, axis) in docs.items():
+            vec = [0.0] * 8
+            vec[axis] = 1.0
+            self.service.upsert_conversation(cid, doc, vec, {"cluster_id": axis})
+
+    def tearDown(self):
+        self.service.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_keyword_only_search_needs_no_embedding(self):
+        results = self.service.hybrid_search("borrow checker", None, keyword_weight=1.0, semantic_weight=0.0)
+        self.assertEqual([r["conversation_id"] for r in results], ["conv_rust"])
+        self.assertAlmostEqual(results[0]["score"], 1.0)
+        with self.assertRaises(ValueError):
+            self.service.hybrid_search("borrow", None, keyword_weight=0.5, semantic_weight=0.5)
+
+    def test_weights_trade_off_keyword_and_semantic_scores(self):
+        """An exact term match can outrank the semantically nearest conversation."""
+        query_vec = [0.9, 0.0, 0.3] + [0.0] * 5
+        semantic = self.service.hybrid_search("sourdough", query_vec, keyword_weight=0.0, semantic_weight=1.0)
+        self.assertEqual(semantic[0]["conversation_id"], "conv_python")
+
+        hybrid = self.service.hybrid_search("sourdough", query_vec, keyword_weight=0.7, semantic_weight=0.3)
+        self.assertEqual(hybrid[0]["conversation_id"], "conv_cooking")
+        self.assertGreater(hybrid[0]["keyword_score"], 0.0)
+        self.assertGreater(hybrid[0]["semantic_score"], 0.0)
+
+        filtered = self.service.hybrid_search("sourdough", query_vec, cluster_filter=0)
+        self.assertEqual([r["conversation_id"] for r in filtered], ["conv_python"])
+
+    def test_hybrid_search_many_matches_single_queries_in_one_scan(self):
+        """Every query of a batch is ranked as hybrid_search() ranks it alone."""
+        queries = [
+            ("sourdough", [0.9, 0.0, 0.3] + [0.0] * 5),
+            ("borrow checker", [0.0, 0.5, 0.5] + [0.0] * 5),
+            ("decorators", [0.0, 0.0, 1.0] + [0.0] * 5),
+        ]
+        texts, embeddings = [q for q, _ in queries], [e for _, e in queries]
+        single = [self.service.hybrid_search(text, emb) for text, emb in queries]
+        with patch.object(self.service, "search_many", wraps=self.service.search_many) as search_many:
+            batch = self.service.hybrid_search_many(texts, embeddings)
+        self.assertEqual(search_many.call_count, 1)
+        self.assertEqual(batch, single)
+
+        filtered = self.service.hybrid_search_many(texts, embeddings, cluster_filter=2)
+        self.assertEqual(filtered, [self.service.hybrid_search(t, e, cluster_filter=2) for t, e in queries])
+        keyword_only = self.service.hybrid_search_many(texts, keyword_weight=1.0, semantic_weight=0.0)
+        self.assertEqual([r[0]["conversation_id"] for r in keyword_only], ["conv_cooking", "conv_rust", "conv_python"])
+
+    def test_keyword_index_follows_upserts_and_deletes(self):
+        self.service.hybrid_search("rust", None, keyword_weight=1.0, semantic_weight=0.0)
+        self.service.upsert_conversation("conv_rust", "Title: Gardening\nTomatoes", [0.0, 1.0] + [0.0] * 6, {})
+        self.service.delete_conversation("conv_cooking")
+        self.assertEqual(self.service.hybrid_search("rust", None, keyword_weight=1.0, semantic_weight=0.0), [])
+        self.assertEqual(self.service.hybrid_search("sourdough", None, keyword_weight=1.0, semantic_weight=0.0), [])
+        results = self.service.hybrid_search("tomatoes", None, keyword_weight=1.0, semantic_weight=0.0)
+        self.assertEqual(results[0]["conversation_id"], "conv_rust")
+
+    def test_unicode_terms_are_indexed(self):
+        self.service.upsert_conversation("conv_de", "Title: Straße\nÜBER Größe", [0.0] * 7 + [1.0], {})
+        self.service.upsert_conversation("conv_ja", "Title: 東京 の 天気", [0.0] * 7 + [1.0], {})
+        for query, expected in (("strasse", "conv_de"), ("über", "conv_de"), ("東京", "conv_ja")):
+            results = self.service.hybrid_search(query, None, keyword_weight=1.0, semantic_weight=0.0)
+            self.assertEqual([r["conversation_id"] for r in results], [expected], query)
+
+    def test_keyword_index_built_in_background_on_load(self):
+        self.service.close()
+        self.service = VectorStoreService(store_path=self.store_path)
+        self.service._keyword_thread.join()
+        self.assertEqual(len(self.service._keywords), 3)
+        results = self.service.hybrid_search("sourdough", None, keyword_weight=1.0, semantic_weight=0.0)
+        self.assertEqual(results[0]["conversation_id"], "conv_cooking")
+
+    def test_search_during_keyword_build_does_not_wait(self):
+        """Hybrid search ranks semantically while the keyword index is still building."""
+        self.service.close()
+        release = threading.Event()
+        original_add = BM25Index.add
+
+        def blocked_add(index, doc_id, text):
+            release.wait(10)
+            original_add(index, doc_id, text)
+
+        with patch.object(BM25Index, "add", blocked_add):
+            self.service = VectorStoreService(store_path=self.store_path)
+            try:
+                results = self.service.hybrid_search("sourdough", [1.0] + [0.0] * 7)
+                self.assertTrue(self.service._keyword_thread.is_alive())
+            finally:
+                release.set()
+            self.service._keyword_thread.join()
+        self.assertEqual(results[0]["conversation_id"], "conv_python")
+        self.assertEqual([r["keyword_score"] for r in results], [0.0] * len(results))
+
+        results = self.service.hybrid_search("sourdough", [1.0] + [0.0] * 7, keyword_weight=0.7, semantic_weight=0.3)
+        self.assertEqual(results[0]["conversation_id"], "conv_cooking")
+
+    def test_writes_during_keyword_build_are_indexed(self):
+        self.service.close()
+        self.service = VectorStoreService(store_path=self.store_path, keyword_index=False)
+        self.assertIsNone(self.service._keywords)
+        original_add = BM25Index.add
+
+        def add_and_write(index, doc_id, text):
+            # Runs inside the build, after the documents were snapshotted
+            if doc_id == "conv_python" and "conv_new" not in self.service._data:
+                self.service.upsert_conversation("conv_new", "Title: Kimchi", [0.0] * 7 + [1.0], {})
+                self.service.delete_conversation("conv_cooking")
+            original_add(index, doc_id, text)
+
+        with patch.object(BM25Index, "add", add_and_write):
+            self.service.build_keyword_index()
+        self.assertEqual(set(self.service._keywords._doc_lengths), {"conv_python", "conv_rust", "conv_new"})
+
+    def test_store_document_holds_full_conversation_text(self):
+        import asyncio
+        from backend.services import vector_store
+
+        messages = [{"role": "user", "content": f"message {i} " + "x" * 600} for i in range(30)]
+        messages[-1]["content"] += " zanzibar"
+        with patch.object(vector_store, "_instance", self.service):
+            asyncio.run(vector_store.upsert_conversation_to_store(
+                "conv_long", {"title": "Long", "messages": messages}, [0.0] * 7 + [1.0]
+            ))
+        results = self.service.hybrid_search("zanzibar", None, keyword_weight=1.0, semantic_weight=0.0)
+        self.assertEqual([r["conversation_id"] for r in results], ["conv_long"])
+
+
+class TestTask3_2_ChunkedSearch(unittest.TestCase):
+    """Test chunk vectors aggregated per conversation."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.service = VectorStoreService(store_path=os.path.join(self.tmpdir, "store.json"))
+        self.chunks = VectorStoreService(store_path=os.path.join(self.tmpdir, "chunks.json"))
+        # conv_long's own vector is off-topic; one of its later windows matches the query axis
+        self.service.upsert_conversation("conv_long", "Title: Long", [0.0, 1.0, 0.0, 0.0], {"cluster_id": 1})
+        self.service.upsert_conversation("conv_short", "Title: Short", [0.6, 0.8, 0.0, 0.0], {"cluster_id": 2})
+        windows = {
+            "conv_long": [[0.0, 1.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0], [1.0, 0.0, 0.0, 0.0]],
+            "conv_short": [[0.6, 0.8, 0.0, 0.0]],
+        }
+        for cid, vectors in windows.items():
+            for i, vec in enumerate(vectors):
+                self.chunks.upsert_conversation(
+                    f"{cid}#{i}", f"window {i}", vec, {"conversation_id": cid, "cluster_id": 1 if cid == "conv_long" else 2}
+                )
+
+    def tearDown(self):
+        self.service.close()
+        self.chunks.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_search_parents_aggregates_max_and_mean(self):
+        query = [1.0, 0.0, 0.0, 0.0]
+        best = self.chunks.search_parents(query, 2, -1.0, aggregation="max")
+        self.assertEqual(list(best), ["conv_long", "conv_short"])
+        self.assertAlmostEqual(best["conv_long"], 1.0, places=5)
+
+        mean = self.chunks.search_parents(query, 2, -1.0, aggregation="mean")
+        self.assertAlmostEqual(mean["conv_long"], 1.0 / 3, places=5)
+        self.assertAlmostEqual(mean["conv_short"], 0.6, places=5)
+
+        # The mean covers every chunk of a parent, not only the shortlisted ones
+        mean = self.chunks.search_parents(query, 2, 0.5, aggregation="mean")
+        self.assertAlmostEqual(mean["conv_long"], 1.0 / 3, places=5)
+
+        self.assertEqual(list(self.chunks.search_parents(query, 2, -1.0, cluster_filter=2)), ["conv_short"])
+        with self.assertRaises(ValueError):
+            self.chunks.search_parents(query, 2, aggregation="median")
+
+    def test_hybrid_search_uses_chunk_scores(self):
+        query = [1.0, 0.0, 0.0, 0.0]
+        plain = self.service.hybrid_search("", query, 2, 0.0, keyword_weight=0.0, semantic_weight=1.0)
+        self.assertEqual(plain[0]["conversation_id"], "conv_short")
+
+        chunk_scores = self.chunks.search_parents(query, 2, 0.0)
+        chunked = self.service.hybrid_search(
+            "", query, 2, 0.0, keyword_weight=0.0, semantic_weight=1.0, chunk_scores=chunk_scores
+        )
+        self.assertEqual([r["conversation_id"] for r in chunked], ["conv_long", "conv_short"])
+        self.assertAlmostEqual(chunked[0]["semantic_score"], 1.0, places=5)
+
+    def test_store_wrappers_use_and_delete_chunks(self):
+        """Batch search sees chunk matches; deleting a conversation removes its chunks."""
+        import asyncio
+        from backend.services import vector_store
+
+        query = [1.0, 0.0, 0.0, 0.0]
+        with patch.object(vector_store, "_instance", self.service), \
+                patch.object(vector_store, "_chunk_instance", self.chunks), \
+                patch.object(vector_store, "EMBEDDING_CHUNKING", True):
+            hits = asyncio.run(vector_store.search_store_many([query], 2, 0.0))
+            self.assertEqual([r["conversation_id"] for r in hits[0]], ["conv_long", "conv_short"])
+
+            self.assertTrue(asyncio.run(vector_store.delete_conversation_from_store("conv_long")))
+        self.assertFalse(self.service.contains("conv_long"))
+        self.assertEqual(self.chunks.count(), 1)
+        self.assertEqual(list(self.chunks.search_parents(query, 2, -1.0)), ["conv_short"])
+
+
+class TestTask3_2_ANNIndex(unittest.TestCase):
+    """Test the IVF approximate nearest-neighbour index."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store_path = os.path.join(self.tmpdir, "store.json")
+        rng = np.random.default_rng(0)
+        centers = rng.standard_normal((8, 64))
+        self.vectors = centers[rng.integers(0, 8, 400)] + 0.3 * rng.standard_normal((400, 64))
+        self.service = VectorStoreService(store_path=self.store_path)
+        for i, vec in enumerate(self.vectors):
+            self.service.upsert_conversation(f"c{i}", f"doc{i}", vec.tolist(), {})
+
+    def tearDown(self):
+        self.service.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_full_probe_matches_exact_search(self):
+        """Probing every list returns exactly the brute-force results."""
+        self.assertTrue(self.service.build_ann_index(n_lists=8))
+        query = self.vectors[3].tolist()
+        exact = self.service.search(query, 10, score_threshold=-1.0, nprobe=0)
+        full = self.service.search(query, 10, score_threshold=-1.0, nprobe=8)
+        self.assertEqual(
+            [r["conversation_id"] for r in exact], [r["conversation_id"] for r in full]
+        )
+        self.assertEqual(self.service.search(query, 1, nprobe=1)[0]["conversation_id"], "c3")
+
+    def test_incremental_insert_and_persistence(self):
+        """Rows added after training are searchable and the index survives reloads."""
+        self.service.build_ann_index(n_lists=8)
+        new_vec = self.vectors[5] * -1.0
+        self.service.upsert_conversation("new", "new doc", new_vec.tolist(), {})
+        results = self.service.search(new_vec.tolist(), 1, nprobe=2)
+        self.assertEqual(results[0]["conversation_id"], "new")
+
+        reloaded = VectorStoreService(store_path=self.store_path)
+        self.assertIsNotNone(reloaded._ann)
+        self.assertEqual(reloaded.get_stats()["ann_index"]["n_lists"], 8)
+        results = reloaded.search(new_vec.tolist(), 1, nprobe=2)
+        self.assertEqual(results[0]["conversation_id"], "new")
+        reloaded.close()
+
+
+class TestTask3_2_Int8Quantization(unittest.TestCase):
+    """Test int8 first-stage scoring with exact float32 re-ranking."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store_path = os.path.join(self.tmpdir, "store.json")
+        rng = np.random.default_rng(0)
+        self.vectors = rng.standard_normal((300, 64))
+        self.exact = VectorStoreService(store_path=os.path.join(self.tmpdir, "exact.json"))
+        self.service = VectorStoreService(store_path=self.store_path, quantization="int8")
+        for i, vec in enumerate(self.vectors):
+            self.exact.upsert_conversation(f"c{i}", f"doc{i}", vec.tolist(), {})
+            self.service.upsert_conversation(f"c{i}", f"doc{i}", vec.tolist(), {})
+
+    def tearDown(self):
+        for service in (self.exact, self.service):
+            service.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_reranked_results_match_exact_search(self):
+        """Re-ranked results and scores match the float32 scan."""
+        for query in self.vectors[:20]:
+            exact = self.exact.search(query.tolist(), 5, score_threshold=-1.0)
+            approx = self.service.search(query.tolist(), 5, score_threshold=-1.0)
+            self.assertEqual(
+                [r["conversation_id"] for r in exact], [r["conversation_id"] for r in approx]
+            )
+            self.assertAlmostEqual(exact[0]["score"], approx[0]["score"], places=6)
+        self.assertEqual(self.service.get_stats()["quantization"], "int8")
+
+    def test_codes_follow_updates_deletes_and_reload(self):
+        """Codes stay in step with overwrites, compaction and snapshot reloads."""
+        flipped = (-self.vectors[7]).tolist()
+        self.service.upsert_conversation("c7", "doc7", flipped, {})
+        for i in range(100, 200):
+            self.service.delete_conversation(f"c{i}")
+        self.assertEqual(self.service.search(flipped, 1)[0]["conversation_id"], "c7")
+
+        self.service.compact_storage(wait=True)
+        reloaded = VectorStoreService(store_path=self.store_path, quantization="int8")
+        self.assertEqual(len(reloaded._code_scales), len(reloaded._live))
+        self.assertEqual(reloaded.search(flipped, 1)[0]["conversation_id"], "c7")
+        self.assertEqual(reloaded.search(self.vectors[250].tolist(), 1)[0]["conversation_id"], "c250")
+        reloaded.close()
+
+    def test_unknown_quantization_rejected(self):
+        with self.assertRaises(ValueError):
+            VectorStoreService(store_path=self.store_path, quantization="pq")
+
+
+class TestTask3_2_MatryoshkaSearch(unittest.TestCase):
+    """Test truncated-dimension first-stage scoring with full-dimension re-ranking."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store_path = os.path.join(self.tmpdir, "store.json")
+        # Decaying per-dimension scale: leading dimensions carry most of the signal
+        rng = np.random.default_rng(0)
+        self.vectors = rng.standard_normal((300, 64)) * np.linspace(1.0, 0.1, 64)
+        self.exact = VectorStoreService(store_path=os.path.join(self.tmpdir, "exact.json"))
+        self.service = VectorStoreService(store_path=self.store_path, matryoshka_dim=32)
+        for i, vec in enumerate(self.vectors):
+            self.exact.upsert_conversation(f"c{i}", f"doc{i}", vec.tolist(), {})
+            self.service.upsert_conversation(f"c{i}", f"doc{i}", vec.tolist(), {})
+
+    def tearDown(self):
+        for service in (self.exact, self.service):
+            service.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_reranked_scores_are_full_dimension(self):
+        """The shortlist is re-scored with the full vectors."""
+        for i, query in enumerate(self.vectors[:20]):
+            exact = self.exact.search(query.tolist(), 3, score_threshold=-1.0)
+            approx = self.service.search(query.tolist(), 3, score_threshold=-1.0)
+            self.assertEqual(approx[0]["conversation_id"], f"c{i}")
+            self.assertAlmostEqual(exact[0]["score"], approx[0]["score"], places=6)
+        self.assertEqual(self.service.get_stats()["matryoshka"]["dim"], 32)
+
+    def test_without_rerank_scores_are_truncated_cosines(self):
+        service = VectorStoreService(
+            store_path=os.path.join(self.tmpdir, "short.json"), matryoshka_dim=32, matryoshka_rerank=False
+        )
+        for i, vec in enumerate(self.vectors[:50]):
+            service.upsert_conversation(f"c{i}", f"doc{i}", vec.tolist(), {})
+        query, other = self.vectors[0], self.vectors[1]
+        results = {r["conversation_id"]: r["score"] for r in service.search(query.tolist(), 50, -1.0)}
+        expected = query[:32] @ other[:32] / (np.linalg.norm(query[:32]) * np.linalg.norm(other[:32]))
+        self.assertAlmostEqual(results["c1"], expected, places=5)
+        service.close()
+
+    def test_short_rows_follow_updates_deletes_and_reload(self):
+        flipped = (-self.vectors[7]).tolist()
+        self.service.upsert_conversation("c7", "doc7", flipped, {})
+        for i in range(100, 200):
+            self.service.delete_conversation(f"c{i}")
+        self.assertEqual(self.service.search(flipped, 1)[0]["conversation_id"], "c7")
+
+        self.service.compact_storage(wait=True)
+        reloaded = VectorStoreService(store_path=self.store_path, matryoshka_dim=32)
+        self.assertEqual(len(reloaded._short), len(reloaded._live))
+        self.assertEqual(reloaded.search(flipped, 1)[0]["conversation_id"], "c7")
+        self.assertEqual(reloaded.search(self.vectors[250].tolist(), 1)[0]["conversation_id"], "c250")
+        reloaded.close()
+
+    def test_combining_with_quantization_rejected(self):
+        with self.assertRaises(ValueError):
+            VectorStoreService(store_path=self.store_path, quantization="int8", matryoshka_dim=32)
+
+
 class TestTask3_SearchEndpoint(unittest.TestCase):
     """Test the /api/search/ endpoint wired to the local vector store."""
 
@@ -186,11 +826,11 @@ class TestTask3_SearchEndpoint(unittest.TestCase):
         init_db()
         cls.client = TestClient(app)
 
-    @patch("backend.api.search.search_store")
-    @patch("backend.api.search.generate_embedding")
+    @patch("backend.api.search.hybrid_search_store")
+    @patch("backend.api.search.generate_query_embedding")
     def test_search_endpoint_empty(self, mock_embed, mock_search):
         """200 with zero results when the store is empty."""
-        async def _embed(text, use_cache=False):
+        async def _embed(text):
             return [0.1] * 768
         mock_embed.side_effect = _embed
 
@@ -204,6 +844,107 @@ class TestTask3_SearchEndpoint(unittest.TestCase):
         self.assertEqual(data["query"], "Python")
         self.assertEqual(data["total_results"], 0)
 
+    @patch("backend.api.search.hybrid_search_store")
+    @patch("backend.api.search.generate_query_embedding")
+    def test_keyword_only_search_skips_embedding(self, mock_embed, mock_search):
+        """semantic_weight=0 searches without calling the embedding provider."""
+        async def _search(**kw):
+            return []
+        mock_search.side_effect = _search
+
+        resp = self.client.post(
+            "/api/search/",
+            json={"query": "borrow checker", "keyword_weight": 1.0, "semantic_weight": 0.0},
+        )
+        self.assertEqual(resp.status_code, 200)
+        mock_embed.assert_not_called()
+        self.assertIsNone(mock_search.call_args.kwargs["query_embedding"])
+
+        resp = self.client.post(
+            "/api/search/", json={"query": "x", "keyword_weight": 0.0, "semantic_weight": 0.0}
+        )
+        self.assertEqual(resp.status_code, 400)
+
+    @patch("backend.api.search.hybrid_search_store_many")
+    @patch("backend.api.search.generate_query_embeddings")
+    def test_batch_search_endpoint(self, mock_embed, mock_search):
+        """Semantic-only: one embedding call and one store call answer every query."""
+        async def _embed(texts):
+            return [[0.1] * 768 for _ in texts]
+        mock_embed.side_effect = _embed
+
+        async def _search(**kw):
+            return [[] for _ in kw["query_texts"]]
+        mock_search.side_effect = _search
+
+        resp = self.client.post(
+            "/api/search/batch",
+            json={"queries": ["Python", "Cooking"], "limit": 5, "keyword_weight": 0.0},
+        )
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        self.assertEqual(data["total_queries"], 2)
+        self.assertEqual([r["query"] for r in data["results"]], ["Python", "Cooking"])
+        mock_embed.assert_called_once()
+        mock_search.assert_called_once()
+
+        resp = self.client.post("/api/search/batch", json={"queries": []})
+        self.assertEqual(resp.status_code, 422)
+
+    @patch("backend.api.search.hybrid_search_store_many")
+    @patch("backend.api.search.hybrid_search_store")
+    @patch("backend.api.search.generate_query_embedding")
+    @patch("backend.api.search.generate_query_embeddings")
+    def test_batch_search_ranks_like_single_search(self, mock_embed_many, mock_embed, mock_search, mock_search_many):
+        """With the default weights each batch query is scored like /api/search/, in one store call."""
+        async def _embed_many(texts):
+            return [[float(i)] * 768 for i, _ in enumerate(texts)]
+        mock_embed_many.side_effect = _embed_many
+
+        async def _embed(text):
+            return [0.0] * 768
+        mock_embed.side_effect = _embed
+
+        async def _search(**kw):
+            return []
+        mock_search.side_effect = _search
+
+        async def _search_many(**kw):
+            return [[] for _ in kw["query_texts"]]
+        mock_search_many.side_effect = _search_many
+
+        single = {"query": "borrow checker", "limit": 5}
+        self.assertEqual(self.client.post("/api/search/", json=single).status_code, 200)
+        single_kwargs = dict(mock_search.call_args.kwargs)
+        del single_kwargs["query_text"], single_kwargs["query_embedding"]
+
+        resp = self.client.post(
+            "/api/search/batch", json={"queries": ["borrow checker", "lifetimes"], "limit": 5}
+        )
+        self.assertEqual(resp.status_code, 200)
+        mock_embed_many.assert_called_once_with(["borrow checker", "lifetimes"])
+        mock_search_many.assert_called_once()
+        batch_kwargs = dict(mock_search_many.call_args.kwargs)
+        self.assertEqual(batch_kwargs.pop("query_texts"), ["borrow checker", "lifetimes"])
+        self.assertEqual(len(batch_kwargs.pop("query_embeddings")), 2)
+        self.assertEqual(batch_kwargs, single_kwargs)
+
+        # Keyword-only batches skip the embedding provider
+        mock_embed_many.reset_mock()
+        resp = self.client.post(
+            "/api/search/batch",
+            json={"queries": ["rust"], "keyword_weight": 1.0, "semantic_weight": 0.0},
+        )
+        self.assertEqual(resp.status_code, 200)
+        mock_embed_many.assert_not_called()
+        self.assertIsNone(mock_search_many.call_args.kwargs["query_embeddings"])
+
+        resp = self.client.post(
+            "/api/search/batch",
+            json={"queries": ["x"], "keyword_weight": 0.0, "semantic_weight": 0.0},
+        )
+        self.assertEqual(resp.status_code, 400)
+
     @patch("backend.api.search.get_vector_store_service")
     def test_search_stats_endpoint(self, mock_get_svc):
         mock_svc = Mock()
@@ -232,7 +973,7 @@ class TestTask3_IntegrationWithIngestion(unittest.TestCase):
         cls.client = TestClient(app)
 
     @patch("backend.api.ingest.upsert_conversation_to_store")
-    @patch("backend.api.ingest.generate_embedding")
+    @patch("backend.api.ingest.generate_embeddings_batch")
     @patch("backend.api.ingest.summarize_conversation")
     def test_ingestion_upserts_to_store(self, mock_summarize, mock_embed, mock_upsert):
         """Ingestion pipeline should call upsert_conversation_to_store."""
@@ -240,8 +981,8 @@ class TestTask3_IntegrationWithIngestion(unittest.TestCase):
             return "Test summary", ["Test topic"]
         mock_summarize.side_effect = _summarize
 
-        async def _embed(text, conversation_id=None):
-            return [0.1] * 768
+        async def _embed(texts, use_cache=True):
+            return [[0.1] * 768 for _ in texts]
         mock_embed.side_effect = _embed
 
         mock_upsert.return_value = None